@@ -17,6 +17,7 @@ setup(
         'trapi_model',
         'trapi_model.data',
         'trapi_model.data.biolink_schemas',
+        'trapi_model.data.biolink_snapshots',
         'trapi_model.data.trapi_schemas',
         'trapi_model.biolink',
         'trapi_model.biolink.constants',
@@ -24,6 +25,7 @@ setup(
         ],
     package_data={
         'trapi_model.data.biolink_schemas': ['*.yaml', '*.yml'],
+        'trapi_model.data.biolink_snapshots': ['*.snapshot'],
         'trapi_model.data.trapi_schemas': ['*.yaml', '*.yml'],
         'trapi_model.biolink.constants': ['*.csv'],
         'trapi_model.schemas':['*.json'],
@@ -36,6 +38,10 @@ setup(
         'deepdiff',
         'reasoner_validator'
     ],
+    extras_require={
+        'orjson': ['orjson'],
+        'numpy': ['numpy'],
+    },
     zip_safe=False,
     python_requires='>=3.6',
 )
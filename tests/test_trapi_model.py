@@ -14,6 +14,8 @@ import logging
 import sys
 import os
 import time
+import copy
+import io
 from collections import defaultdict
 
 logger = logging.getLogger(__name__)
@@ -61,6 +63,29 @@ class TestBiolinkEntity(unittest.TestCase):
                 [entity.get_curie() for entity in BIOLINK_GENE_ENTITY.get_ancestors()],
                 )
 
+    def test_entities_are_interned(self):
+        from trapi_model.biolink import get_entity
+        from trapi_model.biolink.constants import get_biolink_entity
+        gene = get_entity('biolink:Gene')
+        self.assertIs(gene, get_entity('gene'))
+        self.assertIs(gene, get_biolink_entity('biolink:Gene'))
+        ancestor = gene.get_ancestors()[0]
+        self.assertIs(ancestor, get_entity(ancestor.get_curie()))
+        with self.assertRaises(AttributeError):
+            gene.passed_name = 'disease'
+        with self.assertRaises(ValueError):
+            get_entity('biolink:Gene', biolink_version='0.0.0')
+
+    def test_lazy_constants(self):
+        import trapi_model.biolink.constants as constants
+        self.assertNotIn('BIOLINK_DISEASE_ENTITY', vars(constants))
+        from trapi_model.biolink.constants import BIOLINK_DISEASE, BIOLINK_DISEASE_ENTITY
+        self.assertEqual(BIOLINK_DISEASE, 'disease')
+        self.assertEqual(BIOLINK_DISEASE_ENTITY.get_curie(), 'biolink:Disease')
+        self.assertIs(vars(constants)['BIOLINK_DISEASE_ENTITY'], BIOLINK_DISEASE_ENTITY)
+        with self.assertRaises(AttributeError):
+            constants.BIOLINK_NOT_AN_ELEMENT_ENTITY
+
     def test_inverse_debug_mode(self):
         import trapi_model
         trapi_model.set_biolink_debug_mode(True)
@@ -137,3 +162,753 @@ class TestNcatsRepo(unittest.TestCase):
                         batch = query.expand_batch_query()
             except UnknownBiolinkEntity as ex:
                 logger.critical('Failed on file {} with {}'.format(filename, ex.message))
+
+class TestValidationMode(unittest.TestCase):
+    def setUp(self):
+        self.kg_dict = {
+                "nodes": {
+                    "NCBIGene:3778": {"name": "KCNMA1", "categories": ["biolink:Gene"]},
+                    "MONDO:0005148": {"name": "type 2 diabetes mellitus", "categories": ["biolink:Disease"]},
+                    },
+                "edges": {
+                    "e0": {
+                        "subject": "NCBIGene:3778",
+                        "object": "MONDO:0005148",
+                        "predicate": "biolink:treats",
+                        },
+                    },
+                }
+
+    def test_unknown_validation_mode(self):
+        import trapi_model
+        with self.assertRaises(ValueError):
+            trapi_model.set_validation_mode('sometimes')
+
+    def test_deferred_knowledge_graph_load(self):
+        from unittest import mock
+        import trapi_model
+        from trapi_model.knowledge_graph import KnowledgeGraph, KNode, KEdge
+        with mock.patch.object(KNode, 'validate', return_value=(True, None)) as knode_validate, \
+                mock.patch.object(KEdge, 'validate', return_value=(True, None)) as kedge_validate:
+            kg = KnowledgeGraph.load('1.4', None, self.kg_dict, validation_mode=trapi_model.VALIDATION_DEFERRED)
+            self.assertEqual(knode_validate.call_count, 0)
+            self.assertEqual(kedge_validate.call_count, 0)
+            self.assertEqual(kg.validation_mode, trapi_model.VALIDATION_DEFERRED)
+            self.assertEqual(kg.edges['e0'].validation_mode, trapi_model.VALIDATION_DEFERRED)
+            kg.add_attribute('biolink:p_value', 0.01, edge_id='e0')
+            self.assertEqual(kedge_validate.call_count, 0)
+            self.assertTrue(kg.validate()[0])
+
+    def test_deferred_message_load(self):
+        from unittest import mock
+        import trapi_model
+        from trapi_model.message import Message
+        from trapi_model.knowledge_graph import KnowledgeGraph
+        with mock.patch.object(KnowledgeGraph, 'validate', return_value=(True, None)) as kg_validate, \
+                mock.patch.object(Message, 'validate', return_value=(True, None)) as message_validate:
+            message = Message.load(
+                    '1.4',
+                    None,
+                    {"knowledge_graph": self.kg_dict},
+                    validation_mode=trapi_model.VALIDATION_DEFERRED,
+                    )
+            self.assertEqual(kg_validate.call_count, 0)
+            self.assertEqual(message_validate.call_count, 1)
+            self.assertEqual(message.knowledge_graph.validation_mode, trapi_model.VALIDATION_DEFERRED)
+
+class TestSchemaValidators(unittest.TestCase):
+    def test_validators_are_shared(self):
+        from trapi_model.validators import get_schema_validator
+        self.assertIs(
+                get_schema_validator('1.2', 'Edge'),
+                get_schema_validator('1.2', 'Edge'),
+                )
+        self.assertIsNot(
+                get_schema_validator('1.2', 'Edge'),
+                get_schema_validator('1.2', 'Node'),
+                )
+
+    def test_validate_component(self):
+        from trapi_model.validators import validate_component
+        valid, message = validate_component({"categories": "biolink:Gene"}, '1.2', 'Node')
+        self.assertFalse(valid)
+        self.assertIsNotNone(message)
+        valid, message = validate_component({"categories": ["biolink:Gene"]}, '1.2', 'Node')
+        self.assertTrue(valid)
+        self.assertIsNone(message)
+
+class TestBiolinkSnapshot(unittest.TestCase):
+    def test_snapshot_round_trip(self):
+        import tempfile
+        from trapi_model.biolink import TOOLKIT
+        from trapi_model.biolink.snapshot import write_snapshot, BiolinkSnapshot
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = write_snapshot(TOOLKIT, os.path.join(tmp_dir, 'biolink-model-test.snapshot'))
+            snapshot = BiolinkSnapshot(filename)
+            for name in ['gene', 'treats', 'named thing']:
+                self.assertEqual(snapshot.get_ancestors(name), TOOLKIT.get_ancestors(name))
+                self.assertEqual(snapshot.get_descendants(name), TOOLKIT.get_descendants(name))
+                self.assertEqual(snapshot.is_predicate(name), TOOLKIT.is_predicate(name))
+            self.assertEqual(snapshot.get_element('biolink:Gene').name, 'gene')
+            self.assertEqual(snapshot.get_element('treats').inverse, 'treated by')
+            self.assertIsNone(snapshot.get_element('biolink:NotAnElement'))
+
+class TestBiolinkHierarchy(unittest.TestCase):
+    def test_is_a(self):
+        from trapi_model.biolink.hierarchy import get_hierarchy
+        from trapi_model.biolink.constants import BIOLINK_GENE_ENTITY
+        hierarchy = get_hierarchy()
+        self.assertTrue(hierarchy.is_a(BIOLINK_GENE_ENTITY, 'biolink:NamedThing'))
+        self.assertTrue(hierarchy.is_a('biolink:Gene', 'biolink:Gene'))
+        self.assertFalse(hierarchy.is_a('biolink:NamedThing', 'biolink:Gene'))
+        self.assertTrue(hierarchy.is_a('biolink:treats', 'biolink:related_to'))
+
+    def test_common_ancestor(self):
+        from trapi_model.biolink.hierarchy import get_hierarchy
+        hierarchy = get_hierarchy()
+        common_ancestor = hierarchy.common_ancestor('biolink:Gene', 'biolink:Disease')
+        self.assertTrue(hierarchy.is_a('biolink:Gene', common_ancestor))
+        self.assertTrue(hierarchy.is_a('biolink:Disease', common_ancestor))
+        self.assertTrue(hierarchy.is_a(common_ancestor, 'biolink:NamedThing'))
+        self.assertEqual(hierarchy.common_ancestor('biolink:Gene').get_curie(), 'biolink:Gene')
+        self.assertIsNone(hierarchy.common_ancestor('biolink:Gene', 'biolink:treats'))
+
+    def test_expand_descendants(self):
+        from trapi_model.biolink.hierarchy import get_hierarchy
+        hierarchy = get_hierarchy()
+        curies = [entity.get_curie() for entity in hierarchy.expand_descendants(['biolink:GenomicEntity'])]
+        self.assertIn('biolink:GenomicEntity', curies)
+        self.assertIn('biolink:Gene', curies)
+        self.assertNotIn('biolink:Disease', curies)
+
+class TestJSONStreaming(unittest.TestCase):
+    def setUp(self):
+        self.knowledge_graph = {
+                "nodes": {
+                    "n0": {"categories": ["biolink:Gene"], "name": "gene"},
+                    "n1": {"categories": ["biolink:Disease"], "name": "disease"},
+                    },
+                "edges": {
+                    "e0": {"subject": "n0", "object": "n1", "predicate": "biolink:related_to"},
+                    },
+                }
+
+    def test_json_stream_reader(self):
+        from trapi_model.json_stream import JSONStreamReader
+        document = {"a": [1, {"b": "c\\\"}"}], "d": 1.5e10, "e": {"f": None}}
+        reader = JSONStreamReader(json.dumps(document).encode(), chunk_size=3)
+        items = {}
+        for key in reader.iter_keys():
+            if key == 'e':
+                items.update(reader.iter_items())
+            elif key == 'd':
+                items[key] = reader.read_value()
+        self.assertEqual(items, {"d": 1.5e10, "f": None})
+
+    def test_load_stream(self):
+        from trapi_model.knowledge_graph import KnowledgeGraph
+        message = {"message": {"query_graph": {"nodes": {}, "edges": {}}, "knowledge_graph": self.knowledge_graph}}
+        streamed = KnowledgeGraph.load_stream('1.4', None, source=json.dumps(message).encode())
+        loaded = KnowledgeGraph.load('1.4', None, copy.deepcopy(self.knowledge_graph))
+        self.assertEqual(streamed.to_dict(), loaded.to_dict())
+        elements = list(KnowledgeGraph.iter_load('1.4', None, source=json.dumps(self.knowledge_graph)))
+        self.assertEqual([(kind, element_id) for kind, element_id, _ in elements], [('nodes', 'n0'), ('nodes', 'n1'), ('edges', 'e0')])
+
+    def test_write_json(self):
+        from trapi_model.knowledge_graph import KnowledgeGraph
+        knowledge_graph = KnowledgeGraph.load('1.4', None, copy.deepcopy(self.knowledge_graph))
+        self.assertEqual(''.join(knowledge_graph.iter_json(indent=2)), json.dumps(knowledge_graph.to_dict(), indent=2))
+        text_file = io.StringIO()
+        knowledge_graph.write_json(text_file)
+        self.assertEqual(json.loads(text_file.getvalue()), knowledge_graph.to_dict())
+        self.assertNotIn(' ', text_file.getvalue())
+        binary_file = io.BytesIO()
+        knowledge_graph.write_json(binary_file, indent=2)
+        self.assertEqual(binary_file.getvalue().decode(), knowledge_graph.json())
+
+class TestJSONBackend(unittest.TestCase):
+    def tearDown(self):
+        import trapi_model
+        trapi_model.set_json_backend(None)
+
+    def test_stdlib_backend(self):
+        import trapi_model
+        from trapi_model import json_backend
+        trapi_model.set_json_backend('json')
+        self.assertEqual(json_backend.get_json_backend().name, 'json')
+        self.assertEqual(json_backend.dumps({"a": [1, 2]}), '{"a":[1,2]}')
+        self.assertEqual(json_backend.loads(b'{"a": [1, 2]}'), {"a": [1, 2]})
+
+    def test_unknown_backend(self):
+        import trapi_model
+        with self.assertRaises(ValueError):
+            trapi_model.set_json_backend('not_a_backend')
+
+    def test_binary_json(self):
+        from trapi_model.query import Query
+        query = Query('1.4', None)
+        encoded = query.json(binary=True)
+        self.assertIsInstance(encoded, bytes)
+        self.assertEqual(json.loads(encoded), query.to_dict())
+
+class TestClone(unittest.TestCase):
+    def setUp(self):
+        from trapi_model.query import Query
+        self.query = Query('1.4', None)
+        query_graph = self.query.message.query_graph
+        n0 = query_graph.add_node(['MONDO:0005148', 'MONDO:0005015'], 'biolink:Disease')
+        n1 = query_graph.add_node(None, ['biolink:Gene', 'biolink:Protein'])
+        query_graph.add_edge(n0, n1, 'biolink:related_to')
+
+    def test_clone_is_independent(self):
+        query = self.query.clone()
+        self.assertEqual(query.to_dict(), self.query.to_dict())
+        query.message.query_graph.nodes['n0'].ids.append('MONDO:0004979')
+        query.message.query_graph.add_node('NCBIGene:3778', 'biolink:Gene')
+        self.assertEqual(len(self.query.message.query_graph.nodes['n0'].ids), 2)
+        self.assertNotIn('n2', self.query.message.query_graph.nodes)
+        # Biolink entities are shared rather than rebuilt.
+        self.assertIs(
+                query.message.query_graph.nodes['n1'].categories[0],
+                self.query.message.query_graph.nodes['n1'].categories[0],
+                )
+
+    def test_expand_without_validation(self):
+        from unittest import mock
+        from trapi_model.query import Query
+        from trapi_model.query_graph import QNode, QEdge
+        with mock.patch.object(Query, 'validate', return_value=(True, None)) as query_validate, \
+                mock.patch.object(QNode, 'validate', return_value=(True, None)) as qnode_validate, \
+                mock.patch.object(QEdge, 'validate', return_value=(True, None)) as qedge_validate:
+            queries = self.query.expand_batch_query()
+            self.assertEqual(len(queries), 4)
+            self.assertEqual(query_validate.call_count + qnode_validate.call_count + qedge_validate.call_count, 0)
+        self.assertEqual(len(set(query.id for query in queries)), 4)
+
+class TestBatchExpansion(unittest.TestCase):
+    def setUp(self):
+        from trapi_model.query import Query
+        self.query = Query('1.4', None)
+        query_graph = self.query.message.query_graph
+        n0 = query_graph.add_node(['MONDO:0005148', 'MONDO:0005015', 'MONDO:0004979'], 'biolink:Disease')
+        n1 = query_graph.add_node(None, ['biolink:Gene', 'biolink:Protein'])
+        query_graph.add_edge(n0, n1, ['biolink:related_to', 'biolink:treats'])
+
+    def test_count_batch_queries(self):
+        self.assertEqual(self.query.count_batch_queries(), 12)
+        self.assertEqual(len(self.query.expand_batch_query()), 12)
+
+    def test_paged_expansion(self):
+        expected = [query.message.query_graph.to_dict() for query in self.query.expand_batch_query()]
+        page = [query.message.query_graph.to_dict() for query in self.query.iter_batch_queries(start=4, stop=9)]
+        self.assertEqual(page, expected[4:9])
+        chunks = list(self.query.iter_batch_query_chunks(5))
+        self.assertEqual([len(chunk) for chunk in chunks], [5, 5, 2])
+
+    def test_max_queries(self):
+        from trapi_model.exceptions import BatchQueryTooLarge
+        with self.assertRaises(BatchQueryTooLarge):
+            self.query.iter_batch_queries(max_queries=10)
+
+    def test_grouped_expansion(self):
+        queries = self.query.expand_batch_query(axes=[('n1', 'categories')])
+        self.assertEqual(len(queries), 2)
+        for query in queries:
+            self.assertEqual(len(query.message.query_graph.nodes['n0'].ids), 3)
+            self.assertEqual(len(query.message.query_graph.edges['e0'].predicates), 2)
+        with self.assertRaises(ValueError):
+            self.query.expand_batch_query(axes=[('n5', 'ids')])
+
+    def test_ids_chunks(self):
+        self.assertEqual(self.query.count_batch_queries(axes=[('n0', 'ids')], ids_chunk_size=2), 2)
+        queries = self.query.expand_batch_query(axes=[('n0', 'ids')], ids_chunk_size=2)
+        self.assertEqual(
+                [query.message.query_graph.nodes['n0'].ids for query in queries],
+                [['MONDO:0005148', 'MONDO:0005015'], ['MONDO:0004979']],
+                )
+
+def batch_handler(query):
+    """ Answers a subquery with one result per disease id. Module level so
+    that it can run on a process pool.
+    """
+    from trapi_model.message import Message
+    message = Message(query.trapi_version, query.biolink_version)
+    for curie in query.message.query_graph.nodes['n0'].ids:
+        message.knowledge_graph.add_node(curie, None, 'biolink:Disease')
+        message.knowledge_graph.add_node('NCBIGene:3778', None, 'biolink:Gene')
+        edge_id = message.knowledge_graph.add_edge(curie, 'NCBIGene:3778', [], 'biolink:related_to')
+        message.results.add_result({'n0': [curie], 'n1': ['NCBIGene:3778']}, {'e0': [edge_id]})
+    return message
+
+class TestBatchExecution(unittest.TestCase):
+    def setUp(self):
+        from trapi_model.query import Query
+        self.query = Query('1.4', None)
+        query_graph = self.query.message.query_graph
+        n0 = query_graph.add_node(['MONDO:0005148', 'MONDO:0005015', 'MONDO:0004979', 'MONDO:0007254'], 'biolink:Disease')
+        n1 = query_graph.add_node(None, 'biolink:Gene')
+        query_graph.add_edge(n0, n1, 'biolink:related_to')
+
+    def test_thread_pool(self):
+        from trapi_model.execution import run_batch_query
+        message = run_batch_query(self.query, batch_handler, max_workers=2, max_in_flight=2)
+        self.assertEqual(len(message.knowledge_graph.nodes), 5)
+        self.assertEqual(len(message.results.results), 4)
+        self.assertEqual(message.query_graph.to_dict(), self.query.message.query_graph.to_dict())
+
+    def test_process_pool(self):
+        from trapi_model.execution import run_batch_query, PROCESS_POOL
+        message = run_batch_query(self.query, batch_handler, executor=PROCESS_POOL, max_workers=2)
+        self.assertEqual(len(message.knowledge_graph.edges), 4)
+        self.assertEqual(len(message.results.results), 4)
+
+    def test_ordered_and_cancelled(self):
+        import threading
+        from trapi_model.execution import iter_batch_responses
+        responses = iter_batch_responses(self.query, batch_handler, ordered=True, max_in_flight=2)
+        ids = [subquery.message.query_graph.nodes['n0'].ids[0] for subquery, _ in responses]
+        self.assertEqual(ids, self.query.message.query_graph.nodes['n0'].ids)
+        cancel_event = threading.Event()
+        cancel_event.set()
+        responses = iter_batch_responses(self.query, batch_handler, cancel_event=cancel_event)
+        self.assertEqual(list(responses), [])
+
+class TestAsyncBatchExecution(unittest.TestCase):
+    setUp = TestBatchExecution.setUp
+
+    def test_run_batch_query_async(self):
+        import asyncio
+        from trapi_model.execution import run_batch_query_async
+
+        async def handler(query):
+            await asyncio.sleep(0)
+            # Respond with JSON as a downstream service would.
+            return batch_handler(query).json(binary=True, indent=None)
+
+        message = asyncio.run(run_batch_query_async(self.query, handler, max_concurrency=2))
+        self.assertEqual(len(message.knowledge_graph.edges), 4)
+        self.assertEqual(len(message.results.results), 4)
+
+    def test_gather_limited(self):
+        import asyncio
+        from trapi_model.execution import gather_limited
+        running = []
+
+        async def work(i):
+            running.append(i)
+            self.assertLessEqual(len(running), 2)
+            await asyncio.sleep(0)
+            running.remove(i)
+            return i
+
+        results = asyncio.run(gather_limited([work(i) for i in range(5)], 2))
+        self.assertEqual(results, [0, 1, 2, 3, 4])
+
+class TestMessageMerge(unittest.TestCase):
+    def get_response(self, p_value, primary_source='infores:semmeddb'):
+        from trapi_model.message import Message
+        return Message.load('1.4', None, {
+            "knowledge_graph": {
+                "nodes": {
+                    "MONDO:0005148": {"categories": ["biolink:Disease"]},
+                    "NCBIGene:3778": {"categories": ["biolink:Gene"]},
+                    },
+                "edges": {
+                    "e0": {
+                        "subject": "NCBIGene:3778",
+                        "object": "MONDO:0005148",
+                        "predicate": "biolink:related_to",
+                        "attributes": [{"attribute_type_id": "biolink:p_value", "value": p_value}],
+                        "sources": [{"resource_id": primary_source, "resource_role": "primary_knowledge_source"}],
+                        },
+                    },
+                },
+            "results": [
+                {
+                    "node_bindings": {"n0": [{"id": "MONDO:0005148"}], "n1": [{"id": "NCBIGene:3778"}]},
+                    "edge_bindings": {"e0": [{"id": "e0"}]},
+                    },
+                ],
+            })
+
+    def test_duplicate_edges_are_merged(self):
+        from trapi_model.message import Message
+        message = Message('1.4', None)
+        for p_value in [0.01, 0.02, 0.01]:
+            response = self.get_response(p_value)
+            message.update(response.knowledge_graph, response.results)
+        self.assertEqual(len(message.knowledge_graph.nodes), 2)
+        self.assertEqual(list(message.knowledge_graph.edges), ['e0'])
+        self.assertEqual(
+                [attribute.value for attribute in message.knowledge_graph.edges['e0'].attributes],
+                [0.01, 0.02],
+                )
+        self.assertEqual(len(message.results.results), 3)
+
+    def test_edges_from_other_sources_are_kept(self):
+        from trapi_model.message import Message
+        message = Message('1.4', None)
+        message.knowledge_graph.add_edge('NCBIGene:3778', 'MONDO:0005148', [], 'biolink:related_to')
+        response = self.get_response(0.01, primary_source='infores:text-mining-provider-targeted')
+        message.update(response.knowledge_graph, response.results)
+        self.assertEqual(len(message.knowledge_graph.edges), 2)
+        merged_edge_id = message.results.results[0].edge_bindings['e0'][0].id
+        self.assertNotEqual(merged_edge_id, 'e0')
+        self.assertEqual(
+                message.knowledge_graph.edges[merged_edge_id].get_primary_source(),
+                'infores:text-mining-provider-targeted',
+                )
+        # The response itself is left untouched.
+        self.assertEqual(len(response.knowledge_graph.edges['e0'].attributes), 1)
+
+    def test_remapped_edge_bindings(self):
+        from trapi_model.message import Message
+        message = Message('1.4', None)
+        message.knowledge_graph.add_edge('NCBIGene:3778', 'MONDO:0005148', [], 'biolink:related_to')
+        response = self.get_response(0.01, primary_source='infores:text-mining-provider-targeted')
+        binding = response.results.results[0].edge_bindings['e0'][0]
+        binding.conflate_term = 'e0'
+        message.update(response.knowledge_graph, response.results)
+        merged_binding = message.results.results[0].edge_bindings['e0'][0]
+        self.assertNotEqual(merged_binding.id, 'e0')
+        self.assertEqual(merged_binding.conflate_term, 'e0')
+        binding.id = 'e1'
+        with self.assertRaises(ValueError):
+            message.update(response.knowledge_graph, response.results)
+
+class TestCompactElements(unittest.TestCase):
+    def test_slots_and_shared_context(self):
+        from trapi_model.knowledge_graph import KnowledgeGraph
+        kg = KnowledgeGraph.load('1.4', None, {
+            "nodes": {"MONDO:0005148": {"categories": ["biolink:Disease"]}},
+            "edges": {
+                "e0": {
+                    "subject": "MONDO:0005148",
+                    "object": "MONDO:0005148",
+                    "predicate": "biolink:related_to",
+                    "attributes": [{"attribute_type_id": "biolink:p_value", "value": 0.01}],
+                    "sources": [{"resource_id": "infores:kp", "resource_role": "primary_knowledge_source"}],
+                    },
+                },
+            }, validation_mode='off')
+        edge = kg.edges['e0']
+        for element in [kg.nodes['MONDO:0005148'], edge, edge.attributes[0], edge.sources[0]]:
+            self.assertFalse(hasattr(element, '__dict__'))
+            self.assertEqual(element.trapi_version, '1.4')
+        self.assertIs(edge.attributes[0]._context, edge.sources[0]._context)
+        self.assertIs(edge.subject, next(iter(kg.nodes)))
+        clone = edge.clone()
+        clone.set_validation_mode('eager')
+        self.assertEqual(clone.validation_mode, 'eager')
+        self.assertEqual(edge.validation_mode, 'off')
+
+
+class TestKnowledgeGraphIndexes(unittest.TestCase):
+    def setUp(self):
+        from trapi_model.knowledge_graph import KnowledgeGraph
+        self.kg = KnowledgeGraph.load('1.4', None, {
+            "nodes": {
+                "MONDO:0005148": {"categories": ["biolink:Disease"]},
+                "NCBIGene:3778": {"categories": ["biolink:Gene"]},
+                "NCBIGene:2475": {"categories": ["biolink:Gene"]},
+                },
+            "edges": {
+                "e0": {"subject": "NCBIGene:3778", "object": "MONDO:0005148", "predicate": "biolink:related_to"},
+                "e1": {"subject": "MONDO:0005148", "object": "NCBIGene:3778", "predicate": "biolink:related_to"},
+                "e2": {"subject": "NCBIGene:2475", "object": "MONDO:0005148", "predicate": "biolink:treats"},
+                },
+            })
+
+    def test_edge_lookups(self):
+        self.assertEqual(self.kg.edges_of('MONDO:0005148', 'in'), ['e0', 'e2'])
+        self.assertEqual(sorted(self.kg.edges_of('MONDO:0005148')), ['e0', 'e1', 'e2'])
+        self.assertEqual(self.kg.edges_between('NCBIGene:3778', 'MONDO:0005148'), ['e0', 'e1'])
+        self.assertEqual(self.kg.edges_between('NCBIGene:3778', 'MONDO:0005148', directed=True), ['e0'])
+        self.assertEqual(self.kg.edges_with_predicate('biolink:treats'), ['e2'])
+
+    def test_indexes_follow_changes(self):
+        self.assertEqual(self.kg.edges_of('NCBIGene:2475'), ['e2'])
+        edge_id = self.kg.add_edge('NCBIGene:2475', 'NCBIGene:3778', [], 'biolink:related_to')
+        self.assertEqual(self.kg.edges_of('NCBIGene:2475'), ['e2', edge_id])
+        self.assertIn(edge_id, self.kg.edges_with_predicate('biolink:related_to'))
+        del self.kg.edges['e2']
+        self.assertEqual(self.kg.edges_of('NCBIGene:2475'), [edge_id])
+
+    def test_indexes_follow_replaced_edges(self):
+        self.assertEqual(self.kg.edges_of('NCBIGene:2475', 'out'), ['e2'])
+        del self.kg.edges['e0']
+        self.kg.edge_counter = 0
+        # Reuses the id e0, so the number of edges is unchanged.
+        edge_id = self.kg.add_edge('MONDO:0005148', 'NCBIGene:2475', [], 'biolink:treats')
+        self.assertEqual(edge_id, 'e0')
+        self.assertEqual(self.kg.edges_of('NCBIGene:3778', 'out'), [])
+        self.assertEqual(sorted(self.kg.edges_of('MONDO:0005148', 'out')), ['e0', 'e1'])
+        self.assertEqual(self.kg.edges_between('NCBIGene:2475', 'MONDO:0005148'), ['e2', 'e0'])
+        self.assertEqual(sorted(self.kg.edges_with_predicate('biolink:treats')), ['e0', 'e2'])
+        self.kg.edges['e0'] = self.kg.edges['e1']
+        self.assertEqual(self.kg.edges_with_predicate('biolink:treats'), ['e2'])
+        self.assertIsNone(self.kg.find_edge('MONDO:0005148', 'biolink:treats', 'NCBIGene:2475'))
+
+    def test_edge_attribute_values(self):
+        import math
+        self.kg.add_attribute('biolink:p_value', 0.01, edge_id='e0')
+        self.kg.add_attribute('biolink:p_value', 0.5, edge_id='e2')
+        p_values = list(self.kg.get_edge_attribute_values('biolink:p_value'))
+        self.assertEqual(p_values[0], 0.01)
+        self.assertTrue(math.isnan(p_values[1]))
+        self.assertEqual(self.kg.edges_with_attribute('biolink:p_value', max_value=0.05), ['e0'])
+        self.kg.set_edge_attribute_values('biolink:score', ['e0', 'e1'], [0.9, 0.1])
+        self.kg.set_edge_attribute_values('biolink:score', ['e0'], [0.8])
+        self.assertEqual(list(self.kg.get_edge_attribute_values('biolink:score', ['e1', 'e0'])), [0.1, 0.8])
+        self.assertEqual(len(self.kg.edges['e0'].attributes), 2)
+
+    def test_edge_attribute_values_follow_edges(self):
+        import math
+        self.kg.add_attribute('biolink:p_value', 0.01, edge_id='e0')
+        self.assertEqual(self.kg.edges_with_attribute('biolink:p_value'), ['e0'])
+        self.kg.edges['e1'].add_attribute('biolink:p_value', 0.02)
+        p_values = list(self.kg.get_edge_attribute_values('biolink:p_value'))
+        self.assertEqual(p_values[:2], [0.01, 0.02])
+        self.assertTrue(math.isnan(p_values[2]))
+        self.assertEqual(self.kg.edges_with_attribute('biolink:p_value'), ['e0', 'e1'])
+        self.kg.edges['e0'].attributes = []
+        self.assertEqual(self.kg.edges_with_attribute('biolink:p_value'), ['e1'])
+
+    def test_find_nodes(self):
+        self.assertEqual(self.kg.find_nodes('biolink:Gene'), ['NCBIGene:3778', 'NCBIGene:2475'])
+        self.assertEqual(self.kg.find_nodes('biolink:Gene', ids=['NCBIGene:2475', 'MONDO:0005148']), ['NCBIGene:2475'])
+        self.assertEqual(self.kg.find_nodes('biolink:BiologicalEntity'), [])
+        self.assertEqual(len(self.kg.find_nodes('biolink:BiologicalEntity', descendants=True)), 3)
+        self.kg.add_node('NCBIGene:1017', 'CDK2', 'biolink:Gene')
+        self.assertEqual(self.kg.find_nodes('biolink:Gene', ids='NCBIGene:1017'), ['NCBIGene:1017'])
+
+    def test_query_graph_find_nodes(self):
+        from trapi_model.query_graph import QueryGraph
+        query_graph = QueryGraph('1.4')
+        n0 = query_graph.add_node(['NCBIGene:3778', 'NCBIGene:2475'], 'biolink:Gene')
+        n1 = query_graph.add_node(None, 'biolink:Disease')
+        self.assertEqual(query_graph.find_nodes(ids=['NCBIGene:3778']), [n0])
+        self.assertEqual(query_graph.find_nodes(categories='biolink:BiologicalEntity'), None)
+        self.assertEqual(query_graph.find_nodes(categories='biolink:BiologicalEntity', descendants=True), [n0, n1])
+        query_graph.nodes[n1].set_ids(['NCBIGene:3778'])
+        self.assertEqual(query_graph.find_nodes(ids='NCBIGene:3778'), [n0, n1])
+
+
+class TestColumnarKnowledgeGraph(unittest.TestCase):
+    def setUp(self):
+        self.kg_dict = {
+            "nodes": {
+                "MONDO:0005148": {"name": "type 2 diabetes mellitus", "categories": ["biolink:Disease"]},
+                "NCBIGene:3778": {"categories": ["biolink:Gene"]},
+                },
+            "edges": {
+                "e0": {
+                    "subject": "NCBIGene:3778",
+                    "object": "MONDO:0005148",
+                    "predicate": "biolink:related_to",
+                    "attributes": [
+                        {"attribute_type_id": "biolink:score", "value": 0.9},
+                        {"attribute_type_id": "biolink:publications", "value": ["PMID:1"]},
+                        ],
+                    "sources": [{"resource_id": "infores:kp", "resource_role": "primary_knowledge_source"}],
+                    },
+                "e1": {
+                    "subject": "MONDO:0005148",
+                    "object": "NCBIGene:3778",
+                    "predicate": "biolink:treats",
+                    "attributes": [{"attribute_type_id": "biolink:score", "value": 0.2}],
+                    },
+                },
+            }
+
+    def test_load_matches_knowledge_graph(self):
+        from trapi_model.columnar import ColumnarKnowledgeGraph
+        from trapi_model.knowledge_graph import KnowledgeGraph
+        kg = KnowledgeGraph.load('1.4', None, copy.deepcopy(self.kg_dict), validation_mode='off')
+        columnar_kg = ColumnarKnowledgeGraph.load('1.4', None, copy.deepcopy(self.kg_dict), validation_mode='off')
+        self.assertEqual(columnar_kg.to_dict(), kg.to_dict())
+        self.assertEqual(ColumnarKnowledgeGraph.from_knowledge_graph(kg).to_knowledge_graph().to_dict(), kg.to_dict())
+        self.assertEqual(len(columnar_kg.edges), 2)
+        self.assertEqual(columnar_kg.nodes['MONDO:0005148'].name, 'type 2 diabetes mellitus')
+        self.assertEqual(columnar_kg.edges['e0'].get_key(), kg.edges['e0'].get_key())
+
+    def test_filters(self):
+        from trapi_model.columnar import ColumnarKnowledgeGraph
+        columnar_kg = ColumnarKnowledgeGraph.load('1.4', None, self.kg_dict, validation_mode='off')
+        self.assertEqual(columnar_kg.edges_with_predicate('biolink:treats'), ['e1'])
+        self.assertEqual(columnar_kg.edges_with_attribute('biolink:score', min_value=0.5), ['e0'])
+        self.assertEqual(columnar_kg.edges_of('MONDO:0005148', 'in'), ['e0'])
+        self.assertEqual(columnar_kg.find_nodes('biolink:Gene'), ['NCBIGene:3778'])
+        edge_id = columnar_kg.add_edge('NCBIGene:3778', 'MONDO:0005148', None, 'biolink:treats')
+        columnar_kg.add_attribute('biolink:score', 0.7, edge_id=edge_id)
+        self.assertEqual(columnar_kg.edges_with_attribute('biolink:score', min_value=0.5), ['e0', edge_id])
+
+
+class TestColumnarResults(unittest.TestCase):
+    def setUp(self):
+        self.results = []
+        for i, score in enumerate([0.2, None, 0.9, 0.5, 0.9, 0.1]):
+            result = {
+                    "node_bindings": {"n0": [{"id": "NCBIGene:{}".format(i % 2)}], "n1": [{"id": "MONDO:{}".format(i)}]},
+                    "edge_bindings": {"e0": [{"id": "e{}".format(i)}]},
+                    }
+            if score is not None:
+                result["score"] = score
+            self.results.append(result)
+
+    def test_matches_results(self):
+        from trapi_model.columnar import ColumnarResults
+        from trapi_model.results import Results
+        results = Results.load('1.4', None, copy.deepcopy(self.results), validation_mode='off')
+        columnar_results = ColumnarResults.load('1.4', None, copy.deepcopy(self.results), validation_mode='off')
+        self.assertEqual(columnar_results.to_dict(), results.to_dict())
+        self.assertEqual(columnar_results.results[3].to_dict(), results.results[3].to_dict())
+        for n in range(len(self.results) + 1):
+            self.assertEqual(columnar_results.top_n(n).to_dict(), results.top_n(n).to_dict())
+        self.assertEqual(columnar_results.top_n(3).get_scores(), [0.9, 0.9, 0.5])
+        self.assertEqual(columnar_results.sort_by_score().get_scores()[-1], None)
+
+    def test_filter_by_kg_ids(self):
+        from trapi_model.columnar import ColumnarResults
+        columnar_results = ColumnarResults.load('1.4', None, self.results, validation_mode='off')
+        filtered = columnar_results.filter_by_kg_ids(['NCBIGene:1', 'e0'])
+        self.assertEqual([result.edge_bindings['e0'][0].id for result in filtered.results], ['e0', 'e1', 'e3', 'e5'])
+        self.assertEqual(len(columnar_results.filter_by_kg_ids(['NCBIGene:1'], qg_key='n1')), 0)
+
+    def test_query_max_results(self):
+        from trapi_model.query import Query
+        from trapi_model.columnar import ColumnarResults
+        query = Query.load('1.4', None, query={
+            "message": {"results": self.results},
+            "workflow": [{"id": "filter_results_top_n", "parameters": {"max_results": 2}}],
+            }, validation_mode='off', columnar_results=True)
+        self.assertIsInstance(query.message.results, ColumnarResults)
+        self.assertEqual(query.message.results.get_scores(), [0.9, 0.9])
+        query = Query.load('1.4', None, query={
+            "message": {"results": self.results},
+            "workflow": [{"id": "filter_results_top_n", "parameters": {"max_results": 3}}],
+            }, validation_mode='off')
+        self.assertEqual(len(query.message.results.results), 3)
+
+    def test_query_without_max_results(self):
+        from trapi_model.query import Query
+        query = Query.load('1.4', None, query={"message": {"results": self.results}}, validation_mode='off')
+        self.assertIsNone(query.max_results)
+        query.apply_max_results()
+        self.assertEqual(len(query.message.results.results), len(self.results))
+
+
+class TestMetaKnowledgeGraph(unittest.TestCase):
+    @staticmethod
+    def build_meta_kg(nodes, edges):
+        from trapi_model.meta_knowledge_graph import MetaKnowledgeGraph
+        meta_kg = MetaKnowledgeGraph('1.4', None, validation_mode='off')
+        for category, id_prefixes in nodes:
+            meta_kg.add_node(category, id_prefixes)
+        for q_subject, predicate, q_object in edges:
+            meta_kg.add_edge(q_subject, q_object, predicate)
+        return meta_kg
+
+    def test_merge(self):
+        from trapi_model.meta_knowledge_graph import merge_meta_knowledge_graphs
+        meta_kg_1 = self.build_meta_kg(
+                [('biolink:Gene', ['NCBIGene']), ('biolink:Disease', ['MONDO'])],
+                [('biolink:Gene', 'biolink:related_to', 'biolink:Disease')],
+                )
+        meta_kg_2 = self.build_meta_kg(
+                [('biolink:Gene', ['HGNC', 'NCBIGene'])],
+                [('biolink:Gene', 'biolink:related_to', 'biolink:Disease'), ('biolink:Disease', 'biolink:treats', 'biolink:Gene')],
+                )
+        merged = merge_meta_knowledge_graphs([meta_kg_1, meta_kg_2])
+        self.assertEqual(merged.to_dict()['nodes']['biolink:Gene'], {'id_prefixes': ['NCBIGene', 'HGNC']})
+        self.assertEqual(len(merged.edges), 2)
+        self.assertTrue(merged.has_edge('biolink:Disease', 'biolink:treats', 'biolink:Gene'))
+        self.assertFalse(merged.has_edge('biolink:Gene', 'biolink:treats', 'biolink:Disease'))
+        self.assertEqual(merged.get_edges(q_subject='biolink:Gene'), [merged.edges[0]])
+        self.assertEqual(len(set(meta_kg_1.edges + meta_kg_2.edges)), 2)
+        self.assertEqual(meta_kg_1.to_dict()['nodes']['biolink:Gene'], {'id_prefixes': ['NCBIGene']})
+
+    def test_indexes_follow_replaced_edges(self):
+        meta_kg = self.build_meta_kg(
+                [('biolink:Gene', ['NCBIGene'])],
+                [('biolink:Gene', 'biolink:treats', 'biolink:Disease')],
+                )
+        self.assertTrue(meta_kg.has_edge('biolink:Gene', 'biolink:treats', 'biolink:Disease'))
+        other_meta_kg = self.build_meta_kg([], [('biolink:Disease', 'biolink:related_to', 'biolink:Gene')])
+        meta_kg.edges[0] = other_meta_kg.edges[0]
+        self.assertFalse(meta_kg.has_edge('biolink:Gene', 'biolink:treats', 'biolink:Disease'))
+        self.assertEqual(meta_kg.find_edges('biolink:Disease'), [meta_kg.edges[0]])
+        with self.assertRaises(AttributeError):
+            meta_kg.edges[0].predicate = 'biolink:treats'
+
+    def test_merge_stats(self):
+        from trapi_model.meta_knowledge_graph import merge_meta_knowledge_graphs
+        meta_kg_1 = self.build_meta_kg(
+                [('biolink:Gene', ['NCBIGene'])],
+                [('biolink:Gene', 'biolink:related_to', 'biolink:Disease')],
+                )
+        meta_kg_2 = {
+                "nodes": {"biolink:Gene": {"id_prefixes": ["NCBIGene", "HGNC"]}},
+                "edges": [{"subject": "biolink:Gene", "predicate": "biolink:related_to", "object": "biolink:Disease"}],
+                }
+        merged, stats = merge_meta_knowledge_graphs([meta_kg_1, meta_kg_2], return_stats=True)
+        self.assertEqual(len(merged.edges), 1)
+        self.assertEqual(stats.num_inputs, 2)
+        self.assertEqual(stats.num_duplicate_edges, 1)
+        self.assertEqual(stats.num_duplicate_id_prefixes, 1)
+
+    def test_supports(self):
+        from trapi_model.query_graph import QueryGraph
+        meta_kg = self.build_meta_kg(
+                [('biolink:Gene', ['NCBIGene']), ('biolink:Disease', ['MONDO'])],
+                [('biolink:Gene', 'biolink:treats', 'biolink:Disease')],
+                )
+        meta_edge = meta_kg.edges[0]
+        self.assertEqual(meta_kg.find_edges('biolink:NamedThing', 'biolink:related_to', 'biolink:Disease'), [meta_edge])
+        self.assertEqual(meta_kg.find_edges('biolink:Disease', 'biolink:treated_by', 'biolink:Gene'), [meta_edge])
+        self.assertEqual(meta_kg.find_edges('biolink:Disease', 'biolink:treats', 'biolink:Gene'), [])
+        query_graph = QueryGraph('1.4', None, validation_mode='off')
+        n0 = query_graph.add_node(None, 'biolink:Disease')
+        n1 = query_graph.add_node(None, 'biolink:Gene')
+        e0 = query_graph.add_edge(n0, n1, 'biolink:treats')
+        self.assertFalse(meta_kg.supports(query_graph))
+        meta_kg.add_edge('biolink:Disease', 'biolink:Gene', 'biolink:treats')
+        self.assertTrue(meta_kg.supports(query_graph))
+        self.assertEqual(meta_kg.match_query_graph(query_graph), {e0: [meta_kg.edges[1]]})
+
+    def test_cache(self):
+        import os
+        import json
+        import tempfile
+        from trapi_model.meta_knowledge_graph import MetaKnowledgeGraph
+        from trapi_model.meta_knowledge_graph_cache import load_cache, update_cache
+        meta_kg_json = {
+                "nodes": {"biolink:Gene": {"id_prefixes": ["NCBIGene"]}, "biolink:Disease": {"id_prefixes": ["MONDO"]}},
+                "edges": [{"subject": "biolink:Gene", "predicate": "biolink:treats", "object": "biolink:Disease"}],
+                }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, 'meta_knowledge_graph.json')
+            cache_filename = os.path.join(tmp_dir, 'meta_knowledge_graph.cache')
+            with open(filename, 'w') as json_file:
+                json.dump(meta_kg_json, json_file)
+            meta_kg = MetaKnowledgeGraph.load('1.4', None, filename=filename, cache_filename=cache_filename)
+            cached_meta_kg = MetaKnowledgeGraph.load('1.4', None, filename=filename, cache_filename=cache_filename)
+            self.assertEqual(cached_meta_kg.to_dict(), meta_kg.to_dict())
+            cache = load_cache(cache_filename)
+            self.assertTrue(cache.has_edge('biolink:Gene', 'biolink:treats', 'biolink:Disease'))
+            self.assertIsNone(load_cache(cache_filename, source_hash='0' * 64))
+            update_cache(
+                    cache_filename,
+                    added_edges=[('biolink:Gene', 'biolink:related_to', 'biolink:Disease')],
+                    removed_edges=meta_kg.edges,
+                    nodes={'biolink:Gene': ['HGNC']},
+                    )
+            cache = load_cache(cache_filename)
+            self.assertEqual(cache.get_edges(), [('biolink:Gene', 'biolink:related_to', 'biolink:Disease')])
+            self.assertEqual(cache.get_nodes()['biolink:Gene'], ['NCBIGene', 'HGNC'])
+            # The updated cache no longer matches the JSON file.
+            self.assertIsNone(cache.source_hash)
+            reloaded_meta_kg = MetaKnowledgeGraph.load('1.4', None, filename=filename, cache_filename=cache_filename)
+            self.assertEqual(reloaded_meta_kg.to_dict(), meta_kg.to_dict())
+            update_cache(cache_filename, removed_edges=[('Gene', 'treats', 'Disease')])
+            self.assertEqual(load_cache(cache_filename).get_edges(), [])
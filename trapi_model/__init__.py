@@ -9,8 +9,27 @@ import importlib
 
 # Set debug mode if you don't want to load bmt
 BIOLINK_DEBUG = False
+# Load Biolink from a precompiled snapshot when one is available
+BIOLINK_SNAPSHOT = True
 BIOLINK_VERSION = 'latest'
 
+# Validation policies for TRAPI components:
+#   eager - every component validates itself when built, loaded or modified.
+#   deferred - components are built without validation and a single schema
+#       pass is run by the outermost load or by an explicit validate() call.
+#   off - no schema validation unless validate() is called explicitly.
+VALIDATION_EAGER = 'eager'
+VALIDATION_DEFERRED = 'deferred'
+VALIDATION_OFF = 'off'
+VALIDATION_MODES = [VALIDATION_EAGER, VALIDATION_DEFERRED, VALIDATION_OFF]
+VALIDATION_MODE = VALIDATION_EAGER
+# JSON backend used for loading and dumping, see trapi_model.json_backend.
+# None picks the fastest installed one.
+JSON_BACKEND = None
+# Intern identifiers such as node ids, attribute type ids and resource ids
+# repeated across knowledge graph elements.
+INTERN_STRINGS = True
+
 def set_biolink_version(biolink_version):
     global BIOLINK_VERSION
     if biolink_version == BIOLINK_VERSION:
@@ -43,6 +62,44 @@ def set_biolink_version(biolink_version):
                     )
                 )
 
+def init_worker(biolink_version):
+    """ Sets up an executor worker to use the caller's Biolink version, as
+    spawned workers start on the default one.
+    """
+    if BIOLINK_VERSION != biolink_version:
+        set_biolink_version(biolink_version)
+
 def set_biolink_debug_mode(option=False):
     global BIOLINK_DEBUG
     BIOLINK_DEBUG = option
+
+def set_biolink_snapshot_mode(option=True):
+    global BIOLINK_SNAPSHOT
+    BIOLINK_SNAPSHOT = option
+
+def set_string_interning_mode(option=True):
+    global INTERN_STRINGS
+    INTERN_STRINGS = option
+
+def get_validation_mode(validation_mode=None):
+    if validation_mode is None:
+        return VALIDATION_MODE
+    if validation_mode not in VALIDATION_MODES:
+        raise ValueError(
+                'Unknown validation mode: {}. Supported modes include: {}'.format(
+                    validation_mode,
+                    VALIDATION_MODES,
+                    )
+                )
+    return validation_mode
+
+def set_validation_mode(validation_mode=VALIDATION_EAGER):
+    global VALIDATION_MODE
+    VALIDATION_MODE = get_validation_mode(validation_mode)
+
+def set_json_backend(json_backend=None):
+    global JSON_BACKEND
+    from trapi_model.json_backend import get_json_backend
+    # Fail here rather than on the first load if the backend is unusable.
+    get_json_backend(json_backend)
+    JSON_BACKEND = json_backend
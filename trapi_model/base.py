@@ -2,20 +2,171 @@ DEBUG = False
 
 import json
 import os
-from trapi_model.exceptions import UnsupportedBiolinkVersion, UnknownBiolinkEntity
+import sys
+import copy
+import trapi_model
+from trapi_model import json_backend
+from trapi_model.json_stream import iter_encode, write_encoded
+from trapi_model.exceptions import UnsupportedBiolinkVersion, UnknownBiolinkEntity, InvalidTrapiComponent
 
 
 class TrapiBaseClass:
-    def __init__(self, trapi_version, biolink_version):
+    # Subclasses without __slots__ keep a __dict__ as usual.
+    __slots__ = ()
+
+    def __init__(self, trapi_version, biolink_version, validation_mode=None):
         self.trapi_version = trapi_version
         self.biolink_version = biolink_version
+        self.validation_mode = trapi_model.get_validation_mode(validation_mode)
+
+    def set_validation_mode(self, validation_mode):
+        self.validation_mode = trapi_model.get_validation_mode(validation_mode)
+
+    def check_component(self, trapi_component):
+        """ Validates the component against its schema if validation is eager.
+        """
+        if self.validation_mode != trapi_model.VALIDATION_EAGER:
+            return
+        self._raise_if_invalid(trapi_component)
+
+    def check_loaded_component(self, trapi_component):
+        """ Validates a freshly loaded component unless validation is off.
+        """
+        if self.validation_mode == trapi_model.VALIDATION_OFF:
+            return
+        self._raise_if_invalid(trapi_component)
+
+    def clone(self):
+        """ Returns a structural copy of the component.
+
+        Immutable values such as strings and BiolinkEntities are shared and
+        mutable containers are copied, without a to_dict and load round trip
+        or any validation. Components holding containers extend this.
+        """
+        return copy.copy(self)
+
+    def _raise_if_invalid(self, trapi_component):
+        valid, message = self.validate()
+        if not valid:
+            raise InvalidTrapiComponent(self.trapi_version, trapi_component, message)
+
+    def to_json_stream(self):
+        """ Value encoded by write_json. Large components return a
+        JSONObjectStream or JSONArrayStream so their elements are encoded one
+        at a time instead of through a single to_dict.
+        """
+        return self.to_dict()
+
+    def iter_json(self, indent=None):
+        """ Yields the JSON encoding of the component in chunks.
+        """
+        return iter_encode(self, indent)
 
-    def json(self, filename=None):
+    def write_json(self, fp, indent=None):
+        """ Streams the JSON encoding of the component to a file object or
+        socket. Output is compact unless an indent is given.
+        """
+        write_encoded(fp, self, indent)
+
+    def json(self, filename=None, indent=2, binary=False):
+        """ Returns the JSON encoding of the component, as utf-8 bytes if
+        binary is set, or streams it to filename.
+        """
         if filename is None:
-            return json.dumps(self.to_dict(), indent=2)
+            if binary:
+                return json_backend.dumpb(self.to_dict(), indent)
+            return json_backend.dumps(self.to_dict(), indent)
         else:
-            with open(filename, 'w') as json_file:
-                json.dump(self.to_dict(), json_file, indent=2)
+            with open(filename, 'wb' if binary else 'w') as json_file:
+                self.write_json(json_file, indent=indent)
 
     def __str__(self):
-        return json.dumps(self.to_dict(), indent=2)
+        return json_backend.dumps(self.to_dict(), indent=2)
+
+
+# Contexts keyed by (trapi version, biolink version, validation mode).
+_CONTEXTS = {}
+
+
+class TrapiContext:
+    """ Versions and validation mode shared by compact components.
+    Contexts are never modified; components switch to another one instead.
+    """
+    __slots__ = ('trapi_version', 'biolink_version', 'validation_mode')
+
+    def __init__(self, trapi_version, biolink_version, validation_mode):
+        self.trapi_version = trapi_version
+        self.biolink_version = biolink_version
+        self.validation_mode = validation_mode
+
+
+def get_context(trapi_version, biolink_version, validation_mode=None):
+    """ Returns the shared TrapiContext for these versions and validation mode.
+    """
+    validation_mode = trapi_model.get_validation_mode(validation_mode)
+    key = (trapi_version, biolink_version, validation_mode)
+    context = _CONTEXTS.get(key)
+    if context is None:
+        context = TrapiContext(trapi_version, biolink_version, validation_mode)
+        _CONTEXTS[key] = context
+    return context
+
+
+class CompactTrapiClass(TrapiBaseClass):
+    """ Base class of the components a knowledge graph holds millions of.
+
+    Subclasses declare __slots__ so instances have no __dict__, and the
+    versions and validation mode live in one TrapiContext shared with
+    every other component built with the same ones.
+    """
+    __slots__ = ('_context',)
+
+    def __init__(self, trapi_version, biolink_version, validation_mode=None):
+        self._context = get_context(trapi_version, biolink_version, validation_mode)
+
+    @property
+    def trapi_version(self):
+        return self._context.trapi_version
+
+    @trapi_version.setter
+    def trapi_version(self, trapi_version):
+        context = self._context
+        self._context = get_context(trapi_version, context.biolink_version, context.validation_mode)
+
+    @property
+    def biolink_version(self):
+        return self._context.biolink_version
+
+    @biolink_version.setter
+    def biolink_version(self, biolink_version):
+        context = self._context
+        self._context = get_context(context.trapi_version, biolink_version, context.validation_mode)
+
+    @property
+    def validation_mode(self):
+        return self._context.validation_mode
+
+    @validation_mode.setter
+    def validation_mode(self, validation_mode):
+        context = self._context
+        self._context = get_context(context.trapi_version, context.biolink_version, validation_mode)
+
+
+def intern_string(value):
+    """ Returns the interned copy of a str when string interning is on, so
+    identifiers repeated across a graph are stored once.
+    """
+    if trapi_model.INTERN_STRINGS and type(value) is str:
+        return sys.intern(value)
+    return value
+
+def get_child_validation_mode(validation_mode=None):
+    """ Validation mode used to load the sub components of a component.
+
+    In deferred mode sub components are loaded without validation and the
+    outermost load runs a single schema pass over everything it loaded.
+    """
+    validation_mode = trapi_model.get_validation_mode(validation_mode)
+    if validation_mode == trapi_model.VALIDATION_DEFERRED:
+        return trapi_model.VALIDATION_OFF
+    return validation_mode
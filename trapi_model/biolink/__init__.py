@@ -2,8 +2,10 @@ import logging
 import json
 import os
 
+import trapi_model
 from trapi_model import BIOLINK_DEBUG, BIOLINK_VERSION
 from trapi_model.data import biolink_schemas
+from trapi_model.biolink.snapshot import BiolinkSnapshot, get_snapshot_path
 from trapi_model.exceptions import UnsupportedBiolinkVersion, UnknownBiolinkEntity
 
 logger = logging.getLogger(__name__)
@@ -16,6 +18,12 @@ def set_toolkit(biolink_version):
     global BIOLINK_VERSION
     global TOOLKIT
     BIOLINK_VERSION = biolink_version
+    # Prefer a precompiled snapshot, which avoids importing bmt altogether.
+    snapshot_path = get_snapshot_path(BIOLINK_VERSION)
+    if trapi_model.BIOLINK_SNAPSHOT and os.path.exists(snapshot_path):
+        logger.info('Loading Biolink Version {} from snapshot.'.format(BIOLINK_VERSION))
+        TOOLKIT = BiolinkSnapshot(snapshot_path)
+        return
     from bmt import Toolkit
     if BIOLINK_VERSION == 'latest':
         logger.info('Using latest PyPy Biolink version.')
@@ -49,20 +57,17 @@ class BiolinkEntity:
             ancestors=None,
             descendants=None,
             ):
-        if biolink_version is None:
-            self.biolink_version = BIOLINK_VERSION
-        elif biolink_version != BIOLINK_VERSION:
-            raise ValueError('Mismatch between biolink version. You specified {} \
-                    but {} is already loaded. Please reload library.'.format(
-                        biolink_version,
-                        BIOLINK_VERSION,
-                        )
-                    )
+        check_biolink_version(biolink_version)
+        self.biolink_version = BIOLINK_VERSION
         self.passed_name = name
         self.is_predicate = is_predicate
-        self.ancestors = ancestors
-        self.descendants = descendants
         self.inverse = inverse
+        # Ancestors and descendants are only walked when first requested.
+        self._ancestors = ancestors
+        self._descendants = descendants
+        self._ancestor_entities = None
+        self._descendant_entities = None
+        self._curie = None
         if not BIOLINK_DEBUG:
             self.element = TOOLKIT.get_element(name)
             if self.element is None:
@@ -70,8 +75,24 @@ class BiolinkEntity:
             self.is_predicate = TOOLKIT.is_predicate(self.element.name)
             if TOOLKIT.has_inverse(self.element.name):
                 self.inverse = self.element.inverse
-            self.ancestors = TOOLKIT.get_ancestors(self.element.name)
-            self.descendants = TOOLKIT.get_descendants(self.element.name)
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, '_frozen', False) and not name.startswith('_'):
+            raise AttributeError('BiolinkEntity is immutable, can not set {}.'.format(name))
+        super().__setattr__(name, value)
+
+    @property
+    def ancestors(self):
+        if self._ancestors is None and not BIOLINK_DEBUG:
+            self._ancestors = TOOLKIT.get_ancestors(self.element.name)
+        return self._ancestors
+
+    @property
+    def descendants(self):
+        if self._descendants is None and not BIOLINK_DEBUG:
+            self._descendants = TOOLKIT.get_descendants(self.element.name)
+        return self._descendants
 
     def get_inverse(self):
         if BIOLINK_DEBUG:
@@ -81,7 +102,7 @@ class BiolinkEntity:
             else:
                 return None
         if self.inverse is not None:
-            return BiolinkEntity(self.inverse)
+            return get_entity(self.inverse)
         return self.inverse
 
     def get_curie(self, is_predicate=False):
@@ -92,17 +113,19 @@ class BiolinkEntity:
                 if is_predicate or self.is_predicate:
                     return 'biolink:' + self.passed_name.replace(' ', '_')
                 return 'biolink:' + ''.join(x for x in self.passed_name.title() if not x.isspace())
+        if self._curie is not None:
+            return self._curie
         if self.is_predicate or hasattr(self.element, 'slot_uri'):
             #return self.element.slot_uri
             name = self.element.name.split(' ')
             name = 'biolink:' + '_'.join(name)
-            return name
         else:
             #return self.element.class_uri
             name = self.element.name.split(' ')
             name = [n.capitalize() for n in name]
             name = 'biolink:'+ ''.join(name)
-            return name
+        self._curie = name
+        return name
 
     def get_ancestors(self):
         if BIOLINK_DEBUG:
@@ -121,13 +144,11 @@ class BiolinkEntity:
             return ancestors
         elif self.ancestors is None:
             return self.ancestors
-        else:
-            ancestors = [] 
-            for ancestor in self.ancestors:
-                if ancestor == self.element.name:
-                    continue
-                ancestors.append(BiolinkEntity(ancestor))
-            return ancestors
+        if self._ancestor_entities is None:
+            self._ancestor_entities = [
+                    get_entity(ancestor) for ancestor in self.ancestors if ancestor != self.element.name
+                    ]
+        return list(self._ancestor_entities)
 
     def get_descendants(self):
         if BIOLINK_DEBUG:
@@ -146,13 +167,11 @@ class BiolinkEntity:
             return descendants
         elif self.descendants is None:
             return self.descendants
-        else:
-            descendants = [] 
-            for descendant in self.descendants:
-                if descendant == self.element.name:
-                    continue
-                descendants.append(BiolinkEntity(descendant))
-            return descendants
+        if self._descendant_entities is None:
+            self._descendant_entities = [
+                    get_entity(descendant) for descendant in self.descendants if descendant != self.element.name
+                    ]
+        return list(self._descendant_entities)
 
     def _depreciate_get_toolkit(self, biolink_version):
         if biolink_version is None:
@@ -161,8 +180,22 @@ class BiolinkEntity:
             raise UnsupportedBiolinkVersion(biolink_version)
         else:
             return TOOLKITS[biolink_version]
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        # Entities are immutable and shared, so copies reuse the same instance.
+        return self
+
+    def __reduce__(self):
+        if BIOLINK_DEBUG:
+            return (BiolinkEntity, (self.passed_name, None, self.is_predicate, self.inverse, self._ancestors, self._descendants))
+        return (get_entity, (self.passed_name,))
     
     def __eq__(self, other):
+        if self is other:
+            return True
         if self.get_curie() == other.get_curie():
             return True
         return False
@@ -174,6 +207,41 @@ class BiolinkEntity:
         return hash(self.get_curie())
 
 
+# Interned entities keyed by (biolink version, name).
+_ENTITIES = {}
+
+def check_biolink_version(biolink_version):
+    if biolink_version is not None and biolink_version != BIOLINK_VERSION:
+        raise ValueError('Mismatch between biolink version. You specified {} \
+                but {} is already loaded. Please reload library.'.format(
+                    biolink_version,
+                    BIOLINK_VERSION,
+                    )
+                )
+
+def get_entity(name, biolink_version=None):
+    """ Returns the shared BiolinkEntity for a Biolink element name or curie.
+
+    Every name that resolves to the same element maps to one instance, so the
+    toolkit is only consulted the first time an element is seen.
+    """
+    if type(name) is BiolinkEntity:
+        return name
+    # Checked up front, as a cached entity is always of the loaded version.
+    check_biolink_version(biolink_version)
+    key = (BIOLINK_VERSION, name)
+    entity = _ENTITIES.get(key)
+    if entity is not None:
+        return entity
+    entity = BiolinkEntity(name, biolink_version=biolink_version)
+    if not BIOLINK_DEBUG:
+        # Alias every spelling of an element to the same instance.
+        element_key = (BIOLINK_VERSION, entity.element.name)
+        entity = _ENTITIES.setdefault(element_key, entity)
+    _ENTITIES[key] = entity
+    return entity
+
+
 ##### Initialization
 
 # Load appropriate BMT version.
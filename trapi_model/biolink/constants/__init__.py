@@ -1,3 +1,9 @@
+""" Biolink constants.
+
+BIOLINK_<NAME> constants hold Biolink element names and BIOLINK_<NAME>_ENTITY
+constants hold the matching BiolinkEntity. Constants are built the first time
+they are accessed (PEP 562) and cached on the module afterwards.
+"""
 import os
 import sys
 import logging
@@ -6,83 +12,93 @@ import ast
 
 from trapi_model import BIOLINK_DEBUG
 from trapi_model.exceptions import UnknownBiolinkEntity
-from trapi_model.biolink import BiolinkEntity
+from trapi_model.biolink import BiolinkEntity, get_entity
+import trapi_model.biolink
 
 logger = logging.getLogger(__name__)
 
-if BIOLINK_DEBUG:
-    # Read in the debug constants file
-    CONSTANTS_DIR = os.path.dirname(os.path.abspath(__file__))
-    DEBUG_CONSTANTS_FILE = os.path.join(CONSTANTS_DIR, 'debug_constants.csv')
-    if os.path.exists(DEBUG_CONSTANTS_FILE):
-        with open(DEBUG_CONSTANTS_FILE, 'r') as csv_file:
-            reader = csv.reader(csv_file)
-            for i, row in enumerate(reader):
-                if i == 0:
-                    continue
-                name = row[0]
-                is_predicate = ast.literal_eval(row[1])
-                inverse = row[2]
-                if len(inverse) == 0:
-                    inverse = None
-                ancestors = row[3:]
-                if len(ancestors) == 0:
-                    ancestors = None
-                biolink_entity = BiolinkEntity(
-                        name,
-                        is_predicate=is_predicate,
-                        inverse=inverse,
-                        ancestors=ancestors,
-                        )
-                # Now format constant name
-                formatted_name = 'BIOLINK_' + '_'.join(name.strip().upper().split(' '))
-                biolink_entity_name = formatted_name + '_ENTITY'
-                # set the constants and entities
-                setattr(
-                        sys.modules[__name__],
-                        formatted_name,
-                        name,
-                        )
-                setattr(
-                        sys.modules[__name__],
-                        biolink_entity_name,
-                        biolink_entity,
-                        )
-    else:
+CONSTANTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEBUG_CONSTANTS_FILE = os.path.join(CONSTANTS_DIR, 'debug_constants.csv')
+
+# Formatted constant name -> Biolink element name, built on first access.
+_CONSTANT_NAMES = None
+# Biolink element name -> debug constants file row, only used in debug mode.
+_DEBUG_ROWS = None
+
+
+def _format_constant_name(name):
+    return 'BIOLINK_' + '_'.join(name.strip().upper().split(' '))
+
+def _get_debug_rows():
+    global _DEBUG_ROWS
+    if _DEBUG_ROWS is not None:
+        return _DEBUG_ROWS
+    if not os.path.exists(DEBUG_CONSTANTS_FILE):
         raise FileNotFoundError('No debug biolink constants found in {}. \
-                Please add a debug_constants.txt file to this directory to use this feature.')
-else:
-    from trapi_model.biolink import TOOLKIT
-    # Will load all Biolink Entities
-    for constant_name in TOOLKIT.get_all_elements():
-        #print(constant_name)
-        try:
-            biolink_entity = BiolinkEntity(constant_name)
-        except UnknownBiolinkEntity:
-            logger.warning('Could not get element for {}.'.format(constant_name))
-        except ValueError as ex:
-            logger.warning(str(ex))
-        # Now format constant name
-        formatted_name = 'BIOLINK_' + '_'.join(constant_name.strip().upper().split(' '))
-        biolink_entity_name = formatted_name + '_ENTITY'
-        # set the constants and entities
-        try:
-            setattr(
-                    sys.modules[__name__],
-                    formatted_name,
-                    constant_name,
-                    )
-            setattr(
-                    sys.modules[__name__],
-                    biolink_entity_name,
-                    biolink_entity,
-                    )
-        except ValueError as ex:
-            logger.warning(str(ex))
+                Please add a debug_constants.txt file to this directory to use this feature.'.format(CONSTANTS_DIR))
+    rows = {}
+    with open(DEBUG_CONSTANTS_FILE, 'r') as csv_file:
+        reader = csv.reader(csv_file)
+        for i, row in enumerate(reader):
+            if i == 0:
+                continue
+            rows[row[0]] = row
+    _DEBUG_ROWS = rows
+    return _DEBUG_ROWS
+
+def _get_constant_names():
+    global _CONSTANT_NAMES
+    if _CONSTANT_NAMES is not None:
+        return _CONSTANT_NAMES
+    if BIOLINK_DEBUG:
+        names = _get_debug_rows().keys()
+    else:
+        names = trapi_model.biolink.TOOLKIT.get_all_elements()
+    _CONSTANT_NAMES = {_format_constant_name(name): name for name in names}
+    return _CONSTANT_NAMES
+
+def _build_debug_entity(name):
+    row = _get_debug_rows()[name]
+    is_predicate = ast.literal_eval(row[1])
+    inverse = row[2]
+    if len(inverse) == 0:
+        inverse = None
+    ancestors = row[3:]
+    if len(ancestors) == 0:
+        ancestors = None
+    return BiolinkEntity(
+            name,
+            is_predicate=is_predicate,
+            inverse=inverse,
+            ancestors=ancestors,
+            )
+
+def __getattr__(attribute):
+    if not attribute.startswith('BIOLINK_'):
+        raise AttributeError('module {} has no attribute {}'.format(__name__, attribute))
+    constant_names = _get_constant_names()
+    if attribute in constant_names:
+        value = constant_names[attribute]
+    elif attribute.endswith('_ENTITY') and attribute[:-len('_ENTITY')] in constant_names:
+        name = constant_names[attribute[:-len('_ENTITY')]]
+        if BIOLINK_DEBUG:
+            value = _build_debug_entity(name)
+        else:
+            value = get_entity(name)
+    else:
+        raise AttributeError('module {} has no attribute {}'.format(__name__, attribute))
+    # Cache on the module so later lookups skip __getattr__.
+    setattr(sys.modules[__name__], attribute, value)
+    return value
+
+def __dir__():
+    constant_names = list(_get_constant_names())
+    entity_names = [constant_name + '_ENTITY' for constant_name in constant_names]
+    return sorted(set(globals()) | set(constant_names) | set(entity_names))
 
 def get_biolink_entity(name):
     if not BIOLINK_DEBUG:
-        return BiolinkEntity(name)
+        return get_entity(name)
     if 'biolink:' in name:
         parsed_name = name.split(':')[-1]
         # Check if its a predicate or class based on capitalization.
@@ -102,10 +118,9 @@ def get_biolink_entity(name):
             formatted_name = 'BIOLINK_' + '_'.join(x.upper() for x in name_list) + '_ENTITY'
     else:
         # Just convert spaced out biolink compliant string (that has the spaces).
-        formatted_name = 'BIOLINK_' + '_'.join(name.strip().upper().split(' ')) + '_ENTITY'
-    # Try to return formatted name
+        formatted_name = _format_constant_name(name) + '_ENTITY'
+    # Resolved lazily through the module __getattr__.
     return getattr(
             sys.modules[__name__],
             formatted_name,
             )
-
@@ -0,0 +1,185 @@
+"""
+Biolink Hierarchy Index
+
+Maps every Biolink element of a version to an integer id and stores the
+ancestor and descendant closures of each element as bitsets (python ints),
+so subsumption checks are a single bit test and set operations over the
+hierarchy are word-wise ands and ors.
+"""
+import threading
+
+import trapi_model.biolink
+from trapi_model.biolink.snapshot import BiolinkSnapshot, format_curie
+from trapi_model.exceptions import UnknownBiolinkEntity
+
+# Hierarchy indexes keyed by biolink version.
+_HIERARCHIES = {}
+_HIERARCHIES_LOCK = threading.Lock()
+
+
+def get_hierarchy(biolink_version=None):
+    """ Returns the hierarchy index of the loaded Biolink version, building it once.
+    """
+    if biolink_version is None:
+        biolink_version = trapi_model.biolink.BIOLINK_VERSION
+    hierarchy = _HIERARCHIES.get(biolink_version)
+    if hierarchy is not None:
+        return hierarchy
+    with _HIERARCHIES_LOCK:
+        hierarchy = _HIERARCHIES.get(biolink_version)
+        if hierarchy is None:
+            if biolink_version != trapi_model.biolink.BIOLINK_VERSION:
+                raise ValueError('Biolink version {} is not loaded, {} is.'.format(
+                    biolink_version,
+                    trapi_model.biolink.BIOLINK_VERSION,
+                    ))
+            toolkit = getattr(trapi_model.biolink, 'TOOLKIT', None)
+            if toolkit is None:
+                raise ValueError('The Biolink hierarchy needs a toolkit or snapshot and is not available in debug mode.')
+            hierarchy = BiolinkHierarchy.from_toolkit(toolkit)
+            _HIERARCHIES[biolink_version] = hierarchy
+    return hierarchy
+
+def iter_bits(bits):
+    """ Yields the ids set in a bitset, lowest first.
+    """
+    while bits:
+        low_bit = bits & -bits
+        yield low_bit.bit_length() - 1
+        bits ^= low_bit
+
+
+class BiolinkHierarchy:
+    def __init__(self, names, ancestors, is_slot=None):
+        """ Builds the index from element names and their ancestor closures.
+
+        ancestors[i] lists the ancestor ids of element i, itself included.
+        is_slot[i] selects the curie format of element i; both formats are
+        accepted when it is not given.
+        """
+        self.names = list(names)
+        self.ancestor_bits = [0] * len(self.names)
+        self.descendant_bits = [0] * len(self.names)
+        for element_id, ancestor_ids in enumerate(ancestors):
+            bits = 1 << element_id
+            for ancestor_id in ancestor_ids:
+                bits |= 1 << ancestor_id
+                self.descendant_bits[ancestor_id] |= 1 << element_id
+            self.ancestor_bits[element_id] = bits
+            self.descendant_bits[element_id] |= 1 << element_id
+        # Depth in the hierarchy, used to pick the most specific ancestor.
+        self.depths = [bin(bits).count('1') for bits in self.ancestor_bits]
+        self._curies = [None] * len(self.names)
+        self._ids = {}
+        for element_id, name in enumerate(self.names):
+            if is_slot is None or is_slot[element_id]:
+                self._ids.setdefault(format_curie(name, True), element_id)
+            if is_slot is None or not is_slot[element_id]:
+                self._ids.setdefault(format_curie(name, False), element_id)
+            self._ids.setdefault('_'.join(name.split(' ')), element_id)
+        for element_id, name in enumerate(self.names):
+            self._ids[name] = element_id
+
+    @staticmethod
+    def from_toolkit(toolkit):
+        if isinstance(toolkit, BiolinkSnapshot):
+            return BiolinkHierarchy(
+                    toolkit.get_all_elements(),
+                    [toolkit.get_ancestor_ids(i) for i in range(toolkit.num_elements)],
+                    [toolkit.is_slot_id(i) for i in range(toolkit.num_elements)],
+                    )
+        names = list(toolkit.get_all_elements())
+        ids = {name: i for i, name in enumerate(names)}
+        ancestors = []
+        for name in list(names):
+            ancestor_ids = []
+            for ancestor in toolkit.get_ancestors(name):
+                if ancestor not in ids:
+                    ids[ancestor] = len(names)
+                    names.append(ancestor)
+                ancestor_ids.append(ids[ancestor])
+            ancestors.append(ancestor_ids)
+        ancestors.extend([] for _ in range(len(names) - len(ancestors)))
+        return BiolinkHierarchy(names, ancestors)
+
+    def get_id(self, element):
+        """ Returns the id of a BiolinkEntity, curie or element name.
+        """
+        if type(element) is int:
+            return element
+        if type(element) is str:
+            element_id = self._ids.get(element)
+            if element_id is not None:
+                return element_id
+            # Fall back to the toolkit for other spellings of the name.
+            element = trapi_model.biolink.get_entity(element)
+        element_id = self._ids.get(element.get_curie())
+        if element_id is None:
+            element_id = self._ids.get(element.passed_name)
+        if element_id is None:
+            raise UnknownBiolinkEntity(element.passed_name)
+        # Remember the spelling for next time.
+        self._ids[element.passed_name] = element_id
+        return element_id
+
+    def get_name(self, element_id):
+        return self.names[element_id]
+
+    def get_entity(self, element_id):
+        return trapi_model.biolink.get_entity(self.names[element_id])
+
+    def get_curie(self, element_id):
+        curie = self._curies[element_id]
+        if curie is None:
+            curie = self._curies[element_id] = self.get_entity(element_id).get_curie()
+        return curie
+
+    def get_curies(self, bits):
+        """ Returns the curies of the elements set in a bitset.
+        """
+        return [self.get_curie(element_id) for element_id in iter_bits(bits)]
+
+    def get_ancestor_bits(self, element):
+        return self.ancestor_bits[self.get_id(element)]
+
+    def get_descendant_bits(self, element):
+        return self.descendant_bits[self.get_id(element)]
+
+    def is_a(self, child, parent):
+        """ True if child is parent or one of its descendants.
+        """
+        return bool(self.ancestor_bits[self.get_id(child)] >> self.get_id(parent) & 1)
+
+    def common_ancestor(self, *elements):
+        """ Returns the most specific BiolinkEntity that is an ancestor of (or
+        equal to) all elements, or None.
+        """
+        bits = -1
+        for element in elements:
+            bits &= self.ancestor_bits[self.get_id(element)]
+        if bits <= 0:
+            return None
+        common_id = max(iter_bits(bits), key=lambda element_id: self.depths[element_id])
+        return self.get_entity(common_id)
+
+    def expand_descendant_bits(self, elements):
+        bits = 0
+        for element in elements:
+            bits |= self.descendant_bits[self.get_id(element)]
+        return bits
+
+    def expand_ancestor_bits(self, elements):
+        bits = 0
+        for element in elements:
+            bits |= self.ancestor_bits[self.get_id(element)]
+        return bits
+
+    def expand_descendants(self, elements):
+        """ Returns the BiolinkEntities of elements and all their descendants.
+        """
+        return [self.get_entity(element_id) for element_id in iter_bits(self.expand_descendant_bits(elements))]
+
+    def expand_ancestors(self, elements):
+        """ Returns the BiolinkEntities of elements and all their ancestors.
+        """
+        return [self.get_entity(element_id) for element_id in iter_bits(self.expand_ancestor_bits(elements))]
@@ -0,0 +1,272 @@
+"""
+Precompiled Biolink Hierarchy Snapshots
+
+A snapshot stores, for one Biolink version, every element name and curie,
+predicate and slot flags, inverses, and the ancestor and descendant closures
+as integer indexed arrays. Snapshots are memory-mapped, so loading one does
+not import bmt or parse the Biolink yaml, and forked workers share the pages.
+
+File layout (little endian):
+    header: magic, format version, number of elements, then an
+        (offset, length) pair for each section in SECTIONS.
+    sections: uint32 name offsets and utf-8 name blob, uint32 curie offsets
+        and utf-8 curie blob, uint8 flags, int32 inverses (-1 for none), and
+        uint32 CSR offsets and ids for the ancestor and descendant closures.
+"""
+import os
+import sys
+import mmap
+import struct
+from array import array
+
+from trapi_model.data import biolink_snapshots
+
+SNAPSHOT_MAGIC = b'TMBLSNAP'
+SNAPSHOT_FORMAT_VERSION = 1
+SECTIONS = [
+        'name_offsets',
+        'names',
+        'curie_offsets',
+        'curies',
+        'flags',
+        'inverses',
+        'ancestor_offsets',
+        'ancestors',
+        'descendant_offsets',
+        'descendants',
+        ]
+SECTION_TYPECODES = {
+        'name_offsets': 'I',
+        'curie_offsets': 'I',
+        'flags': 'B',
+        'inverses': 'i',
+        'ancestor_offsets': 'I',
+        'ancestors': 'I',
+        'descendant_offsets': 'I',
+        'descendants': 'I',
+        }
+HEADER = struct.Struct('<8sII' + 'II' * len(SECTIONS))
+
+PREDICATE_FLAG = 1
+SLOT_FLAG = 2
+
+SNAPSHOT_DIR = os.path.abspath(os.path.dirname(biolink_snapshots.__file__))
+
+
+def get_snapshot_path(biolink_version):
+    return os.path.join(SNAPSHOT_DIR, 'biolink-model-{}.snapshot'.format(biolink_version))
+
+def format_curie(name, is_slot):
+    if is_slot:
+        return 'biolink:' + '_'.join(name.split(' '))
+    return 'biolink:' + ''.join(n.capitalize() for n in name.split(' '))
+
+
+class SnapshotElement:
+    """ Minimal stand in for the bmt elements used by BiolinkEntity.
+
+    Only slots carry a slot_uri, matching the bmt element classes.
+    """
+    __slots__ = ('name', 'inverse', 'slot_uri')
+
+    def __init__(self, name, inverse=None, slot_uri=None):
+        self.name = name
+        self.inverse = inverse
+        if slot_uri is not None:
+            self.slot_uri = slot_uri
+
+
+class BiolinkSnapshot:
+    """ Memory-mapped Biolink hierarchy that can stand in for a bmt Toolkit.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, 'rb') as snapshot_file:
+            self._mmap = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        header = HEADER.unpack_from(self._mmap, 0)
+        magic, format_version, self.num_elements = header[:3]
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError('{} is not a Biolink snapshot.'.format(filename))
+        if format_version != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError('Unsupported Biolink snapshot format {} in {}.'.format(format_version, filename))
+        view = memoryview(self._mmap)
+        self._sections = {}
+        for i, section in enumerate(SECTIONS):
+            offset, length = header[3 + 2*i: 5 + 2*i]
+            data = view[offset:offset + length]
+            typecode = SECTION_TYPECODES.get(section)
+            if typecode is not None:
+                if sys.byteorder == 'little':
+                    data = data.cast(typecode)
+                else:
+                    data = array(typecode, data.tobytes())
+                    data.byteswap()
+            self._sections[section] = data
+        self._names = self._decode_strings('name_offsets', 'names')
+        self._curies = self._decode_strings('curie_offsets', 'curies')
+        self._ids = {}
+        for element_id, (name, curie) in enumerate(zip(self._names, self._curies)):
+            self._ids[curie] = element_id
+            self._ids[curie.split(':')[-1]] = element_id
+            self._ids['_'.join(name.split(' '))] = element_id
+        # Exact element names take precedence over the other spellings.
+        for element_id, name in enumerate(self._names):
+            self._ids[name] = element_id
+
+    def _decode_strings(self, offsets_section, blob_section):
+        offsets = self._sections[offsets_section]
+        blob = self._sections[blob_section]
+        return [bytes(blob[offsets[i]:offsets[i+1]]).decode('utf-8') for i in range(self.num_elements)]
+
+    def _get_closure(self, section, element_id):
+        offsets = self._sections[section + '_offsets']
+        return self._sections[section + 's'][offsets[element_id]:offsets[element_id+1]]
+
+    def get_id(self, name):
+        """ Returns the integer id of an element name or curie, or None.
+        """
+        element_id = self._ids.get(name)
+        if element_id is None and isinstance(name, str):
+            element_id = self._ids.get(name.lower())
+        return element_id
+
+    def get_name(self, element_id):
+        return self._names[element_id]
+
+    def get_curie_by_id(self, element_id):
+        return self._curies[element_id]
+
+    def is_predicate_id(self, element_id):
+        return bool(self._sections['flags'][element_id] & PREDICATE_FLAG)
+
+    def is_slot_id(self, element_id):
+        return bool(self._sections['flags'][element_id] & SLOT_FLAG)
+
+    def get_inverse_id(self, element_id):
+        inverse_id = self._sections['inverses'][element_id]
+        if inverse_id < 0:
+            return None
+        return inverse_id
+
+    def get_ancestor_ids(self, element_id):
+        return list(self._get_closure('ancestor', element_id))
+
+    def get_descendant_ids(self, element_id):
+        return list(self._get_closure('descendant', element_id))
+
+    # bmt Toolkit interface used by BiolinkEntity and the constants module.
+
+    def get_all_elements(self):
+        return list(self._names)
+
+    def get_element(self, name):
+        element_id = self.get_id(name)
+        if element_id is None:
+            return None
+        inverse_id = self.get_inverse_id(element_id)
+        inverse = None if inverse_id is None else self._names[inverse_id]
+        slot_uri = self._curies[element_id] if self.is_slot_id(element_id) else None
+        return SnapshotElement(self._names[element_id], inverse=inverse, slot_uri=slot_uri)
+
+    def is_predicate(self, name):
+        element_id = self.get_id(name)
+        return element_id is not None and self.is_predicate_id(element_id)
+
+    def has_inverse(self, name):
+        element_id = self.get_id(name)
+        return element_id is not None and self.get_inverse_id(element_id) is not None
+
+    def get_ancestors(self, name):
+        element_id = self.get_id(name)
+        if element_id is None:
+            return []
+        return [self._names[i] for i in self._get_closure('ancestor', element_id)]
+
+    def get_descendants(self, name):
+        element_id = self.get_id(name)
+        if element_id is None:
+            return []
+        return [self._names[i] for i in self._get_closure('descendant', element_id)]
+
+
+def write_snapshot(toolkit, filename):
+    """ Writes a snapshot of the Biolink model loaded in a bmt Toolkit.
+    """
+    names = list(toolkit.get_all_elements())
+    ids = {name: i for i, name in enumerate(names)}
+    def get_id(name):
+        # Closures can reference elements not listed by get_all_elements.
+        if name not in ids:
+            ids[name] = len(names)
+            names.append(name)
+        return ids[name]
+
+    ancestors = [[get_id(a) for a in toolkit.get_ancestors(name)] for name in list(names)]
+    descendants = [[get_id(d) for d in toolkit.get_descendants(name)] for name in list(names)]
+    # Elements discovered through closures have empty closures of their own.
+    ancestors.extend([] for _ in range(len(names) - len(ancestors)))
+    descendants.extend([] for _ in range(len(names) - len(descendants)))
+    flags = array('B')
+    inverses = array('i')
+    curies = []
+    for name in names:
+        element = toolkit.get_element(name)
+        is_predicate = element is not None and toolkit.is_predicate(name)
+        is_slot = is_predicate or (element is not None and hasattr(element, 'slot_uri'))
+        flags.append((PREDICATE_FLAG if is_predicate else 0) | (SLOT_FLAG if is_slot else 0))
+        inverse_id = -1
+        if element is not None and toolkit.has_inverse(name):
+            inverse_id = get_id(element.inverse) if element.inverse in ids else -1
+        inverses.append(inverse_id)
+        curies.append(format_curie(name, is_slot))
+
+    def encode_strings(strings):
+        offsets = array('I', [0])
+        blob = bytearray()
+        for string in strings:
+            blob.extend(string.encode('utf-8'))
+            offsets.append(len(blob))
+        return offsets, bytes(blob)
+
+    def encode_closures(closures):
+        offsets = array('I', [0])
+        closure_ids = array('I')
+        for closure in closures:
+            closure_ids.extend(closure)
+            offsets.append(len(closure_ids))
+        return offsets, closure_ids
+
+    name_offsets, name_blob = encode_strings(names)
+    curie_offsets, curie_blob = encode_strings(curies)
+    ancestor_offsets, ancestor_ids = encode_closures(ancestors)
+    descendant_offsets, descendant_ids = encode_closures(descendants)
+    sections = {
+            'name_offsets': name_offsets,
+            'names': name_blob,
+            'curie_offsets': curie_offsets,
+            'curies': curie_blob,
+            'flags': flags,
+            'inverses': inverses,
+            'ancestor_offsets': ancestor_offsets,
+            'ancestors': ancestor_ids,
+            'descendant_offsets': descendant_offsets,
+            'descendants': descendant_ids,
+            }
+    body = bytearray()
+    locations = []
+    for section in SECTIONS:
+        data = sections[section]
+        if isinstance(data, array):
+            if sys.byteorder != 'little':
+                data = array(data.typecode, data)
+                data.byteswap()
+            data = data.tobytes()
+        # Keep every section 4 byte aligned for the typed memoryviews.
+        body.extend(b'\x00' * (-(HEADER.size + len(body)) % 4))
+        locations.extend([HEADER.size + len(body), len(data)])
+        body.extend(data)
+    header = HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, len(names), *locations)
+    with open(filename, 'wb') as snapshot_file:
+        snapshot_file.write(header)
+        snapshot_file.write(body)
+    return filename
@@ -0,0 +1,1007 @@
+"""
+Columnar Knowledge Graph and Results
+
+A Knowledge Graph stored in columns rather than as a KNode and KEdge per
+element, for responses with millions of edges. Node ids, categories,
+predicates and sources are dictionary encoded, edges are rows of integer
+arrays and attribute values are kept in one column per kind of attribute,
+so edges can be filtered in bulk. Filters run on NumPy when it is installed
+and fall back to plain loops otherwise.
+
+The graph is append only. Its nodes and edges are read only mappings of
+lightweight views that build categories, attributes and sources on access.
+Use to_knowledge_graph for a regular, mutable KnowledgeGraph.
+
+ColumnarResults likewise stores result bindings as integer coded columns
+per query graph key, with sorting, top N selection and filtering on bound
+ids working on whole columns.
+"""
+import array
+import copy
+import heapq
+from collections.abc import Mapping, Sequence
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import trapi_model
+from trapi_model.base import TrapiBaseClass, intern_string
+from trapi_model.exceptions import InvalidTrapiComponent
+from trapi_model.biolink import BiolinkEntity
+from trapi_model.biolink.constants import get_biolink_entity
+from trapi_model.indexes import get_category_curies
+from trapi_model.json_stream import JSONObjectStream, JSONArrayStream
+from trapi_model.knowledge_graph import Attribute, Source, KNode, KEdge, KnowledgeGraph, PRIMARY_KNOWLEDGE_SOURCE
+from trapi_model.results import Results, Result, Binding, get_score_key
+from trapi_model.validators import validate_component
+
+# Type codes of integer and float columns.
+INDEX_TYPECODE = 'q'
+FLOAT_TYPECODE = 'd'
+# Code of a missing value in integer columns.
+MISSING = -1
+# Attribute fields other than the value, in the order of attribute column
+# keys. Attributes agreeing on all of them share a column.
+ATTRIBUTE_KEY_FIELDS = (
+        'attribute_type_id',
+        'original_attribute_name',
+        'attribute_source',
+        'value_type_id',
+        'value_url',
+        'description',
+        )
+
+
+def _as_numpy(column):
+    if column.typecode == FLOAT_TYPECODE:
+        return numpy.frombuffer(column, dtype=numpy.float64)
+    return numpy.frombuffer(column, dtype=numpy.int64)
+
+def select_equal(column, value):
+    """ Returns the positions of an array column holding value.
+    """
+    if numpy is not None and len(column) > 0:
+        return numpy.flatnonzero(_as_numpy(column) == value).tolist()
+    return [i for i, column_value in enumerate(column) if column_value == value]
+
+def select_in(column, values):
+    """ Returns the positions of an array column holding one of values.
+    """
+    if numpy is not None and len(column) > 0:
+        return numpy.flatnonzero(numpy.isin(_as_numpy(column), list(values))).tolist()
+    values = set(values)
+    return [i for i, column_value in enumerate(column) if column_value in values]
+
+def get_owner_rows(offsets, positions):
+    """ Returns the rows owning sorted positions of a column laid out by
+    row, where row i holds positions offsets[i] to offsets[i + 1].
+    """
+    if numpy is not None and len(positions) > 0:
+        return set((numpy.searchsorted(_as_numpy(offsets), positions, side='right') - 1).tolist())
+    rows = set()
+    row = 0
+    for position in positions:
+        while offsets[row + 1] <= position:
+            row += 1
+        rows.add(row)
+    return rows
+
+def _is_in_range(value, min_value, max_value):
+    if type(value) not in (int, float):
+        return False
+    if min_value is not None and not value >= min_value:
+        return False
+    if max_value is not None and not value <= max_value:
+        return False
+    return True
+
+
+class Vocabulary:
+    """ Dictionary encoding of hashable values as consecutive integer codes.
+    """
+    __slots__ = ('values', 'codes')
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def encode(self, value):
+        code = self.codes.get(value, MISSING)
+        if code == MISSING:
+            code = len(self.values)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+    def get_code(self, value):
+        return self.codes.get(value, MISSING)
+
+
+class AttributeColumn:
+    """ Values of the attributes with one attribute key, and the rows they
+    belong to. Values are stored in a float array until a value of another
+    type is added.
+    """
+    __slots__ = ('key', 'rows', 'values')
+
+    def __init__(self, key):
+        self.key = key
+        self.rows = array.array(INDEX_TYPECODE)
+        self.values = array.array(FLOAT_TYPECODE)
+
+    def append(self, row, value):
+        if type(value) is not float and type(self.values) is array.array:
+            self.values = self.values.tolist()
+        self.values.append(value)
+        self.rows.append(row)
+        return len(self.values) - 1
+
+    def select(self, min_value=None, max_value=None):
+        """ Returns the rows with a numeric value within the bounds.
+        """
+        values = self.values
+        if numpy is not None and type(values) is array.array and len(values) > 0:
+            column = _as_numpy(values)
+            mask = numpy.ones(len(column), dtype=bool)
+            if min_value is not None:
+                mask &= column >= min_value
+            if max_value is not None:
+                mask &= column <= max_value
+            return _as_numpy(self.rows)[mask].tolist()
+        return [
+                self.rows[i]
+                for i, value in enumerate(values)
+                if _is_in_range(value, min_value, max_value)
+                ]
+
+
+class AttributeTable:
+    """ Attributes of the rows of a node or edge table.
+
+    Each row lists the (column, position) of its attributes, laid out in
+    row order. Attributes added to a row once later rows exist are kept
+    aside in extra.
+    """
+    def __init__(self):
+        self.columns = []
+        self.column_codes = {}
+        self.offsets = array.array(INDEX_TYPECODE, [0])
+        self.column_refs = array.array(INDEX_TYPECODE)
+        self.positions = array.array(INDEX_TYPECODE)
+        self.extra = {}
+
+    def _get_column_code(self, key):
+        code = self.column_codes.get(key, MISSING)
+        if code == MISSING:
+            code = len(self.columns)
+            self.columns.append(AttributeColumn(tuple(intern_string(field) for field in key)))
+            self.column_codes[key] = code
+        return code
+
+    def append_row(self, attributes=None):
+        """ Adds a row with attributes given as Attributes or TRAPI dicts.
+        """
+        self.offsets.append(self.offsets[-1])
+        if attributes is not None:
+            row = len(self.offsets) - 2
+            for attribute in attributes:
+                self.add(row, attribute)
+
+    def add(self, row, attribute):
+        if isinstance(attribute, dict):
+            get = attribute.get
+            key = (
+                    attribute["attribute_type_id"],
+                    get("original_attribute_name"),
+                    get("attribute_source"),
+                    get("value_type_id"),
+                    get("value_url"),
+                    get("description"),
+                    )
+            value = attribute["value"]
+        else:
+            key = (
+                    attribute.attribute_type_id,
+                    attribute.original_attribute_name,
+                    attribute.attribute_source,
+                    attribute.value_type_id,
+                    attribute.value_url,
+                    attribute.description,
+                    )
+            value = attribute.value
+        column_code = self._get_column_code(key)
+        position = self.columns[column_code].append(row, value)
+        if row == len(self.offsets) - 2:
+            self.column_refs.append(column_code)
+            self.positions.append(position)
+            self.offsets[-1] += 1
+        else:
+            self.extra.setdefault(row, []).append((column_code, position))
+
+    def get(self, trapi_version, biolink_version, row):
+        """ Returns the Attributes of a row.
+        """
+        refs = list(zip(
+            self.column_refs[self.offsets[row]:self.offsets[row + 1]],
+            self.positions[self.offsets[row]:self.offsets[row + 1]],
+            ))
+        refs.extend(self.extra.get(row, ()))
+        attributes = []
+        for column_code, position in refs:
+            column = self.columns[column_code]
+            attribute_type_id, original_attribute_name, attribute_source, value_type_id, value_url, description = column.key
+            attributes.append(Attribute(
+                trapi_version,
+                biolink_version,
+                attribute_type_id=attribute_type_id,
+                value=column.values[position],
+                value_type_id=value_type_id,
+                original_attribute_name=original_attribute_name,
+                attribute_source=attribute_source,
+                value_url=value_url,
+                description=description,
+                ))
+        return attributes
+
+    def select(self, attribute_type_id, min_value=None, max_value=None):
+        """ Returns the sorted rows with an attribute of this type whose
+        numeric value is within the bounds.
+        """
+        rows = set()
+        for column in self.columns:
+            if column.key[0] == attribute_type_id:
+                rows.update(column.select(min_value, max_value))
+        return sorted(rows)
+
+
+class KNodeView:
+    """ Read only KNode backed by a row of a ColumnarKnowledgeGraph.
+    """
+    __slots__ = ('graph', 'row')
+
+    def __init__(self, graph, row):
+        self.graph = graph
+        self.row = row
+
+    @property
+    def name(self):
+        return self.graph._node_names[self.row]
+
+    @property
+    def categories(self):
+        graph = self.graph
+        if graph._node_has_categories[self.row] == 0:
+            return None
+        start, end = graph._node_category_offsets[self.row], graph._node_category_offsets[self.row + 1]
+        return [get_biolink_entity(graph._categories.values[code]) for code in graph._node_category_codes[start:end]]
+
+    @property
+    def attributes(self):
+        return self.graph._node_attributes.get(self.graph.trapi_version, self.graph.biolink_version, self.row)
+
+    def to_knode(self):
+        return KNode(
+                self.graph.trapi_version,
+                self.graph.biolink_version,
+                name=self.name,
+                categories=self.categories,
+                attributes=self.attributes,
+                validation_mode=trapi_model.VALIDATION_OFF,
+                )
+
+    def to_dict(self):
+        return self.to_knode().to_dict()
+
+    def to_json_stream(self):
+        return self.to_dict()
+
+
+class KEdgeView:
+    """ Read only KEdge backed by a row of a ColumnarKnowledgeGraph.
+    """
+    __slots__ = ('graph', 'row')
+
+    def __init__(self, graph, row):
+        self.graph = graph
+        self.row = row
+
+    @property
+    def subject(self):
+        return self.graph._curies.values[self.graph._edge_subjects[self.row]]
+
+    @property
+    def object(self):
+        return self.graph._curies.values[self.graph._edge_objects[self.row]]
+
+    @property
+    def predicate(self):
+        code = self.graph._edge_predicates[self.row]
+        if code == MISSING:
+            return None
+        return get_biolink_entity(self.graph._predicates.values[code])
+
+    @property
+    def sources(self):
+        graph = self.graph
+        if graph._edge_has_sources[self.row] == 0:
+            return None
+        start, end = graph._edge_source_offsets[self.row], graph._edge_source_offsets[self.row + 1]
+        return [graph._get_source(code) for code in graph._edge_source_codes[start:end]]
+
+    @property
+    def attributes(self):
+        return self.graph._edge_attributes.get(self.graph.trapi_version, self.graph.biolink_version, self.row)
+
+    def get_primary_source(self):
+        graph = self.graph
+        start, end = graph._edge_source_offsets[self.row], graph._edge_source_offsets[self.row + 1]
+        for code in graph._edge_source_codes[start:end]:
+            resource_id, resource_role = graph._sources.values[code][:2]
+            if resource_role == PRIMARY_KNOWLEDGE_SOURCE:
+                return resource_id
+        return None
+
+    def get_key(self):
+        predicate = self.predicate
+        if predicate is not None:
+            predicate = predicate.get_curie()
+        return (self.subject, predicate, self.object, self.get_primary_source())
+
+    def to_kedge(self):
+        return KEdge(
+                self.graph.trapi_version,
+                self.graph.biolink_version,
+                self.subject,
+                self.object,
+                self.sources,
+                predicate=self.predicate,
+                attributes=self.attributes,
+                validation_mode=trapi_model.VALIDATION_OFF,
+                )
+
+    def to_dict(self):
+        return self.to_kedge().to_dict()
+
+    def to_json_stream(self):
+        return self.to_dict()
+
+
+class NodesView(Mapping):
+    """ Mapping of node ids to the KNodeViews of a ColumnarKnowledgeGraph.
+    """
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, node_id):
+        row = self.graph._get_node_row(node_id)
+        if row == MISSING:
+            raise KeyError(node_id)
+        return KNodeView(self.graph, row)
+
+    def __contains__(self, node_id):
+        return self.graph._get_node_row(node_id) != MISSING
+
+    def __iter__(self):
+        graph = self.graph
+        for row, code in enumerate(graph._node_curies):
+            # Rows of replaced nodes are skipped.
+            if graph._curie_node_rows[code] == row:
+                yield graph._curies.values[code]
+
+    def __len__(self):
+        return self.graph._num_nodes
+
+
+class EdgesView(Mapping):
+    """ Mapping of edge ids to the KEdgeViews of a ColumnarKnowledgeGraph.
+    """
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, edge_id):
+        row = self.graph._edge_ids.get_code(edge_id)
+        if row == MISSING:
+            raise KeyError(edge_id)
+        return KEdgeView(self.graph, row)
+
+    def __contains__(self, edge_id):
+        return self.graph._edge_ids.get_code(edge_id) != MISSING
+
+    def __iter__(self):
+        return iter(self.graph._edge_ids.values)
+
+    def __len__(self):
+        return len(self.graph._edge_ids)
+
+
+class ColumnarKnowledgeGraph(TrapiBaseClass):
+    def __init__(self, trapi_version='1.2', biolink_version=None, validation_mode=None):
+        super().__init__(trapi_version, biolink_version, validation_mode)
+        self.edge_counter = 0
+        # Node ids and the subjects and objects of edges.
+        self._curies = Vocabulary()
+        self._categories = Vocabulary()
+        self._predicates = Vocabulary()
+        # (resource id, role, upstream ids, record urls, description) tuples.
+        self._sources = Vocabulary()
+        # Node row of every curie, MISSING for curies without a node.
+        self._curie_node_rows = array.array(INDEX_TYPECODE)
+        self._num_nodes = 0
+        self._node_curies = array.array(INDEX_TYPECODE)
+        self._node_names = []
+        self._node_has_categories = bytearray()
+        self._node_category_offsets = array.array(INDEX_TYPECODE, [0])
+        self._node_category_codes = array.array(INDEX_TYPECODE)
+        self._node_attributes = AttributeTable()
+        self._edge_ids = Vocabulary()
+        self._edge_subjects = array.array(INDEX_TYPECODE)
+        self._edge_objects = array.array(INDEX_TYPECODE)
+        self._edge_predicates = array.array(INDEX_TYPECODE)
+        self._edge_has_sources = bytearray()
+        self._edge_source_offsets = array.array(INDEX_TYPECODE, [0])
+        self._edge_source_codes = array.array(INDEX_TYPECODE)
+        self._edge_attributes = AttributeTable()
+
+    @property
+    def nodes(self):
+        return NodesView(self)
+
+    @property
+    def edges(self):
+        return EdgesView(self)
+
+    def clone(self):
+        # Columns are shared by nothing else, so everything is copied.
+        return copy.deepcopy(self)
+
+    def _encode_curie(self, curie):
+        code = self._curies.encode(intern_string(curie))
+        if code == len(self._curie_node_rows):
+            self._curie_node_rows.append(MISSING)
+        return code
+
+    def _get_node_row(self, node_id):
+        code = self._curies.get_code(node_id)
+        if code == MISSING:
+            return MISSING
+        return self._curie_node_rows[code]
+
+    def _get_source(self, code):
+        resource_id, resource_role, upstream_source_ids, source_record_urls, description = self._sources.values[code]
+        return Source(
+                self.trapi_version,
+                self.biolink_version,
+                resource_id=resource_id,
+                resource_role=resource_role,
+                upstream_source_ids=None if upstream_source_ids is None else list(upstream_source_ids),
+                source_record_urls=None if source_record_urls is None else list(source_record_urls),
+                description=description,
+                )
+
+    def _encode_source(self, source):
+        if isinstance(source, dict):
+            upstream_source_ids = source.get("upstream_resource_ids")
+            source_record_urls = source.get("source_record_urls")
+            key = (source["resource_id"], source["resource_role"])
+            description = source.get("description")
+        else:
+            upstream_source_ids = source.upstream_source_ids
+            source_record_urls = source.source_record_urls
+            key = (source.resource_id, source.resource_role)
+            description = source.description
+        return self._sources.encode(key + (
+            None if upstream_source_ids is None else tuple(upstream_source_ids),
+            None if source_record_urls is None else tuple(source_record_urls),
+            description,
+            ))
+
+    def _add_node_row(self, curie, name, categories, attributes):
+        code = self._encode_curie(curie)
+        if self._curie_node_rows[code] == MISSING:
+            self._num_nodes += 1
+        row = len(self._node_curies)
+        # A replaced node keeps its row, which is no longer referenced.
+        self._curie_node_rows[code] = row
+        self._node_curies.append(code)
+        self._node_names.append(name)
+        self._node_has_categories.append(categories is not None)
+        if categories is not None:
+            for category in categories:
+                if type(category) is not BiolinkEntity:
+                    category = get_biolink_entity(category)
+                self._node_category_codes.append(self._categories.encode(category.get_curie()))
+        self._node_category_offsets.append(len(self._node_category_codes))
+        self._node_attributes.append_row(attributes)
+        return row
+
+    def _get_new_edge_id(self):
+        edge_id = 'e{}'.format(self.edge_counter)
+        self.edge_counter += 1
+        while edge_id in self._edge_ids.codes:
+            edge_id = 'e{}'.format(self.edge_counter)
+            self.edge_counter += 1
+        return edge_id
+
+    def _add_edge_row(self, edge_id, k_subject, k_object, predicate, sources, attributes):
+        if edge_id in self._edge_ids.codes:
+            raise ValueError('Edge {} is already in the graph.'.format(edge_id))
+        self._edge_ids.encode(edge_id)
+        self._edge_subjects.append(self._encode_curie(k_subject))
+        self._edge_objects.append(self._encode_curie(k_object))
+        if predicate is None:
+            self._edge_predicates.append(MISSING)
+        else:
+            if type(predicate) is not BiolinkEntity:
+                predicate = get_biolink_entity(predicate)
+            self._edge_predicates.append(self._predicates.encode(predicate.get_curie()))
+        self._edge_has_sources.append(sources is not None)
+        if sources is not None:
+            for source in sources:
+                self._edge_source_codes.append(self._encode_source(source))
+        self._edge_source_offsets.append(len(self._edge_source_codes))
+        self._edge_attributes.append_row(attributes)
+
+    def add_node(self, curie, name, categories, attributes=None):
+        if type(categories) is not list and categories is not None:
+            categories = [categories]
+        self._add_node_row(curie, name, categories, attributes)
+        return curie
+
+    def add_edge(self, k_subject, k_object, sources, predicate=None, attributes=None):
+        edge_id = self._get_new_edge_id()
+        self._add_edge_row(edge_id, k_subject, k_object, predicate, sources, attributes)
+        return edge_id
+
+    def add_attribute(self,
+            attribute_type_id,
+            value,
+            value_type_id=None,
+            original_attribute_name=None,
+            attribute_source=None,
+            value_url=None,
+            description=None,
+            edge_id=None,
+            node_id=None,
+            ):
+        if edge_id is None and node_id is None:
+            raise ValueError('Must specify either node or edge id.')
+        elif edge_id is not None and node_id is not None:
+            raise ValueError('Must specify either node or edge id, not both.')
+        attribute = {
+                "attribute_type_id": attribute_type_id,
+                "value": value,
+                "value_type_id": value_type_id,
+                "original_attribute_name": original_attribute_name,
+                "attribute_source": attribute_source,
+                "value_url": value_url,
+                "description": description,
+                }
+        if edge_id is not None:
+            row = self._edge_ids.get_code(edge_id)
+            table = self._edge_attributes
+        else:
+            row = self._get_node_row(node_id)
+            table = self._node_attributes
+        if row == MISSING:
+            raise KeyError(edge_id if edge_id is not None else node_id)
+        table.add(row, attribute)
+        return True
+
+    def find_nodes(self, categories=None, ids=None, descendants=False):
+        """ Returns the ids of the nodes that have all of the given categories,
+        restricted to ids if given. See KnowledgeGraph.find_nodes.
+        """
+        if categories is not None and type(categories) is not list:
+            categories = [categories]
+        if type(ids) is str:
+            ids = [ids]
+        rows = None
+        if ids is not None:
+            rows = set(row for row in (self._get_node_row(node_id) for node_id in ids) if row != MISSING)
+        for category in categories or []:
+            codes = [self._categories.get_code(curie) for curie in get_category_curies(category, descendants)]
+            codes = [code for code in codes if code != MISSING]
+            positions = select_in(self._node_category_codes, codes) if codes else []
+            category_rows = get_owner_rows(self._node_category_offsets, positions)
+            rows = category_rows if rows is None else rows & category_rows
+        if rows is None:
+            return list(self.nodes)
+        return [
+                self._curies.values[self._node_curies[row]]
+                for row in sorted(rows)
+                if self._curie_node_rows[self._node_curies[row]] == row
+                ]
+
+    def _get_edge_ids(self, rows):
+        return [self._edge_ids.values[row] for row in rows]
+
+    def edges_with_predicate(self, predicate):
+        """ Returns the ids of the edges with this predicate.
+        """
+        if isinstance(predicate, BiolinkEntity):
+            predicate = predicate.get_curie()
+        code = self._predicates.get_code(predicate)
+        if code == MISSING:
+            return []
+        return self._get_edge_ids(select_equal(self._edge_predicates, code))
+
+    def edges_with_attribute(self, attribute_type_id, min_value=None, max_value=None):
+        """ Returns the ids of the edges with an attribute of this type whose
+        numeric value is within the bounds, e.g. a score above a threshold.
+        """
+        return self._get_edge_ids(self._edge_attributes.select(attribute_type_id, min_value, max_value))
+
+    def edges_of(self, node_id, direction='both'):
+        """ Returns the ids of the edges of a node: 'out' for edges it is the
+        subject of, 'in' for edges it is the object of, or 'both'.
+        """
+        if direction not in ('both', 'out', 'in'):
+            raise ValueError('Unknown direction: {}'.format(direction))
+        code = self._curies.get_code(node_id)
+        if code == MISSING:
+            return []
+        rows = []
+        if direction in ('both', 'out'):
+            rows.extend(select_equal(self._edge_subjects, code))
+        if direction in ('both', 'in'):
+            rows.extend(select_equal(self._edge_objects, code))
+        return self._get_edge_ids(sorted(set(rows)))
+
+    def to_dict(self):
+        return {
+                "nodes": {node_id: node.to_dict() for node_id, node in self.nodes.items()},
+                "edges": {edge_id: edge.to_dict() for edge_id, edge in self.edges.items()},
+                }
+
+    def to_json_stream(self):
+        return JSONObjectStream([
+                ("nodes", JSONObjectStream(self.nodes.items())),
+                ("edges", JSONObjectStream(self.edges.items())),
+                ])
+
+    def to_knowledge_graph(self):
+        """ Returns the graph as a KnowledgeGraph of KNodes and KEdges.
+        """
+        knowledge_graph = KnowledgeGraph(self.trapi_version, self.biolink_version, self.validation_mode)
+        for node_id, node in self.nodes.items():
+            knode = node.to_knode()
+            knode.set_validation_mode(self.validation_mode)
+            knowledge_graph.nodes[node_id] = knode
+        for edge_id, edge in self.edges.items():
+            kedge = edge.to_kedge()
+            kedge.set_validation_mode(self.validation_mode)
+            knowledge_graph.edges[edge_id] = kedge
+        knowledge_graph.edge_counter = self.edge_counter
+        return knowledge_graph
+
+    @staticmethod
+    def from_knowledge_graph(knowledge_graph):
+        """ Returns a ColumnarKnowledgeGraph holding the elements of a KnowledgeGraph.
+        """
+        columnar_knowledge_graph = ColumnarKnowledgeGraph(
+                knowledge_graph.trapi_version,
+                knowledge_graph.biolink_version,
+                knowledge_graph.validation_mode,
+                )
+        for node_id, node in knowledge_graph.nodes.items():
+            columnar_knowledge_graph._add_node_row(node_id, node.name, node.categories, node.attributes)
+        for edge_id, edge in knowledge_graph.edges.items():
+            columnar_knowledge_graph._add_edge_row(
+                    edge_id,
+                    edge.subject,
+                    edge.object,
+                    edge.predicate,
+                    edge.sources,
+                    edge.attributes,
+                    )
+        columnar_knowledge_graph.edge_counter = knowledge_graph.edge_counter
+        return columnar_knowledge_graph
+
+    def validate(self):
+        _dict = self.to_dict()
+        return validate_component(_dict, self.trapi_version, 'KnowledgeGraph')
+
+    @staticmethod
+    def load(trapi_version, biolink_version, knowledge_graph, validation_mode=None):
+        """ Loads a TRAPI Knowledge Graph dict straight into columns, without
+        building KNodes and KEdges.
+        """
+        new_knowledge_graph = ColumnarKnowledgeGraph(trapi_version, biolink_version, validation_mode)
+        for node_id, node_info in knowledge_graph["nodes"].items():
+            new_knowledge_graph._add_node_row(
+                    node_id,
+                    node_info.get("name"),
+                    node_info.get("categories"),
+                    node_info.get("attributes"),
+                    )
+        for edge_id, edge_info in knowledge_graph["edges"].items():
+            new_knowledge_graph._add_edge_row(
+                    edge_id,
+                    edge_info["subject"],
+                    edge_info["object"],
+                    edge_info.get("predicate"),
+                    # Loaded edges always have a source list, as in KEdge.load.
+                    edge_info.get("sources") or [],
+                    edge_info.get("attributes"),
+                    )
+        new_knowledge_graph.check_loaded_component('KnowledgeGraph')
+        return new_knowledge_graph
+
+
+class BindingColumn:
+    """ Bindings of one query graph key, laid out by result: the kg ids and
+    query ids of the bindings of result i are at offsets[i] to
+    offsets[i + 1]. present flags the results listing the key.
+    """
+    __slots__ = ('offsets', 'ids', 'query_ids', 'present')
+
+    def __init__(self, num_results):
+        self.offsets = array.array(INDEX_TYPECODE, [0]) * (num_results + 1)
+        self.ids = array.array(INDEX_TYPECODE)
+        self.query_ids = array.array(INDEX_TYPECODE)
+        self.present = bytearray(num_results)
+
+
+class ResultTable:
+    """ Append only storage of results: a BindingColumn per query node and
+    edge key, and a score column with NaN for unscored results.
+    """
+    def __init__(self):
+        self.kg_ids = Vocabulary()
+        self.query_ids = Vocabulary()
+        self.node_bindings = {}
+        self.edge_bindings = {}
+        self.scores = array.array(FLOAT_TYPECODE)
+
+    def __len__(self):
+        return len(self.scores)
+
+    def append(self, node_bindings, edge_bindings, score=None):
+        """ Adds a result and returns its row. Bindings map query graph keys
+        to lists of (kg id, query id) pairs.
+        """
+        row = len(self.scores)
+        for columns, bindings in [(self.node_bindings, node_bindings), (self.edge_bindings, edge_bindings)]:
+            for qg_key, key_bindings in bindings.items():
+                column = columns.get(qg_key)
+                if column is None:
+                    column = BindingColumn(row)
+                    columns[qg_key] = column
+                for kg_id, query_id in key_bindings:
+                    column.ids.append(self.kg_ids.encode(intern_string(kg_id)))
+                    column.query_ids.append(MISSING if query_id is None else self.query_ids.encode(query_id))
+                column.present.append(1)
+                column.offsets.append(len(column.ids))
+            for column in columns.values():
+                if len(column.present) == row:
+                    column.present.append(0)
+                    column.offsets.append(len(column.ids))
+        self.scores.append(float('nan') if score is None else score)
+        return row
+
+    def get_bindings(self, column, row):
+        """ Returns the (kg id, query id) pairs of a result in a BindingColumn.
+        """
+        start, end = column.offsets[row], column.offsets[row + 1]
+        return [
+                (self.kg_ids.values[kg_id], None if query_id == MISSING else self.query_ids.values[query_id])
+                for kg_id, query_id in zip(column.ids[start:end], column.query_ids[start:end])
+                ]
+
+    def get_score(self, row):
+        score = self.scores[row]
+        if score != score:
+            return None
+        return score
+
+
+class ResultsView(Sequence):
+    """ Sequence of the Results of a ColumnarResults, built on access.
+    """
+    def __init__(self, results):
+        self._results = results
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._results.get_result(i) for i in range(len(self))[index]]
+        return self._results.get_result(index)
+
+    def __len__(self):
+        return len(self._results)
+
+
+class ColumnarResults(TrapiBaseClass):
+    """ Results stored as integer coded binding columns rather than Result
+    and Binding objects.
+
+    A ColumnarResults is a selection of the rows of a ResultTable, so
+    sorting, top_n and filtering return new ColumnarResults sharing the
+    table without copying bindings. results is a sequence of Result
+    objects built on access for code expecting Results.
+    """
+    def __init__(self, trapi_version, biolink_version, validation_mode=None):
+        super().__init__(trapi_version, biolink_version, validation_mode)
+        self._table = ResultTable()
+        self._rows = array.array(INDEX_TYPECODE)
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def results(self):
+        return ResultsView(self)
+
+    def _select(self, rows):
+        """ Returns ColumnarResults of the given rows of the table.
+        """
+        results = copy.copy(self)
+        results._rows = array.array(INDEX_TYPECODE, rows)
+        return results
+
+    def clone(self):
+        # Table rows are never modified, so the table is shared.
+        return self._select(self._rows)
+
+    def add_result(self, node_bindings, edge_bindings, score=None):
+        """ Adds a result, taking bindings as Results.add_result does.
+        """
+        _node_bindings = {}
+        for qg_id, kg_ids in node_bindings.items():
+            if isinstance(kg_ids, dict):
+                _node_bindings[qg_id] = [(kg_id, kg_ids['query_id']) for kg_id in kg_ids['ids']]
+            elif isinstance(kg_ids, list):
+                _node_bindings[qg_id] = [(kg_id, None) for kg_id in kg_ids]
+        _edge_bindings = {qg_id: [(kg_id, None) for kg_id in kg_ids] for qg_id, kg_ids in edge_bindings.items()}
+        self._rows.append(self._table.append(_node_bindings, _edge_bindings, score))
+
+    def append_result(self, result):
+        self._rows.append(self._table.append(
+            {qg_key: [(binding.id, binding.conflate_term) for binding in bindings]
+                for qg_key, bindings in result.node_bindings.items()},
+            {qg_key: [(binding.id, binding.conflate_term) for binding in bindings]
+                for qg_key, bindings in result.edge_bindings.items()},
+            result.score,
+            ))
+
+    def get_result(self, index):
+        """ Returns the index-th result as a Result.
+        """
+        row = self._rows[index]
+        table = self._table
+        result = Result(self.trapi_version, self.biolink_version, self.validation_mode, score=table.get_score(row))
+        for bindings, columns in [(result.node_bindings, table.node_bindings), (result.edge_bindings, table.edge_bindings)]:
+            for qg_key, column in columns.items():
+                if column.present[row]:
+                    bindings[qg_key] = [
+                            Binding(self.trapi_version, self.biolink_version, kg_id, conflate_term=query_id)
+                            for kg_id, query_id in table.get_bindings(column, row)
+                            ]
+        return result
+
+    def _get_result_dict(self, row):
+        table = self._table
+        _dict = {}
+        for name, columns in [("edge_bindings", table.edge_bindings), ("node_bindings", table.node_bindings)]:
+            bindings = {}
+            for qg_key, column in columns.items():
+                if column.present[row]:
+                    bindings[qg_key] = [
+                            {"id": kg_id} if query_id is None else {"id": kg_id, "query_id": query_id}
+                            for kg_id, query_id in table.get_bindings(column, row)
+                            ]
+            _dict[name] = bindings
+        score = table.get_score(row)
+        if score is not None:
+            _dict["score"] = score
+        return _dict
+
+    def get_scores(self):
+        """ Returns the scores of the results, None for unscored ones.
+        """
+        return [self._table.get_score(row) for row in self._rows]
+
+    def _get_score_keys(self):
+        # Descending score order with unscored results last, as get_score_key.
+        if numpy is not None:
+            keys = -_as_numpy(self._table.scores)[_as_numpy(self._rows)]
+            keys[numpy.isnan(keys)] = numpy.inf
+            return keys
+        return [get_score_key(self._table.get_score(row)) for row in self._rows]
+
+    def sort_by_score(self):
+        """ Returns the results in descending score order. Unscored results
+        come last and ties keep their order.
+        """
+        if numpy is not None and len(self._rows) > 0:
+            order = numpy.argsort(self._get_score_keys(), kind='stable')
+            return self._select(_as_numpy(self._rows)[order].tolist())
+        keys = self._get_score_keys()
+        return self._select([self._rows[i] for i in sorted(range(len(self._rows)), key=keys.__getitem__)])
+
+    def top_n(self, n):
+        """ Returns the n best scored results, in descending score order,
+        with a partial sort rather than a sort of every result. Unscored
+        results come last and ties keep their order.
+        """
+        if n >= len(self._rows):
+            return self.sort_by_score()
+        if n <= 0:
+            return self._select([])
+        keys = self._get_score_keys()
+        if numpy is None:
+            return self._select([self._rows[i] for i in heapq.nsmallest(n, range(len(self._rows)), key=keys.__getitem__)])
+        threshold = numpy.partition(keys, n - 1)[n - 1]
+        better = numpy.flatnonzero(keys < threshold)
+        # Of the results tied at the threshold the earliest are kept.
+        tied = numpy.flatnonzero(keys == threshold)[:n - len(better)]
+        selected = numpy.sort(numpy.concatenate([better, tied]))
+        order = selected[numpy.argsort(keys[selected], kind='stable')]
+        return self._select(_as_numpy(self._rows)[order].tolist())
+
+    def filter_by_kg_ids(self, kg_ids, qg_key=None):
+        """ Returns the results binding any of kg_ids, to any query graph key
+        or to qg_key only, in their current order.
+        """
+        table = self._table
+        codes = [table.kg_ids.get_code(kg_id) for kg_id in kg_ids]
+        codes = [code for code in codes if code != MISSING]
+        matched_rows = set()
+        if codes:
+            for columns in [table.node_bindings, table.edge_bindings]:
+                for column_key, column in columns.items():
+                    if qg_key is not None and column_key != qg_key:
+                        continue
+                    matched_rows.update(get_owner_rows(column.offsets, select_in(column.ids, codes)))
+        return self._select([row for row in self._rows if row in matched_rows])
+
+    def to_dict(self):
+        return [self._get_result_dict(row) for row in self._rows]
+
+    def to_json_stream(self):
+        return JSONArrayStream(self._get_result_dict(row) for row in self._rows)
+
+    def to_results(self):
+        """ Returns the results as Results of Result objects.
+        """
+        results = Results(self.trapi_version, self.biolink_version, self.validation_mode)
+        results.results = list(self.results)
+        return results
+
+    @staticmethod
+    def from_results(results):
+        columnar_results = ColumnarResults(results.trapi_version, results.biolink_version, results.validation_mode)
+        for result in results.results:
+            columnar_results.append_result(result)
+        return columnar_results
+
+    @staticmethod
+    def load(trapi_version, biolink_version, results, validation_mode=None, max_results=None):
+        """ Loads TRAPI results straight into columns. With max_results only
+        the top_n best scored results are kept.
+        """
+        new_results = ColumnarResults(trapi_version, biolink_version, validation_mode)
+        table = new_results._table
+        for result_info in results:
+            # Query ids are not loaded, as in Binding.load.
+            new_results._rows.append(table.append(
+                {qg_key: [(binding_info["id"], None) for binding_info in bindings]
+                    for qg_key, bindings in result_info["node_bindings"].items()},
+                {qg_key: [(binding_info["id"], None) for binding_info in bindings]
+                    for qg_key, bindings in result_info["edge_bindings"].items()},
+                result_info.get("score"),
+                ))
+        if max_results is not None:
+            new_results = new_results.top_n(max_results)
+        # Results has no schema component of its own, so each result is
+        # validated, as Results.load does.
+        if new_results.validation_mode != trapi_model.VALIDATION_OFF:
+            for row in new_results._rows:
+                valid, message = validate_component(new_results._get_result_dict(row), trapi_version, 'Result')
+                if not valid:
+                    raise InvalidTrapiComponent(trapi_version, 'Result', message)
+        return new_results
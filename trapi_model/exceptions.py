@@ -47,3 +47,17 @@ class UnknownBiolinkEntity(Exception):
                 self.name,
                 )
 
+
+class BatchQueryTooLarge(Exception):
+    def __init__(self, num_queries, max_queries, message='Batch query expands to too many subqueries'):
+        self.num_queries = num_queries
+        self.max_queries = max_queries
+        self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return '{}: {} (limit {})'.format(
+                self.message,
+                self.num_queries,
+                self.max_queries,
+                )
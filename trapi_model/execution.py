@@ -0,0 +1,323 @@
+"""
+Batch Query Execution
+
+Runs the subqueries of a batch query through a user supplied handler on a
+concurrent.futures thread or process pool and merges the responses into
+one Message as they complete.
+
+A handler takes a subquery Query and returns a Message, a Query or None.
+Handlers run on a process pool must be picklable (module level functions);
+subqueries and responses then cross the process boundary as compact JSON
+bytes rather than as pickled object graphs.
+
+The asyncio counterparts take coroutine handlers, which may also return
+the response as a TRAPI dict or JSON. Parsing and merging of responses run
+on an executor so the event loop is not blocked by large responses.
+"""
+import os
+import asyncio
+import collections
+import concurrent.futures
+
+import trapi_model
+from trapi_model import json_backend
+from trapi_model.message import Message
+from trapi_model.query import Query
+
+THREAD_POOL = 'thread'
+PROCESS_POOL = 'process'
+# Seconds between checks of a cancel event while waiting on subqueries.
+CANCEL_POLL_INTERVAL = 0.1
+
+
+def get_response_message(response):
+    """ Returns the Message of a handler response.
+    """
+    if response is None or isinstance(response, Message):
+        return response
+    if isinstance(response, Query):
+        return response.message
+    raise TypeError('Batch query handlers must return a Message, Query or None, not {}.'.format(
+        type(response).__name__,
+        ))
+
+def _run_serialized(handler, biolink_model_version, trapi_version, biolink_version, validation_mode, q_id, query_bytes):
+    """ Process pool entry point. Loads the subquery, runs the handler and
+    returns the response message as JSON bytes.
+    """
+    trapi_model.init_worker(biolink_model_version)
+    # The subquery was built from a loaded query, so it is not revalidated.
+    query = Query.load(
+            trapi_version,
+            biolink_version,
+            query=json_backend.loads(query_bytes),
+            validation_mode=trapi_model.VALIDATION_OFF,
+            )
+    query.id = q_id
+    query.set_validation_mode(validation_mode)
+    message = get_response_message(handler(query))
+    if message is None:
+        return None
+    return json_backend.dumpb(message.to_dict())
+
+def _get_executor(executor, max_workers):
+    if executor == THREAD_POOL:
+        return concurrent.futures.ThreadPoolExecutor(max_workers)
+    if executor == PROCESS_POOL:
+        return concurrent.futures.ProcessPoolExecutor(max_workers)
+    raise ValueError('Unknown executor: {}. Supported executors include: {}'.format(
+        executor,
+        [THREAD_POOL, PROCESS_POOL],
+        ))
+
+def iter_batch_responses(
+        query,
+        handler,
+        executor=THREAD_POOL,
+        max_workers=None,
+        max_in_flight=None,
+        ordered=False,
+        cancel_event=None,
+        max_queries=None,
+        axes=None,
+        ids_chunk_size=None,
+        ):
+    """ Runs handler on every subquery of query and yields (subquery,
+    response message) pairs.
+
+    executor: THREAD_POOL, PROCESS_POOL or a concurrent.futures Executor
+        owned by the caller.
+    max_in_flight: the most subqueries submitted but not yet yielded,
+        twice the number of workers by default. Subqueries are expanded
+        lazily as slots free up.
+    ordered: yield responses in subquery order rather than as they complete.
+    cancel_event: a threading.Event that cancels the remaining subqueries
+        when set. Closing the generator or an exception raised by the
+        handler cancels them too.
+    max_queries, axes and ids_chunk_size are passed to Query.iter_batch_queries.
+    """
+    # Expand here so that BatchQueryTooLarge is raised before anything runs.
+    subqueries = query.iter_batch_queries(max_queries=max_queries, axes=axes, ids_chunk_size=ids_chunk_size)
+    if isinstance(executor, concurrent.futures.Executor):
+        pool = executor
+        owns_pool = False
+    else:
+        pool = _get_executor(executor, max_workers)
+        owns_pool = True
+    if max_in_flight is None:
+        max_in_flight = 2 * (max_workers or os.cpu_count() or 1)
+    return _iter_batch_responses(query, subqueries, handler, pool, owns_pool, max_in_flight, ordered, cancel_event)
+
+def _iter_batch_responses(query, subqueries, handler, pool, owns_pool, max_in_flight, ordered, cancel_event):
+    serialize = isinstance(pool, concurrent.futures.ProcessPoolExecutor)
+
+    def is_cancelled():
+        return cancel_event is not None and cancel_event.is_set()
+
+    def submit(subquery):
+        if not serialize:
+            return pool.submit(handler, subquery)
+        return pool.submit(
+                _run_serialized,
+                handler,
+                trapi_model.BIOLINK_VERSION,
+                subquery.trapi_version,
+                subquery.biolink_version,
+                subquery.validation_mode,
+                subquery.id,
+                json_backend.dumpb(subquery.to_dict()),
+                )
+
+    def get_response(future):
+        response = future.result()
+        if not serialize:
+            return get_response_message(response)
+        if response is None:
+            return None
+        return Message.load(
+                query.trapi_version,
+                query.biolink_version,
+                json_backend.loads(response),
+                validation_mode=query.validation_mode,
+                )
+
+    # Futures in submission order.
+    pending = collections.OrderedDict()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < max_in_flight and not is_cancelled():
+                subquery = next(subqueries, None)
+                if subquery is None:
+                    exhausted = True
+                    break
+                pending[submit(subquery)] = subquery
+            if not pending or is_cancelled():
+                return
+            waiting_on = [next(iter(pending))] if ordered else list(pending)
+            timeout = None if cancel_event is None else CANCEL_POLL_INTERVAL
+            done, _ = concurrent.futures.wait(waiting_on, timeout, concurrent.futures.FIRST_COMPLETED)
+            if not done:
+                continue
+            # Oldest completed future first.
+            future = next(future for future in pending if future in done)
+            subquery = pending.pop(future)
+            yield subquery, get_response(future)
+    finally:
+        for future in pending:
+            future.cancel()
+        if owns_pool:
+            # Do not wait on subqueries that were already running when cancelled.
+            pool.shutdown(wait=not pending)
+
+def run_batch_query(query, handler, **kwargs):
+    """ Runs every subquery of query through handler and returns a Message
+    with the batch query graph and the responses merged in as they arrive.
+
+    Takes the keyword arguments of iter_batch_responses.
+    """
+    message = Message(query.trapi_version, query.biolink_version, query.validation_mode)
+    message.query_graph = query.message.query_graph.clone()
+    for _, response in iter_batch_responses(query, handler, **kwargs):
+        if response is not None:
+            message.update(response.knowledge_graph, response.results)
+    return message
+
+
+async def aiter_batch_queries(query, max_queries=None, axes=None, ids_chunk_size=None):
+    """ Async iterator over the subqueries of Query.iter_batch_queries,
+    yielding to the event loop after each one is built.
+    """
+    for subquery in query.iter_batch_queries(max_queries=max_queries, axes=axes, ids_chunk_size=ids_chunk_size):
+        yield subquery
+        await asyncio.sleep(0)
+
+def _load_message(trapi_version, biolink_version, message, validation_mode):
+    if isinstance(message, (bytes, bytearray, str)):
+        message = json_backend.loads(message)
+    # Accept a whole TRAPI response as well as its message.
+    if isinstance(message.get("message"), dict):
+        message = message["message"]
+    return Message.load(trapi_version, biolink_version, message, validation_mode=validation_mode)
+
+async def load_message_async(trapi_version, biolink_version, message, validation_mode=None, executor=None):
+    """ Parses and loads a Message from a TRAPI dict, JSON str or bytes on an
+    executor, the loop's default one if None.
+    """
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(
+            executor,
+            _load_message,
+            trapi_version,
+            biolink_version,
+            message,
+            validation_mode,
+            )
+
+async def get_response_message_async(query, response, executor=None):
+    """ Returns the Message of a coroutine handler response, loading dict
+    and JSON responses on the executor.
+    """
+    if isinstance(response, (dict, bytes, bytearray, str)):
+        return await load_message_async(
+                query.trapi_version,
+                query.biolink_version,
+                response,
+                validation_mode=query.validation_mode,
+                executor=executor,
+                )
+    return get_response_message(response)
+
+async def gather_limited(awaitables, limit, return_exceptions=False):
+    """ Like asyncio.gather, with at most limit of the awaitables running at once.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(awaitable):
+        async with semaphore:
+            return await awaitable
+
+    return await asyncio.gather(
+            *[run(awaitable) for awaitable in awaitables],
+            return_exceptions=return_exceptions,
+            )
+
+async def merge_responses_async(message, responses, executor=None):
+    """ Merges response Messages into message as they complete and returns it.
+
+    responses is an async iterable of Messages or an iterable of awaitables
+    returning Messages. Each merge runs on the executor, one at a time.
+    """
+    loop = asyncio.get_event_loop()
+    if hasattr(responses, '__aiter__'):
+        async for response in responses:
+            if response is not None:
+                await loop.run_in_executor(executor, message.update, response.knowledge_graph, response.results)
+    else:
+        for next_response in asyncio.as_completed(list(responses)):
+            response = await next_response
+            if response is not None:
+                await loop.run_in_executor(executor, message.update, response.knowledge_graph, response.results)
+    return message
+
+async def iter_batch_responses_async(
+        query,
+        handler,
+        max_concurrency=10,
+        ordered=False,
+        executor=None,
+        max_queries=None,
+        axes=None,
+        ids_chunk_size=None,
+        ):
+    """ Runs the coroutine handler on every subquery of query and yields
+    (subquery, response message) pairs.
+
+    At most max_concurrency handlers run at once and subqueries are expanded
+    as they are needed. With ordered, responses are yielded in subquery
+    order, otherwise as they complete. Closing the iterator or a handler
+    exception cancels the running handlers. Dict and JSON responses are
+    loaded on executor.
+    """
+    subqueries = query.iter_batch_queries(max_queries=max_queries, axes=axes, ids_chunk_size=ids_chunk_size)
+    # Tasks in submission order.
+    pending = collections.OrderedDict()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < max_concurrency:
+                subquery = next(subqueries, None)
+                if subquery is None:
+                    exhausted = True
+                    break
+                pending[asyncio.ensure_future(handler(subquery))] = subquery
+                await asyncio.sleep(0)
+            if not pending:
+                return
+            if ordered:
+                task = next(iter(pending))
+                await asyncio.wait([task])
+            else:
+                done, _ = await asyncio.wait(list(pending), return_when=asyncio.FIRST_COMPLETED)
+                # Oldest completed task first.
+                task = next(task for task in pending if task in done)
+            subquery = pending.pop(task)
+            yield subquery, await get_response_message_async(query, task.result(), executor)
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def run_batch_query_async(query, handler, **kwargs):
+    """ Async counterpart of run_batch_query for coroutine handlers.
+
+    Takes the keyword arguments of iter_batch_responses_async.
+    """
+    message = Message(query.trapi_version, query.biolink_version, query.validation_mode)
+    message.query_graph = query.message.query_graph.clone()
+    responses = iter_batch_responses_async(query, handler, **kwargs)
+
+    async def iter_response_messages():
+        async for _, response in responses:
+            yield response
+
+    return await merge_responses_async(message, iter_response_messages(), kwargs.get('executor'))
@@ -0,0 +1,357 @@
+"""
+Knowledge and Query Graph Indexes
+
+Inverted indexes over the nodes and edges of a graph. Graphs build them on
+first lookup and keep them up to date as elements are added through their
+methods.
+"""
+from collections import defaultdict
+
+import trapi_model.biolink
+from trapi_model.biolink import BiolinkEntity
+from trapi_model.biolink.constants import get_biolink_entity
+from trapi_model.biolink.hierarchy import get_hierarchy, iter_bits
+
+
+def _get_ancestor_curies(biolink_entity):
+    if trapi_model.biolink.BIOLINK_DEBUG:
+        # There is no toolkit to build the hierarchy index from in debug mode.
+        ancestors = biolink_entity.get_ancestors() or []
+        return [biolink_entity.get_curie()] + [ancestor.get_curie() for ancestor in ancestors]
+    hierarchy = get_hierarchy()
+    return hierarchy.get_curies(hierarchy.get_ancestor_bits(biolink_entity))
+
+def get_category_curies(category, descendants=False):
+    """ Returns the curie of a category given as a BiolinkEntity, curie or
+    name, followed by the curies of its descendants if requested.
+    """
+    if type(category) is not BiolinkEntity:
+        category = get_biolink_entity(category)
+    curie = category.get_curie()
+    if not descendants:
+        return (curie,)
+    if trapi_model.biolink.BIOLINK_DEBUG:
+        descendant_entities = category.get_descendants() or []
+        return tuple(dict.fromkeys([curie] + [descendant.get_curie() for descendant in descendant_entities]))
+    hierarchy = get_hierarchy()
+    # The category itself comes first, ahead of its descendants.
+    descendant_bits = hierarchy.get_descendant_bits(category) & ~(1 << hierarchy.get_id(category))
+    return (curie,) + tuple(hierarchy.get_curies(descendant_bits))
+
+
+class TrackedDict(dict):
+    """ dict counting the changes made to its keys and values, so that an
+    index over it can tell whether it is still current.
+    """
+    # A class default, as unpickling sets items before the instance state.
+    version = 0
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.version += 1
+
+    def pop(self, *args):
+        self.version += 1
+        return super().pop(*args)
+
+    def popitem(self):
+        self.version += 1
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        self.version += 1
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        self.version += 1
+        super().update(*args, **kwargs)
+
+    def clear(self):
+        self.version += 1
+        super().clear()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+
+class TrackedList(list):
+    """ list counting the changes made to its items, see TrackedDict.
+    """
+    version = 0
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self.version += 1
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self.version += 1
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __imul__(self, n):
+        self.version += 1
+        return super().__imul__(n)
+
+    def append(self, value):
+        super().append(value)
+        self.version += 1
+
+    def extend(self, values):
+        super().extend(values)
+        self.version += 1
+
+    def insert(self, index, value):
+        super().insert(index, value)
+        self.version += 1
+
+    def pop(self, *args):
+        self.version += 1
+        return super().pop(*args)
+
+    def remove(self, value):
+        super().remove(value)
+        self.version += 1
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self.version += 1
+
+    def reverse(self):
+        super().reverse()
+        self.version += 1
+
+
+class NodeIndex:
+    """ Maps category curies, and optionally the curies in node ids, to the
+    ids of the nodes that have them.
+    """
+    def __init__(self, nodes=None, index_ids=True):
+        self.categories = defaultdict(dict)
+        self.ids = defaultdict(dict)
+        self.index_ids = index_ids
+        self.size = 0
+        # Version of the TrackedDict the index is current with, set by its graph.
+        self.version = None
+        if nodes is not None:
+            for node_id, node in nodes.items():
+                self.add(node_id, node)
+
+    def add(self, node_id, node):
+        self.update(node_id, node)
+        self.size += 1
+
+    def update(self, node_id, node):
+        """ Indexes the categories and ids an indexed node has gained.
+        """
+        if node.categories is not None:
+            for category in node.categories:
+                self.categories[category.get_curie()][node_id] = None
+        if self.index_ids and node.ids is not None:
+            for curie in node.ids:
+                self.ids[curie][node_id] = None
+
+    def find(self, categories=None, ids=None, descendants=False, node_ids=None):
+        """ Returns the ids of the nodes that have every category and id, or
+        None if there is nothing to match on.
+
+        With descendants a node matches a category if it has that category
+        or one of its descendants. node_ids restricts matches to those nodes.
+        """
+        # Each group is a union of node id dicts a match must be in one of.
+        groups = []
+        if categories is not None:
+            for category in categories:
+                curies = get_category_curies(category, descendants)
+                groups.append([self.categories[curie] for curie in curies if curie in self.categories])
+        if ids is not None:
+            for curie in ids:
+                groups.append([self.ids[curie]] if curie in self.ids else [])
+        if node_ids is not None:
+            groups.append([dict.fromkeys(node_ids)])
+        if not groups:
+            return None
+        # Intersect starting from the fewest candidates.
+        groups.sort(key=lambda group: sum(len(members) for members in group))
+        matched_node_ids = {}
+        for members in groups[0]:
+            for node_id in members:
+                if all(any(node_id in others for others in group) for group in groups[1:]):
+                    matched_node_ids[node_id] = None
+        return list(matched_node_ids)
+
+
+class EdgeIndex:
+    """ Edge lookups of a KnowledgeGraph by merge key, by node, by
+    (subject, object) pair and by predicate curie.
+    """
+    def __init__(self, edges=None):
+        self.keys = {}
+        self.out_edges = defaultdict(list)
+        self.in_edges = defaultdict(list)
+        self.pairs = defaultdict(list)
+        self.predicates = defaultdict(list)
+        self.size = 0
+        # Version of the TrackedDict the index is current with, set by its graph.
+        self.version = None
+        if edges is not None:
+            for edge_id, edge in edges.items():
+                self.add(edge_id, edge)
+
+    def add(self, edge_id, edge):
+        key = edge.get_key()
+        k_subject, predicate, k_object, _ = key
+        self.keys.setdefault(key, edge_id)
+        self.out_edges[k_subject].append(edge_id)
+        self.in_edges[k_object].append(edge_id)
+        self.pairs[(k_subject, k_object)].append(edge_id)
+        self.predicates[predicate].append(edge_id)
+        self.size += 1
+
+
+class AttributeIndex:
+    """ Maps attribute type ids to the first attribute of that type on each
+    edge, keyed by edge id.
+
+    The attribute list of each indexed edge and its length are kept, so
+    edges whose attributes were changed in place, e.g. through
+    KEdge.add_attribute, are found and indexed again by refresh.
+    """
+    def __init__(self, edges=None):
+        self.types = defaultdict(dict)
+        self.attribute_lists = {}
+        self.size = 0
+        # Version of the TrackedDict the index is current with, set by its graph.
+        self.version = None
+        if edges is not None:
+            for edge_id, edge in edges.items():
+                self.add(edge_id, edge)
+
+    def add(self, edge_id, edge):
+        self.update(edge_id, edge)
+        self.size += 1
+
+    def update(self, edge_id, edge):
+        """ Indexes the attributes an indexed edge has gained.
+        """
+        attributes = edge.attributes
+        if attributes is not None:
+            for attribute in attributes:
+                self.types[attribute.attribute_type_id].setdefault(edge_id, attribute)
+        self.attribute_lists[edge_id] = (attributes, len(attributes or ()))
+
+    def refresh(self, edges):
+        """ Indexes again the edges whose attribute list was replaced or
+        changed length since it was indexed.
+        """
+        for edge_id, edge in edges.items():
+            attributes, length = self.attribute_lists.get(edge_id, (None, -1))
+            if edge.attributes is not attributes or len(edge.attributes or ()) != length:
+                for edge_attributes in self.types.values():
+                    edge_attributes.pop(edge_id, None)
+                self.update(edge_id, edge)
+
+
+class MetaEdgeIndex:
+    """ Maps (subject, predicate, object) curie triples to the first meta
+    edge with them, and subject, object and predicate curies to their meta
+    edges.
+    """
+    def __init__(self, meta_edges=None):
+        self.keys = {}
+        self.subjects = defaultdict(list)
+        self.objects = defaultdict(list)
+        self.predicates = defaultdict(list)
+        self.size = 0
+        # Version of the TrackedList the index is current with, set by its graph.
+        self.version = None
+        if meta_edges is not None:
+            for meta_edge in meta_edges:
+                self.add(meta_edge)
+
+    def add(self, meta_edge):
+        key = meta_edge.get_key()
+        q_subject, predicate, q_object = key
+        self.keys.setdefault(key, meta_edge)
+        self.subjects[q_subject].append(meta_edge)
+        self.objects[q_object].append(meta_edge)
+        self.predicates[predicate].append(meta_edge)
+        self.size += 1
+
+
+class MetaEdgeTripleIndex:
+    """ Bitset index of the (subject category, predicate, object category)
+    triples a meta knowledge graph answers.
+
+    Every meta edge takes a bit, set under the curies of its subject,
+    predicate and object and of all their ancestors, so the meta edges
+    answering a query edge are an or over the curies of each position and
+    an and across positions. A meta edge with an inverse predicate takes a
+    second bit with its subject and object swapped.
+    """
+    def __init__(self, meta_edges=None):
+        self.rows = []
+        self.subjects = defaultdict(int)
+        self.predicates = defaultdict(int)
+        self.objects = defaultdict(int)
+        self.all_bits = 0
+        self.size = 0
+        # Version of the TrackedList the index is current with, set by its graph.
+        self.version = None
+        if meta_edges is not None:
+            for meta_edge in meta_edges:
+                self.add(meta_edge)
+
+    def add(self, meta_edge):
+        self._add_row(meta_edge, meta_edge.subject, meta_edge.predicate, meta_edge.object)
+        inverse = meta_edge.predicate.get_inverse()
+        if inverse is not None:
+            self._add_row(meta_edge, meta_edge.object, inverse, meta_edge.subject)
+        self.size += 1
+
+    def _add_row(self, meta_edge, q_subject, predicate, q_object):
+        bit = 1 << len(self.rows)
+        self.rows.append(meta_edge)
+        self.all_bits |= bit
+        for bits, biolink_entity in [
+                (self.subjects, q_subject),
+                (self.predicates, predicate),
+                (self.objects, q_object),
+                ]:
+            for curie in _get_ancestor_curies(biolink_entity):
+                bits[curie] |= bit
+
+    def _get_bits(self, bits, curies):
+        if curies is None:
+            return self.all_bits
+        matched_bits = 0
+        for curie in curies:
+            matched_bits |= bits.get(curie, 0)
+        return matched_bits
+
+    def find(self, subject_categories=None, predicates=None, object_categories=None):
+        """ Returns the meta edges answering a query edge with these curies
+        or their descendants, directly or through an inverse predicate. None
+        matches everything.
+        """
+        bits = self._get_bits(self.predicates, predicates)
+        if bits:
+            bits &= self._get_bits(self.subjects, subject_categories)
+        if bits:
+            bits &= self._get_bits(self.objects, object_categories)
+        # A meta edge matching both ways, e.g. with a symmetric inverse, is returned once.
+        matched = {}
+        for row in iter_bits(bits):
+            matched.setdefault(id(self.rows[row]), self.rows[row])
+        return list(matched.values())
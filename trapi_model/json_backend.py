@@ -0,0 +1,137 @@
+"""
+JSON Backends
+
+Loading and dumping of TRAPI JSON goes through this module so a compiled
+encoder can be used when one is installed. Backends are tried in the order
+of BACKENDS, with the standard library json module always available. Set
+trapi_model.set_json_backend to choose one explicitly.
+"""
+import json
+import importlib
+
+import trapi_model
+
+BACKENDS = ['orjson', 'ujson', 'json']
+
+# Backend instances keyed by name.
+_BACKENDS = {}
+
+
+class StdlibBackend:
+    name = 'json'
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, value, indent=None):
+        if indent is None:
+            return json.dumps(value, separators=(',', ':'))
+        return json.dumps(value, indent=indent)
+
+    def dumpb(self, value, indent=None):
+        return self.dumps(value, indent).encode('utf-8')
+
+
+class OrjsonBackend:
+    name = 'orjson'
+
+    def __init__(self):
+        self._orjson = importlib.import_module('orjson')
+        self._stdlib = StdlibBackend()
+
+    def loads(self, data):
+        return self._orjson.loads(data)
+
+    def dumps(self, value, indent=None):
+        return self.dumpb(value, indent).decode('utf-8')
+
+    def dumpb(self, value, indent=None):
+        option = self._orjson.OPT_NON_STR_KEYS
+        if indent == 2:
+            option |= self._orjson.OPT_INDENT_2
+        elif indent is not None:
+            # orjson only indents by two spaces.
+            return self._stdlib.dumpb(value, indent)
+        try:
+            return self._orjson.dumps(value, option=option)
+        except self._orjson.JSONEncodeError:
+            # e.g. integers wider than 64 bits, which the stdlib handles.
+            return self._stdlib.dumpb(value, indent)
+
+
+class UjsonBackend:
+    name = 'ujson'
+
+    def __init__(self):
+        self._ujson = importlib.import_module('ujson')
+
+    def loads(self, data):
+        return self._ujson.loads(data)
+
+    def dumps(self, value, indent=None):
+        return self._ujson.dumps(
+                value,
+                indent=indent or 0,
+                ensure_ascii=False,
+                escape_forward_slashes=False,
+                )
+
+    def dumpb(self, value, indent=None):
+        return self.dumps(value, indent).encode('utf-8')
+
+
+BACKEND_CLASSES = {
+        'orjson': OrjsonBackend,
+        'ujson': UjsonBackend,
+        'json': StdlibBackend,
+        }
+
+
+def get_json_backend(name=None):
+    """ Returns the named backend, or the configured one if name is None.
+
+    With no backend configured the first importable one in BACKENDS is used.
+    """
+    if name is None:
+        name = trapi_model.JSON_BACKEND
+    backend = _BACKENDS.get(name)
+    if backend is not None:
+        return backend
+    if name is None:
+        for backend_name in BACKENDS:
+            try:
+                backend = get_json_backend(backend_name)
+            except ImportError:
+                continue
+            break
+    else:
+        if name not in BACKEND_CLASSES:
+            raise ValueError(
+                    'Unknown JSON backend: {}. Supported backends include: {}'.format(
+                        name,
+                        BACKENDS,
+                        )
+                    )
+        backend = BACKEND_CLASSES[name]()
+    _BACKENDS[name] = backend
+    return backend
+
+def loads(data):
+    """ Decodes a JSON str or bytes.
+    """
+    return get_json_backend().loads(data)
+
+def load(fp):
+    """ Decodes the JSON in a text or binary file.
+    """
+    return get_json_backend().loads(fp.read())
+
+def dumps(value, indent=None):
+    """ Encodes value as a JSON str, compact unless an indent is given.
+    """
+    return get_json_backend().dumps(value, indent)
+
+def dumpb(value, indent=None):
+    """ Encodes value as utf-8 JSON bytes, compact unless an indent is given.
+    """
+    return get_json_backend().dumpb(value, indent)
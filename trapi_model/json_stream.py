@@ -0,0 +1,282 @@
+"""
+Incremental JSON Reading and Writing
+
+JSONStreamReader walks a JSON document from a file or byte stream one value
+at a time, so only the value currently being decoded and one read chunk are
+held in memory. Values that are not needed are skipped without being built.
+
+iter_encode does the reverse: containers wrapped in JSONObjectStream or
+JSONArrayStream are encoded one element at a time, so a large component is
+written out without first building its whole dictionary or string.
+"""
+import io
+import re
+import json
+import codecs
+
+from trapi_model import json_backend
+
+CHUNK_SIZE = 1 << 16
+WHITESPACE = ' \t\n\r'
+
+_DECODER = json.JSONDecoder()
+_STRUCTURE_CHARS = re.compile(r'["{}\[\]]')
+_STRING_CHARS = re.compile(r'["\\]')
+_NUMBER_CHARS = re.compile(r'[-+0-9.eE]*')
+
+
+class JSONStreamReader:
+    def __init__(self, source, chunk_size=CHUNK_SIZE):
+        """ Reads from a file object (text or binary), bytes or a JSON string.
+        """
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        elif isinstance(source, str):
+            source = io.StringIO(source)
+        self._source = source
+        self._text_decoder = None
+        self._buffer = ''
+        self._pos = 0
+        # Number of characters dropped from the front of the buffer.
+        self._offset = 0
+        self._eof = False
+        self.chunk_size = chunk_size
+
+    def _read_chunk(self, size=None):
+        """ Appends the next chunk to the buffer. Returns False at end of stream.
+        """
+        if size is None:
+            size = self.chunk_size
+        while not self._eof:
+            chunk = self._source.read(size)
+            if isinstance(chunk, bytes):
+                if self._text_decoder is None:
+                    self._text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+                self._eof = len(chunk) == 0
+                chunk = self._text_decoder.decode(chunk, final=self._eof)
+            else:
+                self._eof = len(chunk) == 0
+            if chunk:
+                self._offset += self._pos
+                self._buffer = self._buffer[self._pos:] + chunk
+                self._pos = 0
+                return True
+        return False
+
+    def tell(self):
+        """ Character position of the reader in the stream.
+        """
+        return self._offset + self._pos
+
+    def peek(self):
+        """ Returns the next non whitespace character without consuming it.
+        """
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._read_chunk():
+                return None
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError('Expected {!r} at position {} of JSON stream, found {!r}.'.format(
+                char,
+                self.tell(),
+                found,
+                ))
+        self._pos += 1
+
+    def read_value(self):
+        """ Decodes and returns the next JSON value.
+        """
+        char = self.peek()
+        if char is None:
+            raise ValueError('Unexpected end of JSON stream.')
+        if char in '-0123456789':
+            # A number may continue in the next chunk; buffer up to its end.
+            while _NUMBER_CHARS.match(self._buffer, self._pos).end() == len(self._buffer):
+                if not self._read_chunk():
+                    break
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # The value continues past the buffer; read geometrically more
+                # so very large values are not re-parsed once per chunk.
+                if self._read_chunk(size):
+                    size *= 2
+                    continue
+                raise
+            self._pos = end
+            return value
+
+    def skip_value(self):
+        """ Consumes the next JSON value without building it.
+        """
+        char = self.peek()
+        if char is None or char not in '{[':
+            self.read_value()
+            return
+        depth = 0
+        in_string = False
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            while True:
+                pattern = _STRING_CHARS if in_string else _STRUCTURE_CHARS
+                match = pattern.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+                pos = match.end()
+                char = match.group()
+                if in_string:
+                    if char == '\\':
+                        if pos == len(buffer):
+                            # Keep the escape so it is read with its character.
+                            pos -= 1
+                            break
+                        pos += 1
+                    else:
+                        in_string = False
+                elif char == '"':
+                    in_string = True
+                elif char in '{[':
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        self._pos = pos
+                        return
+            self._pos = pos
+            if not self._read_chunk():
+                raise ValueError('Unexpected end of JSON stream.')
+
+    def iter_keys(self):
+        """ Iterates over the keys of the next JSON object.
+
+        After each key the reader is positioned at its value, which the caller
+        may read, descend into or ignore; ignored values are skipped.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise ValueError('Expected an object key at position {} of JSON stream.'.format(self.tell()))
+            key = self.read_value()
+            self.expect(':')
+            self.peek()
+            value_start = self.tell()
+            yield key
+            if self.tell() == value_start:
+                self.skip_value()
+            char = self.peek()
+            self._pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise ValueError('Expected "," or "}}" at position {} of JSON stream, found {!r}.'.format(
+                    self.tell() - 1,
+                    char,
+                    ))
+
+    def iter_items(self):
+        """ Iterates over the (key, value) pairs of the next JSON object.
+        """
+        for key in self.iter_keys():
+            yield key, self.read_value()
+
+
+class JSONObjectStream:
+    """ A JSON object whose (key, value) pairs are produced while encoding.
+    """
+    def __init__(self, items):
+        self.items = items
+
+
+class JSONArrayStream:
+    """ A JSON array whose values are produced while encoding.
+    """
+    def __init__(self, values):
+        self.values = values
+
+
+def iter_encode(value, indent=None, level=0):
+    """ Yields the JSON encoding of value in chunks.
+
+    Objects with a to_json_stream method (TRAPI components) are encoded
+    through it. With indent=None the output is compact; otherwise it is
+    laid out like json.dumps(..., indent=indent). Values below the streamed
+    containers are encoded with the configured JSON backend.
+    """
+    if hasattr(value, 'to_json_stream'):
+        value = value.to_json_stream()
+    if isinstance(value, JSONObjectStream):
+        return _iter_encode_container(
+                ((json.dumps(key) + (':' if indent is None else ': '), item) for key, item in value.items),
+                '{}',
+                indent,
+                level,
+                )
+    if isinstance(value, JSONArrayStream):
+        return _iter_encode_container((('', item) for item in value.values), '[]', indent, level)
+    chunk = json_backend.dumps(value, indent)
+    if indent is not None and level:
+        # Strings are escaped when encoded, so every newline is structural.
+        chunk = chunk.replace('\n', '\n' + ' ' * (indent * level))
+    return iter([chunk])
+
+def _iter_encode_container(items, brackets, indent, level):
+    if indent is None:
+        separator = ','
+        closing = brackets[1]
+    else:
+        separator = ',\n' + ' ' * (indent * (level + 1))
+        closing = '\n' + ' ' * (indent * level) + brackets[1]
+    first = True
+    for prefix, item in items:
+        if first:
+            yield brackets[0] + separator[1:] + prefix
+            first = False
+        else:
+            yield separator + prefix
+        yield from iter_encode(item, indent, level + 1)
+    if first:
+        yield brackets
+    else:
+        yield closing
+
+def write_encoded(fp, value, indent=None, buffer_size=CHUNK_SIZE):
+    """ Writes the JSON encoding of value to a text or binary file or socket.
+
+    Chunks are gathered up to buffer_size characters before each write.
+    """
+    if hasattr(fp, 'write'):
+        write = fp.write
+        binary = isinstance(fp, (io.RawIOBase, io.BufferedIOBase)) or 'b' in getattr(fp, 'mode', '')
+    else:
+        # Sockets only take bytes.
+        write = fp.sendall
+        binary = True
+    buffer = []
+    buffered = 0
+    for chunk in iter_encode(value, indent):
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= buffer_size:
+            data = ''.join(buffer)
+            write(data.encode('utf-8') if binary else data)
+            buffer = []
+            buffered = 0
+    if buffer:
+        data = ''.join(buffer)
+        write(data.encode('utf-8') if binary else data)
@@ -4,18 +4,45 @@ TRAPI Knowedge Graph Data Classes
 """
 import sys
 import json
+import array
 from jsonschema import ValidationError
 
+import trapi_model
+
 from trapi_model.biolink.constants import get_biolink_entity
-from trapi_model.biolink import BiolinkEntity
+from trapi_model.biolink import BiolinkEntity, get_entity
 from trapi_model.exceptions import *
-from trapi_model.base import TrapiBaseClass
+from trapi_model.base import TrapiBaseClass, CompactTrapiClass, get_child_validation_mode, intern_string
+from trapi_model import json_backend
+from trapi_model.json_stream import JSONStreamReader, JSONObjectStream
+from trapi_model.indexes import AttributeIndex, EdgeIndex, NodeIndex, TrackedDict
 
 #from reasoner_validator import validate
-from reasoner_validator import TRAPISchemaValidator
+from trapi_model.validators import validate_component
+
+PRIMARY_KNOWLEDGE_SOURCE = 'primary_knowledge_source'
 
 
-class Source(TrapiBaseClass):
+def get_attribute_key(attribute):
+    """ Hashable identity of an Attribute, used to merge duplicates.
+    """
+    value = attribute.value
+    try:
+        hash(value)
+    except TypeError:
+        # Lists and dicts are compared by their JSON encoding.
+        value = json_backend.dumps(value)
+    return (
+            attribute.attribute_type_id,
+            attribute.original_attribute_name,
+            attribute.attribute_source,
+            value,
+            )
+
+
+class Source(CompactTrapiClass):
+    __slots__ = ('resource_id', 'resource_role', 'upstream_source_ids', 'source_record_urls', 'description')
+
     def __init__(self,
             trapi_version,
             biolink_version,
@@ -25,8 +52,8 @@ class Source(TrapiBaseClass):
             source_record_urls=[],
             description=None,
             ):
-        self.resource_id = resource_id
-        self.resource_role = resource_role
+        self.resource_id = intern_string(resource_id)
+        self.resource_role = intern_string(resource_role)
         self.upstream_source_ids = upstream_source_ids
         self.source_record_urls = source_record_urls
         self.description = description
@@ -48,13 +75,23 @@ class Source(TrapiBaseClass):
                 biolink_version,
                 resource_id=source_info.pop("resource_id"),
                 resource_role=source_info.pop("resource_role"),
-                upstream_source_id=source_info.pop("upstream_resource_ids", None),
+                upstream_source_ids=source_info.pop("upstream_resource_ids", None),
                 source_record_urls=source_info.pop("source_record_urls", None),
                 description=source_info.pop("description", None),
                 )
         return source
 
-class Attribute(TrapiBaseClass):
+class Attribute(CompactTrapiClass):
+    __slots__ = (
+            'attribute_type_id',
+            'value',
+            'value_type_id',
+            'original_attribute_name',
+            'attribute_source',
+            'value_url',
+            'description',
+            )
+
     def __init__(self,
             trapi_version,
             biolink_version,
@@ -66,11 +103,11 @@ class Attribute(TrapiBaseClass):
             value_url=None,
             description=None,
             ):
-        self.attribute_type_id = attribute_type_id
+        self.attribute_type_id = intern_string(attribute_type_id)
         self.value = value
-        self.value_type_id = value_type_id
-        self.original_attribute_name = original_attribute_name
-        self.attribute_source = attribute_source
+        self.value_type_id = intern_string(value_type_id)
+        self.original_attribute_name = intern_string(original_attribute_name)
+        self.attribute_source = intern_string(attribute_source)
         self.value_url = value_url
         self.description = description
         super().__init__(trapi_version, biolink_version)
@@ -86,6 +123,21 @@ class Attribute(TrapiBaseClass):
                     "description": self.description,
                     }
 
+    def with_value(self, value):
+        """ Returns a copy of the attribute holding another value, without
+        the interning and context lookups of __init__.
+        """
+        attribute = Attribute.__new__(Attribute)
+        attribute._context = self._context
+        attribute.attribute_type_id = self.attribute_type_id
+        attribute.value = value
+        attribute.value_type_id = self.value_type_id
+        attribute.original_attribute_name = self.original_attribute_name
+        attribute.attribute_source = self.attribute_source
+        attribute.value_url = self.value_url
+        attribute.description = self.description
+        return attribute
+
     @staticmethod
     def load(trapi_version, biolink_version, attribute_info, name=None):
         attribute = Attribute(
@@ -101,13 +153,16 @@ class Attribute(TrapiBaseClass):
                 )
         return attribute
 
-class KNode(TrapiBaseClass):
+class KNode(CompactTrapiClass):
+    __slots__ = ('name', 'categories', 'attributes')
+
     def __init__(self,
             trapi_version,
             biolink_version,
             name = None,
             categories = None,
             attributes = None,
+            validation_mode = None,
             ):
         self.name = name 
         if type(categories) is not list and categories is not None:
@@ -117,11 +172,8 @@ class KNode(TrapiBaseClass):
             self.attributes = []
         else:
             self.attributes = attributes
-        super().__init__(trapi_version, biolink_version)
-
-        valid, message = self.validate()
-        if not valid:
-            raise InvalidTrapiComponent(trapi_version, 'KNode', message)
+        super().__init__(trapi_version, biolink_version, validation_mode)
+        self.check_component('KNode')
 
     def to_dict(self):
         categories = self.categories
@@ -136,6 +188,38 @@ class KNode(TrapiBaseClass):
             for attribute in self.attributes:
                 _dict["attributes"].append(attribute.to_dict())
         return _dict
+
+    def merge(self, knode):
+        """ Adds the categories and attributes of knode that this node
+        lacks, without validation.
+        """
+        if self.name is None:
+            self.name = knode.name
+        if knode.categories:
+            if self.categories is None:
+                self.categories = []
+            for category in knode.categories:
+                if category not in self.categories:
+                    self.categories.append(category)
+        if knode.attributes:
+            if self.attributes is None:
+                self.attributes = []
+            attribute_keys = set(get_attribute_key(attribute) for attribute in self.attributes)
+            for attribute in knode.attributes:
+                attribute_key = get_attribute_key(attribute)
+                if attribute_key not in attribute_keys:
+                    attribute_keys.add(attribute_key)
+                    self.attributes.append(attribute)
+
+    def clone(self):
+        """ Copies the category and attribute lists; Attributes are shared.
+        """
+        knode = super().clone()
+        if self.categories is not None:
+            knode.categories = list(self.categories)
+        if self.attributes is not None:
+            knode.attributes = list(self.attributes)
+        return knode
     
     def set_categories(self, categories):
         if type(categories) is str:
@@ -152,8 +236,8 @@ class KNode(TrapiBaseClass):
             self.categories = _categories
 
     @staticmethod
-    def load(trapi_version, biolink_version, knode_info):
-        knode = KNode(trapi_version, biolink_version)
+    def load(trapi_version, biolink_version, knode_info, validation_mode=None):
+        knode = KNode(trapi_version, biolink_version, validation_mode=trapi_model.VALIDATION_OFF)
         categories = knode_info.pop("categories", None)
         if categories is not None:
             knode.set_categories(categories)
@@ -168,11 +252,9 @@ class KNode(TrapiBaseClass):
                             attribute_info,
                             )
                         )
-        valid, message = knode.validate()
-        if valid:
-            return knode
-        else:
-            raise InvalidTrapiComponent(trapi_version, 'KNode', message)
+        knode.set_validation_mode(validation_mode)
+        knode.check_loaded_component('KNode')
+        return knode
 
     def add_attribute(self, 
             attribute_type_id,
@@ -198,21 +280,15 @@ class KNode(TrapiBaseClass):
                     description=description,
                     )
                 )
-        valid, message = self.validate()
-        if not valid:
-            raise InvalidTrapiComponent(self.trapi_version, 'KNode', message)
+        self.check_component('KNode')
 
     def validate(self):
         _dict = self.to_dict()
-        tsv = TRAPISchemaValidator(self.trapi_version)
-        try:
-            #validate(_dict, 'Node', self.trapi_version)
-            tsv.validate(_dict, 'Node')
-            return True, None 
-        except ValidationError as ex:
-            return False, ex.message
-
-class KEdge(TrapiBaseClass):
+        return validate_component(_dict, self.trapi_version, 'Node')
+
+class KEdge(CompactTrapiClass):
+    __slots__ = ('subject', 'object', 'predicate', 'sources', 'attributes')
+
     def __init__(self,
             trapi_version,
             biolink_version,
@@ -221,21 +297,18 @@ class KEdge(TrapiBaseClass):
             sources,
             predicate=None,
             attributes=None,
+            validation_mode=None,
             ):
-        self.subject = k_subject
-        self.object = k_object
+        self.subject = intern_string(k_subject)
+        self.object = intern_string(k_object)
         self.predicate = predicate
         self.sources = sources
         if attributes is None:
             self.attributes = []
         else:
             self.attributes = attributes
-        super().__init__(trapi_version, biolink_version)
-        
-        valid, message = self.validate()
-
-        if not valid:
-            raise InvalidTrapiComponent(trapi_version, 'KEdge', message)
+        super().__init__(trapi_version, biolink_version, validation_mode)
+        self.check_component('KEdge')
 
     def to_dict(self):
         predicate = self.predicate
@@ -256,13 +329,66 @@ class KEdge(TrapiBaseClass):
                 _dict["sources"].append(source.to_dict())
         return _dict
 
+    def get_primary_source(self):
+        """ Returns the resource id of the primary knowledge source, or None.
+        """
+        if self.sources is not None:
+            for source in self.sources:
+                if source.resource_role == PRIMARY_KNOWLEDGE_SOURCE:
+                    return source.resource_id
+        return None
+
+    def get_key(self):
+        """ Identity of the edge when merging graphs: (subject, predicate
+        curie, object, primary source).
+        """
+        predicate = self.predicate
+        if predicate is not None:
+            predicate = predicate.get_curie()
+        return (self.subject, predicate, self.object, self.get_primary_source())
+
+    def merge(self, kedge):
+        """ Adds the attributes and sources of kedge that this edge lacks,
+        without validation.
+        """
+        if kedge.attributes:
+            if self.attributes is None:
+                self.attributes = []
+            attribute_keys = set(get_attribute_key(attribute) for attribute in self.attributes)
+            for attribute in kedge.attributes:
+                attribute_key = get_attribute_key(attribute)
+                if attribute_key not in attribute_keys:
+                    attribute_keys.add(attribute_key)
+                    self.attributes.append(attribute)
+        if kedge.sources:
+            if self.sources is None:
+                self.sources = []
+            source_keys = set((source.resource_id, source.resource_role) for source in self.sources)
+            for source in kedge.sources:
+                source_key = (source.resource_id, source.resource_role)
+                if source_key not in source_keys:
+                    source_keys.add(source_key)
+                    self.sources.append(source)
+
+    def clone(self):
+        """ Copies the attribute and source lists; Attributes and Sources are shared.
+        """
+        kedge = super().clone()
+        if self.attributes is not None:
+            kedge.attributes = list(self.attributes)
+        if self.sources is not None:
+            kedge.sources = list(self.sources)
+        return kedge
+
     @staticmethod
-    def load(trapi_version, biolink_version, kedge_info):
+    def load(trapi_version, biolink_version, kedge_info, validation_mode=None):
         kedge = KEdge(
                 trapi_version,
                 biolink_version,
                 kedge_info.pop("subject"),
                 kedge_info.pop("object"),
+                [],
+                validation_mode=trapi_model.VALIDATION_OFF,
                 )
         predicate = kedge_info.pop("predicate", None)
         if predicate is not None:
@@ -287,11 +413,8 @@ class KEdge(TrapiBaseClass):
                         source_info,
                         )
                     )
-        valid, message = kedge.validate()
-        if valid:
-            return kedge
-        else:
-            raise InvalidTrapiComponent(trapi_version, 'KEdge', message)
+        kedge.set_validation_mode(validation_mode)
+        kedge.check_loaded_component('KEdge')
         return kedge
     
     def add_attribute(self, 
@@ -318,56 +441,102 @@ class KEdge(TrapiBaseClass):
                     description=description,
                     )
                 )
-        valid, message = self.validate()
-        if not valid:
-            raise InvalidTrapiComponent(self.trapi_version, 'QEdge', message)
+        self.check_component('KEdge')
 
 
     def validate(self):
         _dict = self.to_dict()
-        tsv = TRAPISchemaValidator(self.trapi_version)
-        try:
-            #validate(_dict, 'Edge', self.trapi_version)
-            tsv.validate(_dict, 'Edge')
-            return True, None 
-        except ValidationError as ex:
-            return False, ex.message
+        return validate_component(_dict, self.trapi_version, 'Edge')
 
 class KnowledgeGraph(TrapiBaseClass):
-    def __init__(self, trapi_version='1.2', biolink_version=None):
-        self.nodes = {}
-        self.edges = {}
+    def __init__(self, trapi_version='1.2', biolink_version=None, validation_mode=None):
+        self.nodes = TrackedDict()
+        self.edges = TrackedDict()
         self.node_counter = 0
         self.edge_counter = 0
-        super().__init__(trapi_version, biolink_version)
+        # Indexes built on first lookup and maintained by add_node, add_edge and merge.
+        # Any other change to nodes or edges bumps their version and the
+        # indexes are rebuilt on the next lookup.
+        self._node_index = None
+        self._edge_index = None
+        self._attribute_index = None
+        super().__init__(trapi_version, biolink_version, validation_mode)
+
+    @property
+    def nodes(self):
+        return self._nodes
+
+    @nodes.setter
+    def nodes(self, nodes):
+        if type(nodes) is not TrackedDict:
+            nodes = TrackedDict(nodes)
+        self._nodes = nodes
+
+    @property
+    def edges(self):
+        return self._edges
+
+    @edges.setter
+    def edges(self, edges):
+        if type(edges) is not TrackedDict:
+            edges = TrackedDict(edges)
+        self._edges = edges
+
+    def set_validation_mode(self, validation_mode):
+        super().set_validation_mode(validation_mode)
+        for node in self.nodes.values():
+            node.set_validation_mode(self.validation_mode)
+        for edge in self.edges.values():
+            edge.set_validation_mode(self.validation_mode)
+
+    def clone(self, share_elements=False):
+        """ Copies the graph. With share_elements the node and edge dicts are
+        copied but their KNodes and KEdges are shared with this graph, which
+        is cheaper for large graphs whose elements will not be modified.
+        """
+        knowledge_graph = super().clone()
+        knowledge_graph._node_index = None
+        knowledge_graph._edge_index = None
+        knowledge_graph._attribute_index = None
+        if share_elements:
+            knowledge_graph.nodes = dict(self.nodes)
+            knowledge_graph.edges = dict(self.edges)
+        else:
+            knowledge_graph.nodes = {node_id: node.clone() for node_id, node in self.nodes.items()}
+            knowledge_graph.edges = {edge_id: edge.clone() for edge_id, edge in self.edges.items()}
+        return knowledge_graph
 
     def add_node(self, curie, name, categories):
         # Run categories through Biolink
         if type(categories) is not list and categories is not None:
-            categories = [BiolinkEntity(categories, biolink_version=self.biolink_version)]
+            categories = [get_entity(categories, biolink_version=self.biolink_version)]
         elif categories is not None:
             _categories = []
             for category in categories:
                 if type(category) is BiolinkEntity:
                     _categories.append(category)
                 else:
-                    _categories.append(BiolinkEntity(category, biolink_version=self.biolink_version))
+                    _categories.append(get_entity(category, biolink_version=self.biolink_version))
             categories = _categories
         self.node_counter += 1
+        if curie in self.nodes:
+            # The replaced node may have had other categories.
+            self._node_index = None
         self.nodes[curie] = KNode(
                 trapi_version=self.trapi_version,
                 biolink_version=self.biolink_version,
                 name=name,
-                categories=categories
+                categories=categories,
+                validation_mode=self.validation_mode,
                 )
+        self._index_node(curie)
         return curie
 
     def add_edge(self, k_subject, k_object, sources, predicate=None):
         # Run predicates through Biolink
         if type(predicate) is not BiolinkEntity:
-            predicate = BiolinkEntity(predicate, biolink_version=self.biolink_version)
-        edge_id = 'e{}'.format(self.edge_counter)
-        self.edge_counter += 1
+            predicate = get_entity(predicate, biolink_version=self.biolink_version)
+        edge_id = self._get_new_edge_id()
         self.edges[edge_id] = KEdge(
                 trapi_version=self.trapi_version,
                 biolink_version=self.biolink_version,
@@ -375,9 +544,158 @@ class KnowledgeGraph(TrapiBaseClass):
                 k_object=k_object,
                 sources=sources,
                 predicate=predicate,
+                validation_mode=self.validation_mode,
                 )
+        self._index_edge(edge_id)
         return edge_id
 
+    def _get_new_edge_id(self):
+        edge_id = 'e{}'.format(self.edge_counter)
+        self.edge_counter += 1
+        # Loaded graphs may already use the counter's ids.
+        while edge_id in self.edges:
+            edge_id = 'e{}'.format(self.edge_counter)
+            self.edge_counter += 1
+        return edge_id
+
+    def _index_node(self, node_id):
+        """ Adds a node just set through add_node or merge to the index, if
+        the index was current before it was set.
+        """
+        node_index = self._node_index
+        if node_index is not None and node_index.version == self.nodes.version - 1:
+            node_index.add(node_id, self.nodes[node_id])
+            node_index.version = self.nodes.version
+
+    def _get_node_index(self):
+        """ Returns the NodeIndex, rebuilt if nodes were set or removed
+        other than through add_node and merge.
+        """
+        if self._node_index is None or self._node_index.version != self.nodes.version:
+            # Knowledge graph nodes are keyed by their curie and have no ids.
+            self._node_index = NodeIndex(self.nodes, index_ids=False)
+            self._node_index.version = self.nodes.version
+        return self._node_index
+
+    def _index_edge(self, edge_id):
+        """ Adds an edge just set through add_edge or merge to the indexes
+        that were current before it was set.
+        """
+        for edge_index in [self._edge_index, self._attribute_index]:
+            if edge_index is not None and edge_index.version == self.edges.version - 1:
+                edge_index.add(edge_id, self.edges[edge_id])
+                edge_index.version = self.edges.version
+
+    def _get_edge_index(self):
+        """ Returns the EdgeIndex, rebuilt if edges were set or removed
+        other than through add_edge and merge.
+        """
+        if self._edge_index is None or self._edge_index.version != self.edges.version:
+            self._edge_index = EdgeIndex(self.edges)
+            self._edge_index.version = self.edges.version
+        return self._edge_index
+
+    def _get_attribute_index(self):
+        """ Returns the AttributeIndex, rebuilt if edges were set or removed
+        other than through add_edge and merge, and refreshed for edges whose
+        attributes were changed in place.
+        """
+        if self._attribute_index is None or self._attribute_index.version != self.edges.version:
+            self._attribute_index = AttributeIndex(self.edges)
+            self._attribute_index.version = self.edges.version
+        else:
+            self._attribute_index.refresh(self.edges)
+        return self._attribute_index
+
+    def drop_indexes(self):
+        """ Frees the node, edge and attribute indexes. They are rebuilt on
+        the next lookup; call this after changing the categories of an
+        indexed node or the subject, object or predicate of an indexed edge
+        in place.
+        """
+        self._node_index = None
+        self._edge_index = None
+        self._attribute_index = None
+
+    def edges_of(self, node_id, direction='both'):
+        """ Returns the ids of the edges of a node: 'out' for edges it is the
+        subject of, 'in' for edges it is the object of, or 'both'.
+        """
+        edge_index = self._get_edge_index()
+        if direction == 'out':
+            return list(edge_index.out_edges.get(node_id, ()))
+        if direction == 'in':
+            return list(edge_index.in_edges.get(node_id, ()))
+        if direction != 'both':
+            raise ValueError('Unknown edge direction: {}'.format(direction))
+        edge_ids = list(edge_index.out_edges.get(node_id, ()))
+        # Self loops are already listed as out edges.
+        edge_ids.extend(edge_id for edge_id in edge_index.in_edges.get(node_id, ()) \
+                if self.edges[edge_id].subject != node_id)
+        return edge_ids
+
+    def edges_between(self, node_id_1, node_id_2, directed=False):
+        """ Returns the ids of the edges from node_id_1 to node_id_2 and, unless
+        directed, from node_id_2 to node_id_1.
+        """
+        edge_index = self._get_edge_index()
+        edge_ids = list(edge_index.pairs.get((node_id_1, node_id_2), ()))
+        if not directed and node_id_1 != node_id_2:
+            edge_ids.extend(edge_index.pairs.get((node_id_2, node_id_1), ()))
+        return edge_ids
+
+    def edges_with_predicate(self, predicate):
+        """ Returns the ids of the edges with a predicate, given as a curie or BiolinkEntity.
+        """
+        if isinstance(predicate, BiolinkEntity):
+            predicate = predicate.get_curie()
+        return list(self._get_edge_index().predicates.get(predicate, ()))
+
+    def find_edge(self, k_subject, predicate, k_object, primary_source=None):
+        """ Returns the id of the edge with this (subject, predicate, object,
+        primary source), or None.
+        """
+        if isinstance(predicate, BiolinkEntity):
+            predicate = predicate.get_curie()
+        return self._get_edge_index().keys.get((k_subject, predicate, k_object, primary_source))
+
+    def merge(self, knowledge_graph):
+        """ Merges the nodes and edges of another graph into this one.
+
+        Nodes are merged on id and edges on (subject, predicate, object,
+        primary source); attributes and sources missing from an existing
+        node or edge are added to it. New elements are cloned in without
+        validation. Returns a map from the edge ids of knowledge_graph to
+        the edge ids in this graph.
+        """
+        for node_id, node in knowledge_graph.nodes.items():
+            master_node = self.nodes.get(node_id)
+            if master_node is None:
+                master_node = node.clone()
+                master_node.set_validation_mode(self.validation_mode)
+                self.nodes[node_id] = master_node
+                self.node_counter += 1
+                self._index_node(node_id)
+            else:
+                master_node.merge(node)
+                if self._node_index is not None:
+                    self._node_index.update(node_id, master_node)
+        edge_id_map = {}
+        for edge_id, edge in knowledge_graph.edges.items():
+            master_edge_id = self.find_edge(*edge.get_key())
+            if master_edge_id is None:
+                master_edge_id = self._get_new_edge_id()
+                master_edge = edge.clone()
+                master_edge.set_validation_mode(self.validation_mode)
+                self.edges[master_edge_id] = master_edge
+                self._index_edge(master_edge_id)
+            else:
+                self.edges[master_edge_id].merge(edge)
+                if self._attribute_index is not None:
+                    self._attribute_index.update(master_edge_id, self.edges[master_edge_id])
+            edge_id_map[edge_id] = master_edge_id
+        return edge_id_map
+
     def add_attribute(self,
             attribute_type_id,
             value,
@@ -406,8 +724,103 @@ class KnowledgeGraph(TrapiBaseClass):
             value_url=value_url,
             description=description,
                 )
+        if edge_id is not None and self._attribute_index is not None:
+            self._attribute_index.update(edge_id, q_obj)
         return True
 
+    def get_edge_attribute_values(self, attribute_type_id, edge_ids=None):
+        """ Returns the values of the first attribute of this type on each
+        edge, in the order of edge_ids or of the graph's edges.
+
+        Numeric values are returned as a float64 NumPy array, or an 'd'
+        array when NumPy is not installed, with NaN for edges without the
+        attribute. Other values are returned as a list with None for them.
+        """
+        # Imported here so NumPy is only loaded when needed.
+        from trapi_model.columnar import numpy
+        attributes = self._get_attribute_index().types.get(attribute_type_id, {})
+        if edge_ids is None:
+            edge_ids = self.edges
+        values = []
+        is_numeric = True
+        for edge_id in edge_ids:
+            attribute = attributes.get(edge_id)
+            if attribute is None:
+                values.append(None)
+                continue
+            value = attribute.value
+            if type(value) not in (int, float):
+                is_numeric = False
+            values.append(value)
+        if not is_numeric:
+            return values
+        values = [float('nan') if value is None else value for value in values]
+        if numpy is not None:
+            return numpy.array(values, dtype=numpy.float64)
+        return array.array('d', values)
+
+    def edges_with_attribute(self, attribute_type_id, min_value=None, max_value=None):
+        """ Returns the ids of the edges with an attribute of this type whose
+        numeric value is within the bounds, e.g. a score above a threshold.
+        Without bounds, every edge with the attribute is returned.
+        """
+        attributes = self._get_attribute_index().types.get(attribute_type_id, {})
+        if min_value is None and max_value is None:
+            return list(attributes)
+        return [
+                edge_id for edge_id, attribute in attributes.items()
+                if type(attribute.value) in (int, float) and \
+                        (min_value is None or attribute.value >= min_value) and \
+                        (max_value is None or attribute.value <= max_value)
+                ]
+
+    def set_edge_attribute_values(self,
+            attribute_type_id,
+            edge_ids,
+            values,
+            value_type_id=None,
+            original_attribute_name=None,
+            attribute_source=None,
+            ):
+        """ Sets an attribute of this type on many edges at once, e.g.
+        computed scores, replacing the first attribute of the type an edge
+        already has. values is a sequence aligned with edge_ids, such as a
+        NumPy array.
+
+        The edges are not validated one by one. In eager mode the first
+        updated edge is validated, as all new attributes share their fields.
+        """
+        if hasattr(values, 'tolist'):
+            # NumPy scalars are not JSON serializable.
+            values = values.tolist()
+        if len(values) != len(edge_ids):
+            raise ValueError('Got {} values for {} edges.'.format(len(values), len(edge_ids)))
+        attributes = self._get_attribute_index().types[attribute_type_id]
+        template = Attribute(
+                trapi_version=self.trapi_version,
+                biolink_version=self.biolink_version,
+                attribute_type_id=attribute_type_id,
+                value_type_id=value_type_id,
+                original_attribute_name=original_attribute_name,
+                attribute_source=attribute_source,
+                )
+        for edge_id, value in zip(edge_ids, values):
+            edge = self.edges[edge_id]
+            attribute = template.with_value(value)
+            if edge.attributes is None:
+                edge.attributes = []
+            old_attribute = attributes.get(edge_id)
+            # Replaced rather than changed in place, as Attributes may be shared by cloned edges.
+            for i, other in enumerate(edge.attributes):
+                if other is old_attribute:
+                    edge.attributes[i] = attribute
+                    break
+            else:
+                edge.attributes.append(attribute)
+            attributes[edge_id] = attribute
+        if len(edge_ids) > 0:
+            self.edges[edge_ids[0]].check_component('KEdge')
+
     def to_dict(self):
         nodes = {}
         edges = {}
@@ -420,48 +833,135 @@ class KnowledgeGraph(TrapiBaseClass):
                 "edges": edges,
                 }
 
-    def find_nodes(self, categories=None, ids=None):
-        matched_node_ids = []
-        for node_id, node_info in self.nodes.items():
-            if categories is not None:
-                if node_info.categories != categories:
-                    continue
-            if ids is not None:
-                if node_info.ids != ids:
-                    continue
-            matched_node_ids.append(node_id)
+    def to_json_stream(self):
+        return JSONObjectStream([
+                ("nodes", JSONObjectStream(self.nodes.items())),
+                ("edges", JSONObjectStream(self.edges.items())),
+                ])
+
+    def find_nodes(self, categories=None, ids=None, descendants=False):
+        """ Returns the ids of the nodes that have all of the given categories,
+        restricted to ids if given.
+
+        With descendants a node also matches a category if it has one of its
+        descendants.
+        """
+        if categories is not None and type(categories) is not list:
+            categories = [categories]
+        if type(ids) is str:
+            ids = [ids]
+        node_ids = None
+        if ids is not None:
+            node_ids = [node_id for node_id in ids if node_id in self.nodes]
+        matched_node_ids = self._get_node_index().find(categories, descendants=descendants, node_ids=node_ids)
+        if matched_node_ids is None:
+            return list(self.nodes)
         return matched_node_ids
 
     def validate(self):
         _dict = self.to_dict()
-        tsv = TRAPISchemaValidator(self.trapi_version)
-        try:
-            #validate(_dict, 'KnowledgeGraph', self.trapi_version)
-            tsv.validate(_dict, 'KnowledgeGraph')
-            return True, None 
-        except ValidationError as ex:
-            return False, ex.message
+        return validate_component(_dict, self.trapi_version, 'KnowledgeGraph')
 
     @staticmethod
-    def load(trapi_version, biolink_version, knowledge_graph):
-        new_knowledge_graph = KnowledgeGraph(trapi_version, biolink_version)
+    def load(trapi_version, biolink_version, knowledge_graph, validation_mode=None):
+        new_knowledge_graph = KnowledgeGraph(trapi_version, biolink_version, validation_mode)
+        child_validation_mode = get_child_validation_mode(new_knowledge_graph.validation_mode)
+        # Filled as plain dicts, which are tracked once assigned.
+        nodes = {}
+        edges = {}
         # Load Nodes
         for node_id, node_info in knowledge_graph["nodes"].items():
-            new_knowledge_graph.nodes[node_id] = KNode.load(
+            # Shared with the subjects and objects of the edges.
+            nodes[intern_string(node_id)] = KNode.load(
                     trapi_version,
                     biolink_version,
                     node_info,
+                    validation_mode=child_validation_mode,
                     )
         # Load Edges
         for edge_id, edge_info in knowledge_graph["edges"].items():
-            new_knowledge_graph.edges[edge_id] = KEdge.load(
+            edges[edge_id] = KEdge.load(
                     trapi_version,
                     biolink_version,
                     edge_info,
+                    validation_mode=child_validation_mode,
                     )
-        valid, message = new_knowledge_graph.validate()
-        if valid:
-            return new_knowledge_graph
-        else:
-            raise InvalidTrapiComponent(trapi_version, 'KnowledgeGraph', message)
+        new_knowledge_graph.nodes = nodes
+        new_knowledge_graph.edges = edges
+        new_knowledge_graph.set_validation_mode(new_knowledge_graph.validation_mode)
+        new_knowledge_graph.check_loaded_component('KnowledgeGraph')
+        return new_knowledge_graph
         
+
+    @staticmethod
+    def iter_load(trapi_version, biolink_version, source=None, filename=None, validation_mode=None):
+        """ Incrementally loads Knowledge Graph nodes and edges from a stream.
+
+        Yields ('nodes', node_id, KNode) and ('edges', edge_id, KEdge) tuples
+        as they are parsed from a file object, bytes or filename. The source may
+        hold a Knowledge Graph or a Message, Query or Response containing one.
+        Only the element being parsed is held as a dictionary, so memory stays
+        bounded by the loaded objects. Elements are validated one at a time,
+        also in deferred mode, since a whole graph schema pass would need the
+        full graph as a dictionary.
+        """
+        if filename is not None:
+            with open(filename, 'rb') as kg_file:
+                yield from KnowledgeGraph.iter_load(
+                        trapi_version,
+                        biolink_version,
+                        source=kg_file,
+                        validation_mode=validation_mode,
+                        )
+            return
+        if source is None:
+            raise ValueError('Must specify either a source or filename.')
+        validation_mode = trapi_model.get_validation_mode(validation_mode)
+        if validation_mode == trapi_model.VALIDATION_OFF:
+            element_validation_mode = trapi_model.VALIDATION_OFF
+        else:
+            element_validation_mode = trapi_model.VALIDATION_EAGER
+        loaders = {'nodes': KNode.load, 'edges': KEdge.load}
+        reader = JSONStreamReader(source)
+        for element_type, element_id, element_info in KnowledgeGraph._iter_stream_elements(reader):
+            element = loaders[element_type](
+                    trapi_version,
+                    biolink_version,
+                    element_info,
+                    validation_mode=element_validation_mode,
+                    )
+            element.set_validation_mode(validation_mode)
+            yield element_type, intern_string(element_id), element
+
+    @staticmethod
+    def _iter_stream_elements(reader):
+        for key in reader.iter_keys():
+            if reader.peek() != '{':
+                continue
+            if key in ('nodes', 'edges'):
+                for element_id, element_info in reader.iter_items():
+                    yield key, element_id, element_info
+            elif key in ('message', 'knowledge_graph'):
+                yield from KnowledgeGraph._iter_stream_elements(reader)
+
+    @staticmethod
+    def load_stream(trapi_version, biolink_version, source=None, filename=None, validation_mode=None):
+        """ Builds a KnowledgeGraph from a stream, see KnowledgeGraph.iter_load.
+        """
+        new_knowledge_graph = KnowledgeGraph(trapi_version, biolink_version, validation_mode)
+        nodes = {}
+        edges = {}
+        for element_type, element_id, element in KnowledgeGraph.iter_load(
+                trapi_version,
+                biolink_version,
+                source=source,
+                filename=filename,
+                validation_mode=new_knowledge_graph.validation_mode,
+                ):
+            if element_type == 'nodes':
+                nodes[element_id] = element
+            else:
+                edges[element_id] = element
+        new_knowledge_graph.nodes = nodes
+        new_knowledge_graph.edges = edges
+        return new_knowledge_graph
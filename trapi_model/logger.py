@@ -63,6 +63,11 @@ class Logger(TrapiBaseClass):
     def error(self, message, code=None):
         self.add_log('ERROR', message, code)
 
+    def clone(self):
+        logger = super().clone()
+        logger.logs = list(self.logs)
+        return logger
+
     def to_dict(self):
         logs = [log.to_dict() for log in self.logs]
         return logs 
@@ -6,23 +6,32 @@ import itertools
 from collections import defaultdict
 from deepdiff import DeepDiff
 
+import trapi_model
+
 from chp_utils.generic import dict_replace_value
 #from reasoner_validator import validate
-from reasoner_validator import TRAPISchemaValidator
+from trapi_model.validators import validate_component
 
-from trapi_model.base import TrapiBaseClass
+from trapi_model.base import TrapiBaseClass, get_child_validation_mode
+from trapi_model.json_stream import JSONObjectStream
+from trapi_model.exceptions import InvalidTrapiComponent
 from trapi_model.query_graph import QueryGraph
 from trapi_model.knowledge_graph import KnowledgeGraph
-from trapi_model.results import Results, Result
+from trapi_model.results import Results, Result, Binding
 
 
 class Message(TrapiBaseClass):
-    def __init__(self, trapi_version='1.2', biolink_version=None):
-        self.trapi_version = trapi_version
-        self.biolink_version = biolink_version
-        self.query_graph = QueryGraph(trapi_version, biolink_version)
-        self.knowledge_graph = KnowledgeGraph(trapi_version, biolink_version)
-        self.results = Results(trapi_version, biolink_version)
+    def __init__(self, trapi_version='1.2', biolink_version=None, validation_mode=None):
+        super().__init__(trapi_version, biolink_version, validation_mode)
+        self.query_graph = QueryGraph(trapi_version, biolink_version, self.validation_mode)
+        self.knowledge_graph = KnowledgeGraph(trapi_version, biolink_version, self.validation_mode)
+        self.results = Results(trapi_version, biolink_version, self.validation_mode)
+
+    def set_validation_mode(self, validation_mode):
+        super().set_validation_mode(validation_mode)
+        self.query_graph.set_validation_mode(self.validation_mode)
+        self.knowledge_graph.set_validation_mode(self.validation_mode)
+        self.results.set_validation_mode(self.validation_mode)
 
     def to_dict(self):
         return {
@@ -32,20 +41,34 @@ class Message(TrapiBaseClass):
                 "auxiliary_graphs": [],
                 }
 
+    def to_json_stream(self):
+        return JSONObjectStream([
+                ("query_graph", self.query_graph),
+                ("knowledge_graph", self.knowledge_graph),
+                ("results", self.results),
+                ("auxiliary_graphs", []),
+                ])
+
+    def clone(self, share_knowledge_graph_elements=False):
+        message = super().clone()
+        message.query_graph = self.query_graph.clone()
+        message.knowledge_graph = self.knowledge_graph.clone(share_elements=share_knowledge_graph_elements)
+        message.results = self.results.clone()
+        return message
+
     def find_and_replace(self, old_value, new_value):
         message_dict = self.to_dict()
         replaced_message_dict = dict_replace_value(message_dict, old_value, new_value)
-        return Message.load(self.trapi_version, self.biolink_version, replaced_message_dict)
+        return Message.load(
+                self.trapi_version,
+                self.biolink_version,
+                replaced_message_dict,
+                validation_mode=self.validation_mode,
+                )
 
     def validate(self):
         _dict = self.to_dict()
-        tsv = TRAPISchemaValidator(self.trapi_version)
-        try:
-            #validate(_dict, 'Message', self.trapi_version)
-            tsv.validate(_dict, 'Message')
-            return True, None 
-        except ValidationError as ex:
-            return False, ex.message
+        return validate_component(_dict, self.trapi_version, 'Message')
 
     @staticmethod
     def check_messages_are_equal(message_1, message_2):
@@ -58,87 +81,77 @@ class Message(TrapiBaseClass):
             return False
 
     @staticmethod
-    def load(trapi_version, biolink_version, message):
-        new_message = Message(trapi_version, biolink_version)
+    def load(trapi_version, biolink_version, message, validation_mode=None, columnar_results=False, max_results=None):
+        """ Loads a TRAPI message. With columnar_results, results are loaded
+        as ColumnarResults rather than Result objects. With max_results only
+        the best scored results are kept.
+        """
+        new_message = Message(trapi_version, biolink_version, validation_mode)
+        child_validation_mode = get_child_validation_mode(new_message.validation_mode)
         query_graph = message.pop("query_graph", None)
         knowledge_graph = message.pop("knowledge_graph", None)
         results = message.pop("results", None)
         if query_graph is not None:
-            new_message.query_graph = QueryGraph.load(trapi_version, biolink_version, query_graph)
+            new_message.query_graph = QueryGraph.load(
+                    trapi_version,
+                    biolink_version,
+                    query_graph,
+                    validation_mode=child_validation_mode,
+                    )
         if knowledge_graph is not None:
-            new_message.knowledge_graph = KnowledgeGraph.load(trapi_version, biolink_version, knowledge_graph)
-        if results is not None:
-            new_message.results = Results.load(trapi_version, biolink_version, results)
+            new_message.knowledge_graph = KnowledgeGraph.load(
+                    trapi_version,
+                    biolink_version,
+                    knowledge_graph,
+                    validation_mode=child_validation_mode,
+                    )
+        if results is not None and columnar_results:
+            # Imported here so NumPy is only loaded when needed.
+            from trapi_model.columnar import ColumnarResults
+            new_message.results = ColumnarResults.load(
+                    trapi_version,
+                    biolink_version,
+                    results,
+                    validation_mode=child_validation_mode,
+                    max_results=max_results,
+                    )
+        elif results is not None:
+            new_message.results = Results.load(
+                    trapi_version,
+                    biolink_version,
+                    results,
+                    validation_mode=child_validation_mode,
+                    )
+            if max_results is not None:
+                new_message.results = new_message.results.top_n(max_results)
+        new_message.set_validation_mode(new_message.validation_mode)
+        # Eager mode has already validated every component as it was loaded.
+        if new_message.validation_mode == trapi_model.VALIDATION_DEFERRED:
+            new_message.check_loaded_component('Message')
         return new_message
 
     def update(self, kg, res=None):
-        _map = {}
-        # Process KG nodes
-        for knode_id, knode in kg.nodes.items():
-            master_knode_id = self.knowledge_graph.add_node(
-                    knode_id,
-                    knode.name,
-                    categories=knode.categories,
-                    )
-            if knode.attributes is not None:
-                for attribute in knode.attributes:
-                    self.knowledge_graph.add_attribute(
-                        attribute_type_id=attribute.attribute_type_id,
-                        value=attribute.value,
-                        value_type_id=attribute.value_type_id,
-                        original_attribute_name=attribute.original_attribute_name,
-                        attribute_source=attribute.attribute_source,
-                        value_url=attribute.value_url,
-                        description=attribute.description,
-                        node_id=master_knode_id,
-                        )
-            _map[knode_id] = master_knode_id
-        # Process edges
-        for kedge_id, kedge in kg.edges.items():
-            master_kedge_id = self.knowledge_graph.add_edge(
-                    k_object=kedge.object,
-                    k_subject=kedge.subject,
-                    sources=kedge.sources,
-                    predicate=kedge.predicate,
-                    )
-            if kedge.attributes is not None:
-                for attribute in kedge.attributes:
-                    self.knowledge_graph.add_attribute(
-                        attribute_type_id=attribute.attribute_type_id,
-                        value=attribute.value,
-                        value_type_id=attribute.value_type_id,
-                        original_attribute_name=attribute.original_attribute_name,
-                        attribute_source=attribute.attribute_source,
-                        value_url=attribute.value_url,
-                        description=attribute.description,
-                        edge_id=master_kedge_id,
-                        )
-            _map[kedge_id] = master_kedge_id
-        # Process results
-        if res is not None:
-            for result in res.results:
-                # Process node bindings
-                new_node_bindings_conflate = dict()
-                new_node_bindings = defaultdict(list)
-                for qg_id, node_bindings in result.node_bindings.items():
-                    for binding in node_bindings:
-                        new_kg_id = _map[binding.id]
-                        conflate_term = binding.conflate_term
-                        new_node_bindings[qg_id].append(new_kg_id)
-                        if conflate_term is not None:
-                            new_node_bindings_conflate[qg_id] = conflate_term
-                new_node_bindings_with_conflate = dict()
-                for qg_id, new_kg_ids in new_node_bindings.items():
-                    if qg_id in new_node_bindings_conflate:
-                        new_node_bindings_with_conflate.update({qg_id: {'ids': new_kg_ids,
-                                                                        'query_id': new_node_bindings_conflate[qg_id]}})
-                    else:
-                        new_node_bindings_with_conflate.update({qg_id: new_kg_ids})
-                new_edge_bindings = defaultdict(list)
-                for qg_id, edge_bindings in result.edge_bindings.items():
-                    new_kg_ids = [_map[binding.id] for binding in edge_bindings]
-                    new_edge_bindings[qg_id].extend(new_kg_ids)
-                self.results.add_result(
-                        new_node_bindings_with_conflate,
-                        new_edge_bindings,
-                        )
+        """ Merges a knowledge graph and its results into the message.
+
+        See KnowledgeGraph.merge for how nodes and edges are deduplicated.
+        Edge bindings of the results are remapped to the merged edge ids;
+        node ids do not change.
+        """
+        edge_id_map = self.knowledge_graph.merge(kg)
+        if res is None:
+            return
+        for result in res.results:
+            new_result = Result(self.trapi_version, self.biolink_version, self.results.validation_mode, score=result.score)
+            for qg_id, node_bindings in result.node_bindings.items():
+                new_result.node_bindings[qg_id] = list(node_bindings)
+            for qg_id, edge_bindings in result.edge_bindings.items():
+                new_edge_bindings = []
+                for binding in edge_bindings:
+                    new_kg_id = edge_id_map.get(binding.id)
+                    if new_kg_id is None:
+                        raise ValueError('Result binds edge {} that is not in the knowledge graph being merged.'.format(binding.id))
+                    if new_kg_id != binding.id:
+                        binding = Binding(self.trapi_version, self.biolink_version, new_kg_id, binding.conflate_term)
+                    new_edge_bindings.append(binding)
+                new_result.edge_bindings[qg_id] = new_edge_bindings
+            self.results.append_result(new_result)
@@ -1,48 +1,88 @@
 import copy
 import json
+import os
 from collections import defaultdict
 from jsonschema import ValidationError
 
-from trapi_model.base import TrapiBaseClass
+import trapi_model
+from trapi_model import json_backend
+from trapi_model.base import TrapiBaseClass, get_child_validation_mode
 from trapi_model.biolink.constants import get_biolink_entity
 from trapi_model.exceptions import *
+from trapi_model.indexes import MetaEdgeIndex, MetaEdgeTripleIndex, TrackedList
 
 #from reasoner_validator import validate
-from reasoner_validator import TRAPISchemaValidator
-
-def merge_meta_knowledge_graphs(list_of_meta_kgs):
-    if len(list_of_meta_kgs) == 1:
-        return list_of_meta_kgs[0]
-    merged = list_of_meta_kgs[0]
-    for meta_kg in list_of_meta_kgs[1:]:
-        # Merge nodes
-        for biolink_entity, meta_node in meta_kg.nodes.items():
-            try:
-                new_id_prefixes_set = set.union(*[set(meta_node.id_prefixes), set(merged.to_dict()[biolink_entity].id_prefixes)])
-                merged[biolink_entity].id_prefixes = list(new_id_prefixes_set)
-            except KeyError:
-                merged.add_node(
-                        biolink_entity,
-                        meta_node.id_prefixes,
-                        )
-        # Merge Edges
-        for meta_edge in meta_kg.edges:
-            if meta_edge not in merged.edges:
-                merged.add_edge(
-                        meta_edge.subject,
-                        meta_edge.object,
-                        meta_edge.predicate,
-                        )
+from trapi_model.validators import validate_component
+
+def merge_meta_knowledge_graphs(
+        list_of_meta_kgs,
+        trapi_version=None,
+        biolink_version=None,
+        validation_mode=None,
+        executor=None,
+        chunk_size=None,
+        return_stats=False,
+        ):
+    """ Merges meta knowledge graphs, given as MetaKnowledgeGraphs or TRAPI
+    dicts, into a new MetaKnowledgeGraph in time linear in their total size.
+    The inputs are not changed.
+
+    Versions and validation mode default to those of the first
+    MetaKnowledgeGraph input. With a concurrent.futures executor the inputs
+    are merged in chunks of chunk_size on it, which pays off for dict inputs
+    on a process pool; MetaKnowledgeGraphs would be pickled there. With
+    return_stats a (merged, MetaKnowledgeGraphMergeStats) pair is returned.
+    """
+    first_meta_kg = next((meta_kg for meta_kg in list_of_meta_kgs if isinstance(meta_kg, MetaKnowledgeGraph)), None)
+    if first_meta_kg is not None:
+        if trapi_version is None:
+            trapi_version = first_meta_kg.trapi_version
+        if biolink_version is None:
+            biolink_version = first_meta_kg.biolink_version
+        if validation_mode is None:
+            validation_mode = first_meta_kg.validation_mode
+    if trapi_version is None:
+        raise ValueError('A trapi_version is needed to merge meta knowledge graph dicts.')
+    if executor is None:
+        merger = MetaKnowledgeGraphMerger()
+        for meta_kg in list_of_meta_kgs:
+            merger.add(meta_kg)
+    else:
+        if chunk_size is None:
+            chunk_size = max(1, len(list_of_meta_kgs) // (4 * (os.cpu_count() or 1)))
+        futures = [
+                executor.submit(_merge_chunk, trapi_model.BIOLINK_VERSION, list_of_meta_kgs[i:i + chunk_size])
+                for i in range(0, len(list_of_meta_kgs), chunk_size)
+                ]
+        # Chunks are combined in input order so id prefixes keep their order.
+        merger = MetaKnowledgeGraphMerger()
+        for future in futures:
+            merger.update(future.result())
+    merged = merger.to_meta_knowledge_graph(trapi_version, biolink_version, validation_mode)
+    if return_stats:
+        return merged, merger.get_stats()
     return merged
 
+def _merge_chunk(biolink_model_version, list_of_meta_kgs):
+    """ Executor entry point of merge_meta_knowledge_graphs.
+    """
+    trapi_model.init_worker(biolink_model_version)
+    merger = MetaKnowledgeGraphMerger()
+    for meta_kg in list_of_meta_kgs:
+        merger.add(meta_kg)
+    return merger
+
+def get_curie(biolink_entity):
+    if biolink_entity is None or type(biolink_entity) is str:
+        return biolink_entity
+    return biolink_entity.get_curie()
+
 
 class MetaNode(TrapiBaseClass):
-    def __init__(self, id_prefixes, trapi_version, biolink_version):
+    def __init__(self, id_prefixes, trapi_version, biolink_version, validation_mode=None):
         self.id_prefixes = id_prefixes
-        super().__init__(trapi_version, biolink_version)
-        valid, message = self.validate()
-        if not valid:
-            raise InvalidTrapiComponent(trapi_version, 'MetaNode', message)
+        super().__init__(trapi_version, biolink_version, validation_mode)
+        self.check_component('MetaNode')
 
     def add_prefix(self, prefix):
         self.id_prefixes.append(prefix)
@@ -53,26 +93,27 @@ class MetaNode(TrapiBaseClass):
                 }
     
     @staticmethod
-    def load(meta_node_info, trapi_version, biolink_version):
+    def load(meta_node_info, trapi_version, biolink_version, validation_mode=None):
         id_prefixes = meta_node_info.pop("id_prefixes")
-        return MetaNode(
+        meta_node = MetaNode(
                 id_prefixes,
                 trapi_version,
                 biolink_version,
+                validation_mode=trapi_model.VALIDATION_OFF,
                 )
+        meta_node.set_validation_mode(validation_mode)
+        meta_node.check_loaded_component('MetaNode')
+        return meta_node
     
     def validate(self):
         _dict = self.to_dict()
-        tsv = TRAPISchemaValidator(self.trapi_version)
-        try:
-            #validate(_dict, 'MetaNode', self.trapi_version)
-            tsv.validate(_dict, 'MetaNode')
-            return True, None 
-        except ValidationError as ex:
-            return False, ex.message
+        return validate_component(_dict, self.trapi_version, 'MetaNode')
 
 class MetaEdge(TrapiBaseClass):
-    def __init__(self, q_subject, q_object, predicate, trapi_version, biolink_version):
+    """ A (subject, predicate, object) meta edge. Its identity fields are
+    fixed once built, as meta edges are hashed and indexed by them.
+    """
+    def __init__(self, q_subject, q_object, predicate, trapi_version, biolink_version, validation_mode=None):
         self.subject = q_subject
         self.object = q_object
         self.predicate = predicate
@@ -82,10 +123,14 @@ class MetaEdge(TrapiBaseClass):
             self.object = get_biolink_entity(q_object)
         if type(predicate) is str:
             self.predicate = get_biolink_entity(predicate)
-        super().__init__(trapi_version, biolink_version)
-        valid, message = self.validate()
-        if not valid:
-            raise InvalidTrapiComponent(trapi_version, 'MetaEdge', message)
+        super().__init__(trapi_version, biolink_version, validation_mode)
+        self.check_component('MetaEdge')
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if name in ('subject', 'object', 'predicate') and getattr(self, '_frozen', False):
+            raise AttributeError('MetaEdge identity is immutable, can not set {}.'.format(name))
+        super().__setattr__(name, value)
 
     def to_dict(self):
         return {
@@ -95,17 +140,21 @@ class MetaEdge(TrapiBaseClass):
                 }
 
     @staticmethod
-    def load(meta_edge_info, trapi_version, biolink_version):
+    def load(meta_edge_info, trapi_version, biolink_version, validation_mode=None):
         q_subject = meta_edge_info.pop("subject")
         q_object = meta_edge_info.pop("object")
         predicate = meta_edge_info.pop("predicate")
-        return MetaEdge(
+        meta_edge = MetaEdge(
                 q_subject,
                 q_object,
                 predicate,
                 trapi_version,
                 biolink_version,
+                validation_mode=trapi_model.VALIDATION_OFF,
                 )
+        meta_edge.set_validation_mode(validation_mode)
+        meta_edge.check_loaded_component('MetaEdge')
+        return meta_edge
 
     def get_inverse(self):
         if self.predicate.get_inverse() is not None:
@@ -115,44 +164,65 @@ class MetaEdge(TrapiBaseClass):
                     self.predicate.get_inverse(),
                     self.trapi_version,
                     self.biolink_version,
+                    validation_mode=self.validation_mode,
                     )
         return None
     
     def validate(self):
         _dict = self.to_dict()
-        tsv = TRAPISchemaValidator(self.trapi_version)
-        try:
-            #validate(_dict, 'MetaEdge', self.trapi_version)
-            tsv.validate(_dict, 'MetaEdge')
-            return True, None 
-        except ValidationError as ex:
-            return False, ex.message
+        return validate_component(_dict, self.trapi_version, 'MetaEdge')
+
+    def get_key(self):
+        """ Identity of the meta edge: (subject, predicate, object) curies.
+        """
+        return (self.subject.get_curie(), self.predicate.get_curie(), self.object.get_curie())
 
     def __eq__(self, other):
-        if self.subject != other.subject:
-            return False
-        if self.object != other.object:
-            return False
-        if self.predicate != other.predicate:
-            return False
-        return True
+        if not isinstance(other, MetaEdge):
+            return NotImplemented
+        return self.get_key() == other.get_key()
+
+    def __hash__(self):
+        return hash(self.get_key())
 
 class MetaKnowledgeGraph(TrapiBaseClass):
-    def __init__(self, trapi_version, biolink_version):
+    def __init__(self, trapi_version, biolink_version, validation_mode=None):
         self.nodes = {}
-        self.edges = []
-        super().__init__(trapi_version, biolink_version)
+        self.edges = TrackedList()
+        # Indexes built on first lookup and maintained by add_edge and merge.
+        # Any other change to edges bumps their version and the indexes are
+        # rebuilt on the next lookup.
+        self._edge_index = None
+        self._triple_index = None
+        super().__init__(trapi_version, biolink_version, validation_mode)
+
+    @property
+    def edges(self):
+        return self._edges
+
+    @edges.setter
+    def edges(self, edges):
+        if type(edges) is not TrackedList:
+            edges = TrackedList(edges)
+        self._edges = edges
+
+    def set_validation_mode(self, validation_mode):
+        super().set_validation_mode(validation_mode)
+        for meta_node in self.nodes.values():
+            meta_node.set_validation_mode(self.validation_mode)
+        for meta_edge in self.edges:
+            meta_edge.set_validation_mode(self.validation_mode)
 
     def expand_with_inverses(self):
         # Try to expand all edges with there biolink inverses
         new_meta_kg = copy.deepcopy(self)
+        edge_keys = new_meta_kg._get_edge_index().keys
         for metaedge in self.edges:
             inverse_metaedge = metaedge.get_inverse()
-            if inverse_metaedge is not None and inverse_metaedge not in new_meta_kg.edges:
+            if inverse_metaedge is not None and inverse_metaedge.get_key() not in edge_keys:
                 new_meta_kg.edges.append(inverse_metaedge)
-        valid, message = new_meta_kg.validate()
-        if not valid:
-            raise InvalidTrapiComponent(self.trapi_version, 'MetaKnowledgeGraph', message)
+                new_meta_kg._index_edge(inverse_metaedge)
+        new_meta_kg.check_loaded_component('MetaKnowledgeGraph')
         return new_meta_kg
 
     def to_dict(self):
@@ -170,7 +240,12 @@ class MetaKnowledgeGraph(TrapiBaseClass):
             raise ValueError('Id prefixes must be a string or list.')
         if type(biolink_entity) is str:
             biolink_entity = get_biolink_entity(biolink_entity)
-        self.nodes[biolink_entity] = MetaNode(id_prefixes, self.trapi_version, self.biolink_version)
+        self.nodes[biolink_entity] = MetaNode(
+                id_prefixes,
+                self.trapi_version,
+                self.biolink_version,
+                validation_mode=self.validation_mode,
+                )
         return biolink_entity
 
     def add_edge(
@@ -185,41 +260,283 @@ class MetaKnowledgeGraph(TrapiBaseClass):
             q_object = get_biolink_entity(q_object)
         if type(predicate) is str:
             predicate = get_biolink_entity(predicate)
-        self.edges.append(MetaEdge(
-                    q_subject,
-                    q_object,
-                    predicate,
-                    self.trapi_version,
-                    self.biolink_version,
-                    )
+        meta_edge = MetaEdge(
+                q_subject,
+                q_object,
+                predicate,
+                self.trapi_version,
+                self.biolink_version,
+                validation_mode=self.validation_mode,
                 )
+        self.edges.append(meta_edge)
+        self._index_edge(meta_edge)
+
+    def _index_edge(self, meta_edge):
+        """ Adds a meta edge just appended through add_edge or merge to the
+        indexes that were current before it was appended.
+        """
+        for edge_index in [self._edge_index, self._triple_index]:
+            if edge_index is not None and edge_index.version == self.edges.version - 1:
+                edge_index.add(meta_edge)
+                edge_index.version = self.edges.version
+
+    def _get_edge_index(self):
+        """ Returns the MetaEdgeIndex, rebuilt if edges were changed other
+        than through add_edge and merge.
+        """
+        if self._edge_index is None or self._edge_index.version != self.edges.version:
+            self._edge_index = MetaEdgeIndex(self.edges)
+            self._edge_index.version = self.edges.version
+        return self._edge_index
+
+    def _get_triple_index(self):
+        if self._triple_index is None or self._triple_index.version != self.edges.version:
+            self._triple_index = MetaEdgeTripleIndex(self.edges)
+            self._triple_index.version = self.edges.version
+        return self._triple_index
+
+    def drop_indexes(self):
+        """ Frees the edge indexes, which are rebuilt on the next lookup.
+        """
+        self._edge_index = None
+        self._triple_index = None
+
+    def has_edge(self, q_subject, predicate, q_object):
+        """ Returns whether there is a meta edge with this subject,
+        predicate and object, given as BiolinkEntities or curies.
+        """
+        return (get_curie(q_subject), get_curie(predicate), get_curie(q_object)) in self._get_edge_index().keys
+
+    def get_edges(self, q_subject=None, predicate=None, q_object=None):
+        """ Returns the meta edges with the given subject, predicate and
+        object, any of which may be None to match every value.
+        """
+        key = (get_curie(q_subject), get_curie(predicate), get_curie(q_object))
+        edge_index = self._get_edge_index()
+        if None not in key:
+            meta_edge = edge_index.keys.get(key)
+            return [] if meta_edge is None else [meta_edge]
+        candidates = [
+                edges.get(curie, [])
+                for edges, curie in zip([edge_index.subjects, edge_index.predicates, edge_index.objects], key)
+                if curie is not None
+                ]
+        if not candidates:
+            return list(self.edges)
+        return [
+                meta_edge for meta_edge in min(candidates, key=len)
+                if all(curie is None or curie == meta_edge_curie for curie, meta_edge_curie in zip(key, meta_edge.get_key()))
+                ]
+
+    def find_edges(self, subject_categories=None, predicates=None, object_categories=None):
+        """ Returns the meta edges that answer a query edge between these
+        categories with these predicates, given as BiolinkEntities or curies.
+
+        A meta edge answers it if its subject, predicate and object are one
+        of the given ones or their descendants, directly or with subject and
+        object swapped through the inverse predicate. None or an empty list
+        matches anything.
+        """
+        curies = []
+        for biolink_entities in [subject_categories, predicates, object_categories]:
+            if not biolink_entities:
+                curies.append(None)
+                continue
+            if type(biolink_entities) is not list:
+                biolink_entities = [biolink_entities]
+            curies.append([get_curie(biolink_entity) for biolink_entity in biolink_entities])
+        return self._get_triple_index().find(*curies)
+
+    def match_query_graph(self, query_graph):
+        """ Returns the meta edges that answer each edge of a QueryGraph,
+        keyed by query edge id. See find_edges.
+        """
+        matches = {}
+        for qedge_id, qedge in query_graph.edges.items():
+            matches[qedge_id] = self.find_edges(
+                    query_graph.nodes[qedge.subject].categories,
+                    qedge.predicates,
+                    query_graph.nodes[qedge.object].categories,
+                    )
+        return matches
+
+    def supports(self, query_graph):
+        """ Returns whether every edge of a QueryGraph is answered by at
+        least one meta edge.
+        """
+        return all(self.match_query_graph(query_graph).values())
+
+    def merge(self, meta_knowledge_graph):
+        """ Merges the nodes and edges of another meta knowledge graph into
+        this one. Id prefixes are unioned and edges already in this graph
+        are skipped.
+        """
+        for biolink_entity, meta_node in meta_knowledge_graph.nodes.items():
+            master_node = self.nodes.get(biolink_entity)
+            if master_node is None:
+                self.add_node(biolink_entity, list(meta_node.id_prefixes))
+                continue
+            id_prefixes = set(master_node.id_prefixes)
+            for prefix in meta_node.id_prefixes:
+                if prefix not in id_prefixes:
+                    id_prefixes.add(prefix)
+                    master_node.id_prefixes.append(prefix)
+        edge_keys = self._get_edge_index().keys
+        for meta_edge in meta_knowledge_graph.edges:
+            if meta_edge.get_key() not in edge_keys:
+                self.add_edge(meta_edge.subject, meta_edge.object, meta_edge.predicate)
     
     def validate(self):
         _dict = self.to_dict()
-        tsv = TRAPISchemaValidator(self.trapi_version)
-        try:
-            #validate(_dict, 'MetaKnowledgeGraph', self.trapi_version)
-            tsv.validate(_dict, 'MetaKnowledgeGraph')
-            return True, None 
-        except ValidationError as ex:
-            return False, ex.message
+        return validate_component(_dict, self.trapi_version, 'MetaKnowledgeGraph')
 
     @staticmethod
-    def load(trapi_version, biolink_version, meta_knowledge_graph=None, filename=None):
+    def load(trapi_version, biolink_version, meta_knowledge_graph=None, filename=None, validation_mode=None, cache_filename=None):
+        """ Loads a meta knowledge graph from a TRAPI dict or a JSON file.
+
+        With a filename and cache_filename, the graph is loaded from the
+        memory-mapped cache if it was written from the same file contents,
+        and otherwise loaded from the file and cached there.
+        """
+        source_hash = None
         if filename is not None:
-            with open(filename, 'r') as metakg_file:
-                meta_knowledge_graph = json.load(metakg_file)
-        new_meta_knowledge_graph = MetaKnowledgeGraph(trapi_version, biolink_version)
+            with open(filename, 'rb') as metakg_file:
+                data = metakg_file.read()
+            if cache_filename is not None:
+                # Imported here as the cache module builds on this one.
+                from trapi_model.meta_knowledge_graph_cache import get_source_hash, load_cache
+                source_hash = get_source_hash(data)
+                cache = load_cache(cache_filename, source_hash)
+                if cache is not None:
+                    return cache.to_meta_knowledge_graph(trapi_version, biolink_version, validation_mode)
+            meta_knowledge_graph = json_backend.loads(data)
+        new_meta_knowledge_graph = MetaKnowledgeGraph(trapi_version, biolink_version, validation_mode)
+        child_validation_mode = get_child_validation_mode(new_meta_knowledge_graph.validation_mode)
         # Load Nodes
         for biolink_curie, node_info in meta_knowledge_graph["nodes"].items():
             biolink_entity = get_biolink_entity(biolink_curie)
-            new_meta_knowledge_graph.nodes[biolink_entity] = MetaNode.load(node_info, trapi_version, biolink_version)
+            new_meta_knowledge_graph.nodes[biolink_entity] = MetaNode.load(
+                    node_info,
+                    trapi_version,
+                    biolink_version,
+                    validation_mode=child_validation_mode,
+                    )
         # Load Edges
         for edge_info in meta_knowledge_graph["edges"]:
-            new_meta_knowledge_graph.edges.append(MetaEdge.load(edge_info, trapi_version, biolink_version))
-        
-        valid, message = new_meta_knowledge_graph.validate()
-        if valid:
-            return new_meta_knowledge_graph
+            new_meta_knowledge_graph.edges.append(
+                    MetaEdge.load(
+                        edge_info,
+                        trapi_version,
+                        biolink_version,
+                        validation_mode=child_validation_mode,
+                        )
+                    )
+        new_meta_knowledge_graph.set_validation_mode(new_meta_knowledge_graph.validation_mode)
+        new_meta_knowledge_graph.check_loaded_component('MetaKnowledgeGraph')
+        if source_hash is not None:
+            from trapi_model.meta_knowledge_graph_cache import write_cache
+            write_cache(new_meta_knowledge_graph, cache_filename, source_hash)
+        return new_meta_knowledge_graph
+
+
+class MetaKnowledgeGraphMergeStats:
+    """ Counts of a merge of meta knowledge graphs.
+    """
+    def __init__(self):
+        self.num_inputs = 0
+        self.num_input_nodes = 0
+        self.num_input_edges = 0
+        self.num_input_id_prefixes = 0
+        self.num_nodes = 0
+        self.num_edges = 0
+        self.num_id_prefixes = 0
+
+    @property
+    def num_duplicate_edges(self):
+        return self.num_input_edges - self.num_edges
+
+    @property
+    def num_duplicate_id_prefixes(self):
+        return self.num_input_id_prefixes - self.num_id_prefixes
+
+    def to_dict(self):
+        return {
+                "num_inputs": self.num_inputs,
+                "num_input_nodes": self.num_input_nodes,
+                "num_input_edges": self.num_input_edges,
+                "num_input_id_prefixes": self.num_input_id_prefixes,
+                "num_nodes": self.num_nodes,
+                "num_edges": self.num_edges,
+                "num_id_prefixes": self.num_id_prefixes,
+                "num_duplicate_edges": self.num_duplicate_edges,
+                "num_duplicate_id_prefixes": self.num_duplicate_id_prefixes,
+                }
+
+
+class MetaKnowledgeGraphMerger:
+    """ Accumulates meta knowledge graphs as curies, with the id prefixes of
+    each category and the edge keys held in insertion ordered dicts, so each
+    input is merged in time linear in its own size. Mergers hold no
+    BiolinkEntities and are cheap to pickle between processes.
+    """
+    def __init__(self):
+        self.nodes = {}
+        self.edges = {}
+        self.stats = MetaKnowledgeGraphMergeStats()
+
+    def add(self, meta_knowledge_graph):
+        """ Merges a MetaKnowledgeGraph or a TRAPI meta knowledge graph dict.
+        """
+        self.stats.num_inputs += 1
+        if isinstance(meta_knowledge_graph, MetaKnowledgeGraph):
+            nodes = [
+                    (biolink_entity.get_curie(), meta_node.id_prefixes)
+                    for biolink_entity, meta_node in meta_knowledge_graph.nodes.items()
+                    ]
+            edge_keys = [meta_edge.get_key() for meta_edge in meta_knowledge_graph.edges]
         else:
-            raise InvalidTrapiComponent(trapi_version, 'MetaKnowledgeGraph', message)
+            # Curies are normalized so that spellings of an entity merge.
+            nodes = [
+                    (get_biolink_entity(curie).get_curie(), node_info["id_prefixes"])
+                    for curie, node_info in meta_knowledge_graph["nodes"].items()
+                    ]
+            edge_keys = [
+                    (
+                        get_biolink_entity(edge_info["subject"]).get_curie(),
+                        get_biolink_entity(edge_info["predicate"]).get_curie(),
+                        get_biolink_entity(edge_info["object"]).get_curie(),
+                        )
+                    for edge_info in meta_knowledge_graph["edges"]
+                    ]
+        for curie, id_prefixes in nodes:
+            self.stats.num_input_nodes += 1
+            self.stats.num_input_id_prefixes += len(id_prefixes)
+            self.nodes.setdefault(curie, {}).update(dict.fromkeys(id_prefixes))
+        self.stats.num_input_edges += len(edge_keys)
+        self.edges.update(dict.fromkeys(edge_keys))
+
+    def update(self, merger):
+        """ Merges the inputs accumulated by another merger.
+        """
+        for curie, id_prefixes in merger.nodes.items():
+            self.nodes.setdefault(curie, {}).update(id_prefixes)
+        self.edges.update(merger.edges)
+        for name in ['num_inputs', 'num_input_nodes', 'num_input_edges', 'num_input_id_prefixes']:
+            setattr(self.stats, name, getattr(self.stats, name) + getattr(merger.stats, name))
+
+    def get_stats(self):
+        self.stats.num_nodes = len(self.nodes)
+        self.stats.num_edges = len(self.edges)
+        self.stats.num_id_prefixes = sum(len(id_prefixes) for id_prefixes in self.nodes.values())
+        return self.stats
+
+    def to_meta_knowledge_graph(self, trapi_version, biolink_version, validation_mode=None):
+        # Built unvalidated and checked once as a whole, like a loaded graph.
+        meta_kg = MetaKnowledgeGraph(trapi_version, biolink_version, trapi_model.VALIDATION_OFF)
+        for curie, id_prefixes in self.nodes.items():
+            meta_kg.add_node(curie, list(id_prefixes))
+        for q_subject, predicate, q_object in self.edges:
+            meta_kg.add_edge(q_subject, q_object, predicate)
+        meta_kg.set_validation_mode(trapi_model.get_validation_mode(validation_mode))
+        meta_kg.check_loaded_component('MetaKnowledgeGraph')
+        return meta_kg
@@ -0,0 +1,305 @@
+"""
+Meta Knowledge Graph Caches
+
+A cache stores a MetaKnowledgeGraph as integer coded tables: the distinct
+category and predicate curies and the distinct id prefixes as string tables,
+each node as a curie id with a CSR list of prefix ids, and each edge as a
+(subject, predicate, object) triple of curie ids. Caches are memory-mapped,
+so loading one does not parse or validate JSON and forked workers share the
+pages. The sha256 of the source JSON is stored so a stale cache is detected.
+
+File layout (little endian):
+    header: magic, format version, numbers of curies, prefixes, nodes and
+        edges, the source sha256 digest, then an (offset, length) pair for
+        each section in SECTIONS.
+    sections: uint32 curie offsets and utf-8 curie blob, uint32 prefix
+        offsets and utf-8 prefix blob, uint32 node curie ids, uint32 CSR
+        offsets and prefix ids of the nodes, uint32 edge triples and the
+        uint32 edge positions sorted by triple for lookups.
+
+Caches are written to a temporary file and moved into place, so workers
+that mapped the previous version keep a consistent view of it.
+"""
+import os
+import sys
+import mmap
+import struct
+import hashlib
+from array import array
+
+import trapi_model
+from trapi_model.biolink.constants import get_biolink_entity
+from trapi_model.meta_knowledge_graph import MetaKnowledgeGraph, get_curie
+
+CACHE_MAGIC = b'TMMKGCAC'
+CACHE_FORMAT_VERSION = 1
+SECTIONS = [
+        'curie_offsets',
+        'curies',
+        'prefix_offsets',
+        'prefixes',
+        'node_curies',
+        'node_prefix_offsets',
+        'node_prefixes',
+        'edges',
+        'edge_order',
+        ]
+SECTION_TYPECODES = {
+        'curie_offsets': 'I',
+        'prefix_offsets': 'I',
+        'node_curies': 'I',
+        'node_prefix_offsets': 'I',
+        'node_prefixes': 'I',
+        'edges': 'I',
+        'edge_order': 'I',
+        }
+HEADER = struct.Struct('<8sIIIII32s' + 'II' * len(SECTIONS))
+
+
+def get_source_hash(data):
+    """ Returns the sha256 hex digest of source JSON bytes or str.
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+def get_normalized_curie(biolink_entity):
+    """ Returns the curie of a BiolinkEntity, or of a curie or name in any
+    spelling the toolkit accepts.
+    """
+    if type(biolink_entity) is str:
+        biolink_entity = get_biolink_entity(biolink_entity)
+    return biolink_entity.get_curie()
+
+def get_edge_key(meta_edge):
+    """ Returns the curie triple of a MetaEdge or a (subject, predicate,
+    object) triple of BiolinkEntities, curies or names.
+    """
+    if isinstance(meta_edge, tuple):
+        return tuple(get_normalized_curie(biolink_entity) for biolink_entity in meta_edge)
+    return meta_edge.get_key()
+
+
+class MetaKnowledgeGraphCache:
+    """ Memory-mapped, read only MetaKnowledgeGraph cache.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, 'rb') as cache_file:
+            self._mmap = mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ)
+        header = HEADER.unpack_from(self._mmap, 0)
+        magic, format_version, num_curies, num_prefixes, self.num_nodes, self.num_edges, source_hash = header[:7]
+        if magic != CACHE_MAGIC:
+            raise ValueError('{} is not a meta knowledge graph cache.'.format(filename))
+        if format_version != CACHE_FORMAT_VERSION:
+            raise ValueError('Unsupported meta knowledge graph cache format {} in {}.'.format(format_version, filename))
+        # A cache updated without a new source hash stores zeros.
+        self.source_hash = source_hash.hex() if any(source_hash) else None
+        view = memoryview(self._mmap)
+        self._sections = {}
+        for i, section in enumerate(SECTIONS):
+            offset, length = header[7 + 2*i: 9 + 2*i]
+            data = view[offset:offset + length]
+            typecode = SECTION_TYPECODES.get(section)
+            if typecode is not None:
+                if sys.byteorder == 'little':
+                    data = data.cast(typecode)
+                else:
+                    data = array(typecode, data.tobytes())
+                    data.byteswap()
+            self._sections[section] = data
+        self._curies = self._decode_strings('curie_offsets', 'curies', num_curies)
+        self._prefixes = self._decode_strings('prefix_offsets', 'prefixes', num_prefixes)
+        self._curie_ids = {curie: curie_id for curie_id, curie in enumerate(self._curies)}
+
+    def _decode_strings(self, offsets_section, blob_section, num_strings):
+        offsets = self._sections[offsets_section]
+        blob = self._sections[blob_section]
+        return [bytes(blob[offsets[i]:offsets[i+1]]).decode('utf-8') for i in range(num_strings)]
+
+    def _get_triple(self, position):
+        edges = self._sections['edges']
+        return (edges[3*position], edges[3*position + 1], edges[3*position + 2])
+
+    def get_nodes(self):
+        """ Returns the id prefixes of every node category, keyed by curie.
+        """
+        node_curies = self._sections['node_curies']
+        offsets = self._sections['node_prefix_offsets']
+        prefix_ids = self._sections['node_prefixes']
+        return {
+                self._curies[node_curies[i]]: [self._prefixes[j] for j in prefix_ids[offsets[i]:offsets[i+1]]]
+                for i in range(self.num_nodes)
+                }
+
+    def get_edges(self):
+        """ Returns the (subject, predicate, object) curie triples of the
+        edges, in the order of the source.
+        """
+        curies = self._curies
+        edges = self._sections['edges']
+        return [
+                (curies[edges[i]], curies[edges[i+1]], curies[edges[i+2]])
+                for i in range(0, 3 * self.num_edges, 3)
+                ]
+
+    def has_edge(self, q_subject, predicate, q_object):
+        """ Returns whether the cache has an edge with this subject,
+        predicate and object, by binary search over the mapped triples.
+        """
+        triple = []
+        for biolink_entity in [q_subject, predicate, q_object]:
+            curie_id = self._curie_ids.get(get_curie(biolink_entity))
+            if curie_id is None:
+                return False
+            triple.append(curie_id)
+        triple = tuple(triple)
+        edge_order = self._sections['edge_order']
+        low, high = 0, self.num_edges
+        while low < high:
+            middle = (low + high) // 2
+            if self._get_triple(edge_order[middle]) < triple:
+                low = middle + 1
+            else:
+                high = middle
+        return low < self.num_edges and self._get_triple(edge_order[low]) == triple
+
+    def to_meta_knowledge_graph(self, trapi_version, biolink_version, validation_mode=None):
+        """ Builds the MetaKnowledgeGraph. The cache holds a graph that was
+        validated when it was written, so it is not validated again.
+        """
+        meta_kg = MetaKnowledgeGraph(trapi_version, biolink_version, trapi_model.VALIDATION_OFF)
+        for curie, id_prefixes in self.get_nodes().items():
+            meta_kg.add_node(curie, id_prefixes)
+        for q_subject, predicate, q_object in self.get_edges():
+            meta_kg.add_edge(q_subject, q_object, predicate)
+        meta_kg.set_validation_mode(trapi_model.get_validation_mode(validation_mode))
+        return meta_kg
+
+
+def load_cache(filename, source_hash=None):
+    """ Returns the MetaKnowledgeGraphCache in filename, or None if there is
+    none, it can not be read or it was written from other source JSON.
+    """
+    if not os.path.exists(filename):
+        return None
+    try:
+        cache = MetaKnowledgeGraphCache(filename)
+    except (ValueError, struct.error):
+        return None
+    if source_hash is not None and cache.source_hash != source_hash:
+        return None
+    return cache
+
+def write_cache(meta_knowledge_graph, filename, source_hash=None):
+    """ Writes a cache of a MetaKnowledgeGraph. source_hash is the
+    get_source_hash of the JSON it was loaded from.
+    """
+    nodes = [
+            (biolink_entity.get_curie(), meta_node.id_prefixes)
+            for biolink_entity, meta_node in meta_knowledge_graph.nodes.items()
+            ]
+    edge_keys = [meta_edge.get_key() for meta_edge in meta_knowledge_graph.edges]
+    return _write_cache(filename, nodes, edge_keys, source_hash)
+
+def update_cache(filename, added_edges=None, removed_edges=None, nodes=None, source_hash=None):
+    """ Applies edge changes, such as those of one provider's meta knowledge
+    graph, to a cache without building the graph.
+
+    added_edges and removed_edges are MetaEdges or (subject, predicate,
+    object) triples. Added edges already in the cache are skipped and are
+    appended in order otherwise. nodes maps category curies to id prefixes
+    that are added to the node, which is created if needed. The updated
+    cache no longer matches the JSON it was written from, so its source
+    hash is cleared unless the hash of the updated JSON is given.
+    """
+    cache = MetaKnowledgeGraphCache(filename)
+    cached_nodes = cache.get_nodes()
+    if nodes is not None:
+        for curie, id_prefixes in nodes.items():
+            cached_id_prefixes = cached_nodes.setdefault(get_normalized_curie(curie), [])
+            known_prefixes = set(cached_id_prefixes)
+            for prefix in id_prefixes:
+                if prefix not in known_prefixes:
+                    known_prefixes.add(prefix)
+                    cached_id_prefixes.append(prefix)
+    removed_keys = set()
+    if removed_edges is not None:
+        removed_keys = {get_edge_key(meta_edge) for meta_edge in removed_edges}
+    edge_keys = dict.fromkeys(key for key in cache.get_edges() if key not in removed_keys)
+    if added_edges is not None:
+        edge_keys.update(dict.fromkeys(get_edge_key(meta_edge) for meta_edge in added_edges))
+    return _write_cache(filename, list(cached_nodes.items()), list(edge_keys), source_hash)
+
+def _write_cache(filename, nodes, edge_keys, source_hash):
+    curie_ids = {}
+    prefix_ids = {}
+
+    def get_id(ids, string):
+        if string not in ids:
+            ids[string] = len(ids)
+        return ids[string]
+
+    node_curies = array('I')
+    node_prefix_offsets = array('I', [0])
+    node_prefixes = array('I')
+    for curie, id_prefixes in nodes:
+        node_curies.append(get_id(curie_ids, curie))
+        node_prefixes.extend(get_id(prefix_ids, prefix) for prefix in id_prefixes)
+        node_prefix_offsets.append(len(node_prefixes))
+    triples = [tuple(get_id(curie_ids, curie) for curie in key) for key in edge_keys]
+    edges = array('I')
+    for triple in triples:
+        edges.extend(triple)
+    edge_order = array('I', sorted(range(len(triples)), key=triples.__getitem__))
+
+    def encode_strings(strings):
+        offsets = array('I', [0])
+        blob = bytearray()
+        for string in strings:
+            blob.extend(string.encode('utf-8'))
+            offsets.append(len(blob))
+        return offsets, bytes(blob)
+
+    curie_offsets, curie_blob = encode_strings(curie_ids)
+    prefix_offsets, prefix_blob = encode_strings(prefix_ids)
+    sections = {
+            'curie_offsets': curie_offsets,
+            'curies': curie_blob,
+            'prefix_offsets': prefix_offsets,
+            'prefixes': prefix_blob,
+            'node_curies': node_curies,
+            'node_prefix_offsets': node_prefix_offsets,
+            'node_prefixes': node_prefixes,
+            'edges': edges,
+            'edge_order': edge_order,
+            }
+    body = bytearray()
+    locations = []
+    for section in SECTIONS:
+        data = sections[section]
+        if isinstance(data, array):
+            if sys.byteorder != 'little':
+                data = array(data.typecode, data)
+                data.byteswap()
+            data = data.tobytes()
+        # Keep every section 4 byte aligned for the typed memoryviews.
+        body.extend(b'\x00' * (-(HEADER.size + len(body)) % 4))
+        locations.extend([HEADER.size + len(body), len(data)])
+        body.extend(data)
+    header = HEADER.pack(
+            CACHE_MAGIC,
+            CACHE_FORMAT_VERSION,
+            len(curie_ids),
+            len(prefix_ids),
+            len(nodes),
+            len(edge_keys),
+            bytes.fromhex(source_hash) if source_hash else b'',
+            *locations,
+            )
+    tmp_filename = '{}.{}.tmp'.format(filename, os.getpid())
+    with open(tmp_filename, 'wb') as cache_file:
+        cache_file.write(header)
+        cache_file.write(body)
+    os.replace(tmp_filename, filename)
+    return filename
@@ -7,18 +7,29 @@ import itertools
 from collections import defaultdict
 
 #from reasoner_validator import validate
-from reasoner_validator import TRAPISchemaValidator
+from trapi_model.validators import validate_component
 
+from trapi_model import json_backend
 from trapi_model.base import TrapiBaseClass
+from trapi_model.exceptions import BatchQueryTooLarge
+from trapi_model.json_stream import JSONObjectStream
 from trapi_model.message import Message
 from trapi_model.logger import Logger
 from trapi_model.workflow import Workflow
 
+def iter_chunks(iterable, chunk_size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
 class Query(TrapiBaseClass):
-    def __init__(self, trapi_version='1.2', biolink_version=None, max_results=10, q_id=None):
-        self.trapi_version = trapi_version
-        self.biolink_version = biolink_version
-        self.message = Message(trapi_version, biolink_version)
+    def __init__(self, trapi_version='1.2', biolink_version=None, max_results=None, q_id=None, validation_mode=None):
+        super().__init__(trapi_version, biolink_version, validation_mode)
+        self.message = Message(trapi_version, biolink_version, self.validation_mode)
         self.max_results = max_results
         self.logger = Logger()
         self.id = q_id
@@ -27,7 +38,10 @@ class Query(TrapiBaseClass):
         self.workflow = Workflow()
         if q_id is None:
             self.id = str(uuid.uuid4())
-        super().__init__(trapi_version, biolink_version)
+
+    def set_validation_mode(self, validation_mode):
+        super().set_validation_mode(validation_mode)
+        self.message.set_validation_mode(self.validation_mode)
 
     def to_dict(self):
         return {
@@ -41,6 +55,19 @@ class Query(TrapiBaseClass):
                 "description": self.description,
                 "workflow": self.workflow.to_dict(),
                 }
+
+    def to_json_stream(self):
+        return JSONObjectStream([
+                ("message", self.message),
+                ("max_results", self.max_results),
+                ("trapi_version", self.trapi_version),
+                ("biolink_version", self.biolink_version),
+                ("logs", self.logger.to_dict()),
+                ("id", self.id),
+                ("status", self.status),
+                ("description", self.description),
+                ("workflow", self.workflow.to_dict()),
+                ])
     
     def find_and_replace(self, old_value, new_value):
         self.message = self.message.find_and_replace(old_value, new_value)
@@ -68,24 +95,30 @@ class Query(TrapiBaseClass):
 
     def validate(self):
         _dict = self.to_dict()
-        tsv = TRAPISchemaValidator(self.trapi_version)
-        try:
-            #validate(_dict, 'Query', self.trapi_version)
-            tsv.validate(_dict, 'Query')
-            return True, None 
-        except ValidationError as ex:
-            return False, ex.message
+        return validate_component(_dict, self.trapi_version, 'Query')
 
     @staticmethod
-    def load(trapi_version, biolink_version, query=None, query_filepath=None):
+    def load(trapi_version, biolink_version, query=None, query_filepath=None, validation_mode=None, columnar_results=False):
+        """ Loads a TRAPI query. The max_results of a filter_results_top_n
+        workflow operation is applied to the results as they are loaded.
+        """
         if query is None and query_filepath is None:
             return ValueError('Message and Message filepath can not both be None.')
         if query_filepath is not None:
             if query is not None:
                 return ValueError('You passed in both a filepath and query object.')
-            with open(query_filepath, 'r') as f_:
-                query = json.load(f_)
-        new_query = Query(trapi_version, biolink_version)
+            with open(query_filepath, 'rb') as f_:
+                query = json_backend.load(f_)
+        new_query = Query(trapi_version, biolink_version, validation_mode=validation_mode)
+        # Load workflow
+        query_workflow = query.pop('workflow', [])
+        new_query.workflow.query_workflow = query_workflow
+        new_query.workflow.check_workflow()
+
+        # Specify max results - now specified in workflow
+        #new_query.max_results = query.pop("max_results", 10)
+        new_query.max_results = new_query.workflow.max_results
+
         # Load messages
         message = query.pop("message", None)
         if message is not None:
@@ -93,23 +126,25 @@ class Query(TrapiBaseClass):
                     trapi_version,
                     biolink_version,
                     message=message,
+                    validation_mode=new_query.validation_mode,
+                    columnar_results=columnar_results,
+                    max_results=new_query.max_results,
                     )
         # Load logs
         logs = query.pop("logs", None)
         if logs is not None and len(logs) > 0:
             new_query.logger.add_logs(logs)
 
-        # Load workflow
-        query_workflow = query.pop('workflow', [])
-        new_query.workflow.query_workflow = query_workflow
-        new_query.workflow.check_workflow()
-
-        # Specify max results - now specified in workflow
-        #new_query.max_results = query.pop("max_results", 10)
-        new_query.max_results = new_query.workflow.max_results
-
         return new_query
 
+    def apply_max_results(self):
+        """ Keeps the max_results best scored results of the message, as set
+        by a filter_results_top_n workflow operation, e.g. after responses
+        were merged into it. Nothing is dropped when it is not set.
+        """
+        if self.max_results is not None:
+            self.message.results = self.message.results.top_n(self.max_results)
+
     def is_batch_query(self):
         query_graph = self.message.query_graph
         # Check for a batch node
@@ -127,43 +162,136 @@ class Query(TrapiBaseClass):
                     return True
         return False
 
+    def clone(self):
+        query = super().clone()
+        query.message = self.message.clone()
+        query.logger = self.logger.clone()
+        query.workflow = self.workflow.clone()
+        return query
+
     def get_copy(self):
-        return Query.load(self.trapi_version, self.biolink_version, query=self.to_dict())
+        """ Returns a clone of the query under a new id.
+        """
+        new_query = self.clone()
+        new_query.id = str(uuid.uuid4())
+        return new_query
 
-    def expand_batch_query(self):
+    def _get_batch_axes(self, axes=None, ids_chunk_size=None):
+        """ Returns a (query graph id, attribute, values) axis for every slot
+        the query is split along, in expansion order.
+
+        By default every multi-valued slot is split. axes limits splitting to
+        the given (query graph id, attribute) pairs and leaves the other
+        lists intact. With ids_chunk_size, ids are split into lists of that
+        size instead of single ids.
+        """
         query_graph = self.message.query_graph
-        options = []
-        options_map = []
-        # Get batch nodes
-        for node_id, node_info in query_graph.nodes.items():
-            if node_info.ids is not None:
-                if len(node_info.ids) > 1:
-                    options_map.append((node_id, 'ids'))
-                    options.append(node_info.ids)
-            if node_info.categories is not None:
-                if len(node_info.categories) > 1:
-                    options_map.append((node_id, 'categories')) 
-                    options.append(node_info.categories)
-        # Get batch edges
-        for edge_id, edge_info in query_graph.edges.items():
-            if edge_info.predicates is not None:
-                if len(edge_info.predicates) > 1:
-                    options_map.append((edge_id, 'predicates'))
-                    options.append(edge_info.predicates)
-        # Build single queries
-        extracted_queries = []
-        for query_config in itertools.product(*options):
-            # Deepcopy workaround
-            new_query = self.get_copy()
-            for idx, option_label in enumerate(options_map):
-                q_label, attribute = option_label
-                if attribute == 'predicates':
-                    new_query.message.query_graph.edges[q_label].set_predicates(query_config[idx])
-                elif attribute == 'ids':
-                    new_query.message.query_graph.nodes[q_label].set_ids(query_config[idx])
-                elif attribute == 'categories':
-                    new_query.message.query_graph.nodes[q_label].set_categories(query_config[idx])
+        batch_axes = []
+        if axes is None:
+            # Get batch nodes
+            for node_id, node_info in query_graph.nodes.items():
+                if node_info.ids is not None:
+                    if len(node_info.ids) > 1:
+                        batch_axes.append((node_id, 'ids', node_info.ids))
+                if node_info.categories is not None:
+                    if len(node_info.categories) > 1:
+                        batch_axes.append((node_id, 'categories', node_info.categories))
+            # Get batch edges
+            for edge_id, edge_info in query_graph.edges.items():
+                if edge_info.predicates is not None:
+                    if len(edge_info.predicates) > 1:
+                        batch_axes.append((edge_id, 'predicates', edge_info.predicates))
+        else:
+            for q_label, attribute in axes:
+                if attribute in ['ids', 'categories']:
+                    q_obj = query_graph.nodes.get(q_label)
+                elif attribute == 'predicates':
+                    q_obj = query_graph.edges.get(q_label)
                 else:
                     raise ValueError('Unknown attribute label: {}'.format(attribute))
-            extracted_queries.append(new_query)
-        return extracted_queries
+                if q_obj is None:
+                    raise ValueError('Unknown query graph id for {}: {}'.format(attribute, q_label))
+                values = getattr(q_obj, attribute)
+                if values:
+                    batch_axes.append((q_label, attribute, values))
+        if ids_chunk_size is not None:
+            if ids_chunk_size < 1:
+                raise ValueError('Ids chunk size must be at least 1.')
+            for i, (q_label, attribute, values) in enumerate(batch_axes):
+                if attribute == 'ids':
+                    chunks = [values[j:j + ids_chunk_size] for j in range(0, len(values), ids_chunk_size)]
+                    batch_axes[i] = (q_label, attribute, chunks)
+        return batch_axes
+
+    @staticmethod
+    def _count_batch_axes(axes):
+        num_queries = 1
+        for _, _, values in axes:
+            num_queries *= len(values)
+        return num_queries
+
+    def _build_batch_query(self, axes, index):
+        """ Builds the index-th combination of the axes, in itertools.product order.
+        """
+        new_query = self.get_copy()
+        # The last axis varies fastest.
+        for q_label, attribute, values in reversed(axes):
+            index, value_index = divmod(index, len(values))
+            value = values[value_index]
+            if type(value) is list:
+                # Chunks are shared by several subqueries.
+                value = list(value)
+            if attribute == 'predicates':
+                new_query.message.query_graph.edges[q_label].set_predicates(value)
+            elif attribute == 'ids':
+                new_query.message.query_graph.nodes[q_label].set_ids(value)
+            elif attribute == 'categories':
+                new_query.message.query_graph.nodes[q_label].set_categories(value)
+            else:
+                raise ValueError('Unknown attribute label: {}'.format(attribute))
+        return new_query
+
+    def _iter_batch_axes(self, axes, start, stop, max_queries):
+        num_queries = self._count_batch_axes(axes)
+        if max_queries is not None and num_queries > max_queries:
+            raise BatchQueryTooLarge(num_queries, max_queries)
+        if stop is None or stop > num_queries:
+            stop = num_queries
+        return (self._build_batch_query(axes, index) for index in range(start, stop))
+
+    def count_batch_queries(self, axes=None, ids_chunk_size=None):
+        """ Returns the number of subqueries expand_batch_query builds,
+        without building any.
+        """
+        return self._count_batch_axes(self._get_batch_axes(axes, ids_chunk_size))
+
+    def iter_batch_queries(self, start=0, stop=None, max_queries=None, axes=None, ids_chunk_size=None):
+        """ Yields the subqueries of a batch query one at a time.
+
+        Subqueries are numbered in the order expand_batch_query returns them
+        and start and stop select a page of them. Raises BatchQueryTooLarge
+        if the whole expansion has more than max_queries subqueries. See
+        _get_batch_axes for axes and ids_chunk_size.
+        """
+        return self._iter_batch_axes(self._get_batch_axes(axes, ids_chunk_size), start, stop, max_queries)
+
+    def iter_batch_query_chunks(self, chunk_size, start=0, stop=None, max_queries=None, axes=None, ids_chunk_size=None):
+        """ Yields the subqueries of iter_batch_queries in lists of chunk_size.
+        """
+        if chunk_size < 1:
+            raise ValueError('Chunk size must be at least 1.')
+        return iter_chunks(
+                self.iter_batch_queries(start, stop, max_queries, axes, ids_chunk_size),
+                chunk_size,
+                )
+
+    def expand_batch_query(self, max_queries=None, axes=None, ids_chunk_size=None):
+        """ Splits a batch query into subqueries, by default one for every
+        combination of the values of its multi-valued slots.
+
+        axes: (query graph id, attribute) pairs to split along, where
+            attribute is 'ids', 'categories' or 'predicates'. Other slots
+            keep all their values.
+        ids_chunk_size: split ids into lists of this size rather than single ids.
+        """
+        return list(self.iter_batch_queries(max_queries=max_queries, axes=axes, ids_chunk_size=ids_chunk_size))
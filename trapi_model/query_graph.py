@@ -2,15 +2,18 @@
 TRAPI Query Graph Data Classes
 """
 from jsonschema import ValidationError
+import trapi_model
 from trapi_model import exceptions
 
 from trapi_model.biolink.constants import get_biolink_entity
-from trapi_model.biolink import BiolinkEntity
+from trapi_model.biolink import BiolinkEntity, get_entity
+from trapi_model.biolink.hierarchy import get_hierarchy
 from trapi_model.exceptions import *
-from trapi_model.base import TrapiBaseClass
+from trapi_model.base import TrapiBaseClass, get_child_validation_mode
+from trapi_model.indexes import get_category_curies
 from requests import request
 #from reasoner_validator import validate
-from reasoner_validator import TRAPISchemaValidator
+from trapi_model.validators import validate_component
 
 import logging
 # Setup logging
@@ -53,6 +56,12 @@ class QConstraintOrAdditionalProperty(TrapiBaseClass):
                     "not": self.c_not,
                 }
 
+    def clone(self):
+        constraint = super().clone()
+        if type(self.value) is list:
+            constraint.value = list(self.value)
+        return constraint
+
     @staticmethod
     def load(trapi_version, biolink_version, constraint_info, name=None):
         constraint = QConstraintOrAdditionalProperty(
@@ -75,6 +84,7 @@ class QNode(TrapiBaseClass):
             ids = None,
             categories = None,
             constraints = None,
+            validation_mode = None,
             ):
         if type(ids) is not list and ids is not None:
             ids = [ids]
@@ -86,10 +96,18 @@ class QNode(TrapiBaseClass):
         else:
             self.constraints = constraints
         self.categories = categories
-        super().__init__(trapi_version, biolink_version)
-        valid, message = self.validate()
-        if not valid:
-            raise InvalidTrapiComponent(trapi_version, 'QNode', message)
+        super().__init__(trapi_version, biolink_version, validation_mode)
+        self.check_component('QNode')
+
+    def clone(self):
+        qnode = super().clone()
+        if self.ids is not None:
+            qnode.ids = list(self.ids)
+        if self.categories is not None:
+            qnode.categories = list(self.categories)
+        if self.constraints is not None:
+            qnode.constraints = [constraint.clone() for constraint in self.constraints]
+        return qnode
 
     def set_ids(self, ids):
         if type(ids) == str:
@@ -133,8 +151,8 @@ class QNode(TrapiBaseClass):
         return _dict
 
     @staticmethod
-    def load(trapi_version, biolink_version, node_info):
-        qnode = QNode(trapi_version, biolink_version)
+    def load(trapi_version, biolink_version, node_info, validation_mode=None):
+        qnode = QNode(trapi_version, biolink_version, validation_mode=trapi_model.VALIDATION_OFF)
         ids = node_info.pop("ids", None)
         if ids is not None:
             qnode.set_ids(ids)
@@ -152,11 +170,9 @@ class QNode(TrapiBaseClass):
                             constraint_info,
                             )
                         )
-        valid, message = qnode.validate()
-        if valid:
-            return qnode
-        else:
-            raise InvalidTrapiComponent(trapi_version, 'QNode', message)
+        qnode.set_validation_mode(validation_mode)
+        qnode.check_loaded_component('QNode')
+        return qnode
 
     def add_constraint(self, 
             name,
@@ -182,19 +198,11 @@ class QNode(TrapiBaseClass):
                     c_not=c_not,
                     )
                 )
-        valid, message = self.validate()
-        if not valid:
-            raise InvalidTrapiComponent(trapi_version, 'QNode', message)
+        self.check_component('QNode')
 
     def validate(self):
         _dict = self.to_dict()
-        tsv = TRAPISchemaValidator(self.trapi_version)
-        try:
-            #validate(_dict, 'QNode', self.trapi_version)
-            tsv.validate(_dict, 'QNode')
-            return True, None 
-        except ValidationError as ex:
-            return False, ex.message
+        return validate_component(_dict, self.trapi_version, 'QNode')
 
 class QEdge(TrapiBaseClass):
     def __init__(self,
@@ -204,6 +212,7 @@ class QEdge(TrapiBaseClass):
             q_object='',
             predicates=None,
             constraints=None,
+            validation_mode=None,
             ):
         self.subject = q_subject
         self.object = q_object
@@ -214,18 +223,22 @@ class QEdge(TrapiBaseClass):
             self.constraints = []
         else:
             self.constraints = constraints
-        super().__init__(trapi_version, biolink_version)
-        
-        valid, message = self.validate()
-        if not valid:
-            raise InvalidTrapiComponent(trapi_version, 'QEdge', message)
-        
+        super().__init__(trapi_version, biolink_version, validation_mode)
+        self.check_component('QEdge')
 
     def find_constraint(self, name):
         for constraint in self.constraints:
             if constraint.name == name:
                 return constraint
         return None
+
+    def clone(self):
+        qedge = super().clone()
+        if self.predicates is not None:
+            qedge.predicates = list(self.predicates)
+        if self.constraints is not None:
+            qedge.constraints = [constraint.clone() for constraint in self.constraints]
+        return qedge
     
     def set_predicates(self, predicates):
         if type(predicates) is str:
@@ -237,7 +250,7 @@ class QEdge(TrapiBaseClass):
             for predicate in predicates:
                 if type(predicate) is str:
                     _predicates.append(get_biolink_entity(predicate))
-                elif type(category) is BiolinkEntity:
+                elif type(predicate) is BiolinkEntity:
                     _predicates.append(predicate)
             self.predicates = _predicates
 
@@ -257,8 +270,8 @@ class QEdge(TrapiBaseClass):
         return _dict
     
     @staticmethod
-    def load(trapi_version, biolink_version, edge_info):
-        qedge = QEdge(trapi_version, biolink_version)
+    def load(trapi_version, biolink_version, edge_info, validation_mode=None):
+        qedge = QEdge(trapi_version, biolink_version, validation_mode=trapi_model.VALIDATION_OFF)
         qedge.subject = edge_info.pop("subject")
         qedge.object = edge_info.pop("object")
         predicates = edge_info.pop("predicates", None)
@@ -275,11 +288,9 @@ class QEdge(TrapiBaseClass):
                             constraint_info,
                             )
                         )
-        valid, message = qedge.validate()
-        if valid:
-            return qedge
-        else:
-            raise InvalidTrapiComponent(trapi_version, 'QEdge', message)
+        qedge.set_validation_mode(validation_mode)
+        qedge.check_loaded_component('QEdge')
+        return qedge
     
     def add_constraint(self, 
             name,
@@ -305,50 +316,56 @@ class QEdge(TrapiBaseClass):
                     c_not=c_not,
                     )
                 )
-        valid, message = self.validate()
-        if not valid:
-            raise InvalidTrapiComponent(self.trapi_version, 'QEdge', message)
+        self.check_component('QEdge')
         
     def validate(self):
         _dict = self.to_dict()
-        tsv = TRAPISchemaValidator(self.trapi_version)
-        try:
-            #validate(_dict, 'QEdge', self.trapi_version)
-            tsv.validate(_dict, 'QEdge')
-            return True, None 
-        except ValidationError as ex:
-            return False, ex.message
+        return validate_component(_dict, self.trapi_version, 'QEdge')
 
 class QueryGraph(TrapiBaseClass):
-    def __init__(self, trapi_version='1.2', biolink_version=None):
+    def __init__(self, trapi_version='1.2', biolink_version=None, validation_mode=None):
         self.nodes = {}
         self.edges = {}
         self.node_counter = 0
         self.edge_counter = 0
-        super().__init__(trapi_version, biolink_version)
+        super().__init__(trapi_version, biolink_version, validation_mode)
+
+    def set_validation_mode(self, validation_mode):
+        super().set_validation_mode(validation_mode)
+        for node in self.nodes.values():
+            node.set_validation_mode(self.validation_mode)
+        for edge in self.edges.values():
+            edge.set_validation_mode(self.validation_mode)
+
+    def clone(self):
+        query_graph = super().clone()
+        query_graph.nodes = {node_id: node.clone() for node_id, node in self.nodes.items()}
+        query_graph.edges = {edge_id: edge.clone() for edge_id, edge in self.edges.items()}
+        return query_graph
 
     def add_node(self, ids, categories):
         # Run categories through Biolink
         if type(categories) is not list and categories is not None:
-            categories = [BiolinkEntity(categories, self.biolink_version)]
+            categories = [get_entity(categories, biolink_version=self.biolink_version)]
         elif categories is not None:
-            categories = [BiolinkEntity(category, biolink_version=self.biolink_version) for category in categories]
+            categories = [get_entity(category, biolink_version=self.biolink_version) for category in categories]
         node_id = 'n{}'.format(self.node_counter)
         self.node_counter += 1
         self.nodes[node_id] = QNode(
                 self.trapi_version,
                 self.biolink_version,
                 ids=ids,
-                categories=categories
+                categories=categories,
+                validation_mode=self.validation_mode,
                 )
         return node_id
 
     def add_edge(self, q_subject, q_object, predicates):
         # Run predicates through Biolink
         if type(predicates) is not list and predicates is not None:
-            predicates = [BiolinkEntity(predicates, self.biolink_version)]
+            predicates = [get_entity(predicates, biolink_version=self.biolink_version)]
         elif predicates is not None:
-            predicates = [BiolinkEntity(predicate, biolink_version=self.biolink_version) for predicate in predicates]
+            predicates = [get_entity(predicate, biolink_version=self.biolink_version) for predicate in predicates]
         edge_id = 'e{}'.format(self.edge_counter)
         self.edge_counter += 1
         self.edges[edge_id] = QEdge(
@@ -357,6 +374,7 @@ class QueryGraph(TrapiBaseClass):
                 q_subject=q_subject,
                 q_object=q_object,
                 predicates=predicates,
+                validation_mode=self.validation_mode,
                 )
         return edge_id
 
@@ -403,62 +421,33 @@ class QueryGraph(TrapiBaseClass):
                 }
 
     @staticmethod
-    def _is_categories_match(categories1, categories2):
-        try:
-            if categories1 == categories2:
-                return True
-        except:
-            pass
-        if categories1 is None or categories2 is None:
-            return False
-        # Try to reformat categories
-        if type(categories1) is not list:
-            categories1 = [categories1]
-        if type(categories2) is not list:
-            categories2 = [categories2]
-        _categories1 = []
-        for _category in categories1:
-            if type(_category) is str:
-                _categories1.append(get_biolink_entity(_category))
-            elif type(_category) is BiolinkEntity:
-                _categories1.append(_category)
-            else:
-                raise ValueError('Categories must be str or BiolinkEntities.')
-        _categories2 = []
-        for _category in categories2:
-            if type(_category) is str:
-                _categories2.append(get_biolink_entity(_category))
-            elif type(_category) is BiolinkEntity:
-                _categories2.append(_category)
-            else:
-                raise ValueError('Categories must be str or BiolinkEntities.')
-        # Now test categories
-        if len(set(_categories1) - set(_categories2)) == 0:
-            return True
-        return False
-    
-    @staticmethod
-    def _is_ids_match(ids1, ids2):
-        try:
-            if categories1 == categories2:
-                return True
-        except:
-            pass
-        if ids1 is None or ids2 is None:
-            return False
-        if len(set(ids1) - set(ids2)) == 0:
-            return True
-        return False
+    def _has_category(node, category, descendants):
+        node_categories = node.categories or []
+        if descendants and not trapi_model.biolink.BIOLINK_DEBUG:
+            hierarchy = get_hierarchy()
+            return any(hierarchy.is_a(node_category, category) for node_category in node_categories)
+        curies = get_category_curies(category, descendants)
+        return any(node_category.get_curie() in curies for node_category in node_categories)
+
+    def find_nodes(self, categories=None, ids=None, descendants=False):
+        """ Returns the ids of the nodes that have all of the given categories
+        and ids, or None if there are none.
 
-    def find_nodes(self, categories=None, ids=None):
+        With descendants a node also matches a category if it has one of its
+        descendants.
+        """
+        if categories is not None and type(categories) is not list:
+            categories = [categories]
+        if type(ids) is str:
+            ids = [ids]
+        # Query graphs have a handful of nodes, so they are scanned rather
+        # than indexed.
         matched_node_ids = []
-        for node_id, node_info in self.nodes.items():
-            if categories is not None:
-                if not self._is_categories_match(categories, node_info.categories):
-                    continue
-            if ids is not None:
-                if not self._is_ids_match(ids, node_info.ids):
-                    continue
+        for node_id, node in self.nodes.items():
+            if ids is not None and not set(ids).issubset(node.ids or []):
+                continue
+            if categories is not None and not all(self._has_category(node, category, descendants) for category in categories):
+                continue
             matched_node_ids.append(node_id)
         if len(matched_node_ids) == 0:
             return None
@@ -466,27 +455,30 @@ class QueryGraph(TrapiBaseClass):
 
     def validate(self):
         _dict = self.to_dict()
-        tsv = TRAPISchemaValidator(self.trapi_version)
-        try:
-            #validate(_dict, 'QueryGraph', self.trapi_version)
-            tsv.validate(_dict, 'QueryGraph')
-            return True, None 
-        except ValidationError as ex:
-            return False, ex.message
+        return validate_component(_dict, self.trapi_version, 'QueryGraph')
     
     @staticmethod
-    def load(trapi_version, biolink_version, query_graph):
+    def load(trapi_version, biolink_version, query_graph, validation_mode=None):
         #logger.note('loading query graph')
-        new_query_graph = QueryGraph(trapi_version, biolink_version)
+        new_query_graph = QueryGraph(trapi_version, biolink_version, validation_mode)
+        child_validation_mode = get_child_validation_mode(new_query_graph.validation_mode)
         # Load Nodes
         for node_id, node_info in query_graph["nodes"].items():
-            new_query_graph.nodes[node_id] = QNode.load(trapi_version, biolink_version, node_info)
+            new_query_graph.nodes[node_id] = QNode.load(
+                    trapi_version,
+                    biolink_version,
+                    node_info,
+                    validation_mode=child_validation_mode,
+                    )
         # Load Edges
         for edge_id, edge_info in query_graph["edges"].items():
-            new_query_graph.edges[edge_id] = QEdge.load(trapi_version, biolink_version, edge_info)
-        valid, message = new_query_graph.validate()
-        if valid:
-            #logger.note('loading query graph')
-            return new_query_graph
-        else:
-            raise InvalidTrapiComponent(trapi_version, 'QueryGraph', message)
+            new_query_graph.edges[edge_id] = QEdge.load(
+                    trapi_version,
+                    biolink_version,
+                    edge_info,
+                    validation_mode=child_validation_mode,
+                    )
+        new_query_graph.set_validation_mode(new_query_graph.validation_mode)
+        new_query_graph.check_loaded_component('QueryGraph')
+        #logger.note('loading query graph')
+        return new_query_graph
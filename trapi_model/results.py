@@ -4,23 +4,34 @@ TRAPI Result Data Classes
 """
 
 import json
+import heapq
 from jsonschema import ValidationError
 from collections import defaultdict
 
 from trapi_model.biolink.constants import get_biolink_entity
 from trapi_model.biolink import BiolinkEntity
 from trapi_model.exceptions import *
-from trapi_model.base import TrapiBaseClass
+from trapi_model.base import TrapiBaseClass, CompactTrapiClass, get_child_validation_mode, intern_string
+from trapi_model.json_stream import JSONArrayStream
 
 #from reasoner_validator import validate
-from reasoner_validator import TRAPISchemaValidator
+from trapi_model.validators import validate_component
+
+
+def get_score_key(score):
+    """ Sort key putting results in descending score order, unscored last.
+    """
+    if score is None:
+        return float('inf')
+    return -score
 
 
 class Result(TrapiBaseClass):
-    def __init__(self, trapi_version, biolink_version):
+    def __init__(self, trapi_version, biolink_version, validation_mode=None, score=None):
         self.node_bindings = defaultdict(list)
         self.edge_bindings = defaultdict(list)
-        super().__init__(trapi_version, biolink_version)
+        self.score = score
+        super().__init__(trapi_version, biolink_version, validation_mode)
 
     def add_node_binding(self, qg_id, kg_id, conflate_term = None):
         self.node_bindings[qg_id].append(
@@ -42,7 +53,7 @@ class Result(TrapiBaseClass):
                 )
 
     def to_dict(self):
-        return {
+        _dict = {
                 "edge_bindings": {
                     qg_key: [binding.to_dict() \
                             for binding in bindings] \
@@ -52,10 +63,21 @@ class Result(TrapiBaseClass):
                             for binding in bindings] \
                             for qg_key, bindings in self.node_bindings.items()},
                 }
+        if self.score is not None:
+            _dict["score"] = self.score
+        return _dict
+
+    def clone(self):
+        """ Copies the binding lists; Bindings are shared.
+        """
+        result = super().clone()
+        result.node_bindings = defaultdict(list, {qg_key: list(bindings) for qg_key, bindings in self.node_bindings.items()})
+        result.edge_bindings = defaultdict(list, {qg_key: list(bindings) for qg_key, bindings in self.edge_bindings.items()})
+        return result
 
     @staticmethod
-    def load(trapi_version, biolink_version, result_info):
-        result = Result(trapi_version, biolink_version)
+    def load(trapi_version, biolink_version, result_info, validation_mode=None):
+        result = Result(trapi_version, biolink_version, validation_mode, score=result_info.get("score"))
         for qg_key, node_binding_info in result_info["node_bindings"].items():
             node_bindings = []
             for binding_info in node_binding_info:
@@ -76,29 +98,25 @@ class Result(TrapiBaseClass):
                             )
                         )
             result.edge_bindings[qg_key] = edge_bindings
-        valid, message = result.validate()
-        if valid:
-            return result
-        else:
-            raise InvalidTrapiComponent(trapi_version, 'Result', message)
+        result.check_loaded_component('Result')
+        return result
 
     def validate(self):
         _dict = self.to_dict()
-        tsv = TRAPISchemaValidator(self.trapi_version)
-        try:
-            #validate(_dict, 'Result', self.trapi_version)
-            tsv.validate(_dict, 'Result')
-            return True, None 
-        except ValidationError as ex:
-            return False, ex.message
+        return validate_component(_dict, self.trapi_version, 'Result')
 
 class Results(TrapiBaseClass):
-    def __init__(self, trapi_version, biolink_version):
+    def __init__(self, trapi_version, biolink_version, validation_mode=None):
         self.results = []
-        super().__init__(trapi_version, biolink_version)
+        super().__init__(trapi_version, biolink_version, validation_mode)
+
+    def set_validation_mode(self, validation_mode):
+        super().set_validation_mode(validation_mode)
+        for result in self.results:
+            result.set_validation_mode(self.validation_mode)
 
-    def add_result(self, node_bindings, edge_bindings):
-        result = Result(self.trapi_version, self.biolink_version)
+    def add_result(self, node_bindings, edge_bindings, score=None):
+        result = Result(self.trapi_version, self.biolink_version, self.validation_mode, score=score)
         #conflate_term = None
         #if 'query_id' in node_bindings:
         #    conflate_term = node_bindings['query_id']
@@ -115,25 +133,49 @@ class Results(TrapiBaseClass):
                 result.add_edge_binding(qg_id, kg_id)
         self.results.append(result)
 
+    def append_result(self, result):
+        self.results.append(result)
+
+    def top_n(self, n):
+        """ Returns Results sharing the n best scored results, in descending
+        score order. Unscored results come last and ties keep their order.
+        """
+        top_results = Results(self.trapi_version, self.biolink_version, self.validation_mode)
+        top_results.results = heapq.nsmallest(n, self.results, key=lambda result: get_score_key(result.score))
+        return top_results
+
     def to_dict(self):
         return [result.to_dict() for result in self.results]
 
+    def to_json_stream(self):
+        return JSONArrayStream(self.results)
+
+    def clone(self):
+        results = super().clone()
+        results.results = [result.clone() for result in self.results]
+        return results
+
     @staticmethod
-    def load(trapi_version, biolink_version, results):
-        new_results = Results(trapi_version, biolink_version)
+    def load(trapi_version, biolink_version, results, validation_mode=None):
+        new_results = Results(trapi_version, biolink_version, validation_mode)
+        # Results has no schema component of its own, so in deferred mode each
+        # result is validated once as it is loaded.
         for result_info in results:
             new_results.results.append(
                     Result.load(
                         trapi_version,
                         biolink_version,
                         result_info,
+                        validation_mode=new_results.validation_mode,
                         )
                     )
         return new_results
 
-class Binding(TrapiBaseClass):
+class Binding(CompactTrapiClass):
+    __slots__ = ('id', 'conflate_term')
+
     def __init__(self, trapi_version, biolink_version, kg_id=None, conflate_term = None):
-        self.id = kg_id
+        self.id = intern_string(kg_id)
         self.conflate_term = conflate_term
         super().__init__(trapi_version, biolink_version)
     
@@ -0,0 +1,53 @@
+"""
+Shared TRAPI Schema Validators
+"""
+import threading
+
+from jsonschema import ValidationError
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
+from reasoner_validator.trapi import load_schema
+
+# Compiled validators keyed by (trapi_version, trapi_component).
+_VALIDATORS = {}
+_VALIDATORS_LOCK = threading.Lock()
+
+
+def get_schema_validator(trapi_version, trapi_component):
+    """ Returns the compiled jsonschema validator for a TRAPI component.
+
+    Each component sub-schema is resolved and compiled once per process and
+    shared by every object of that component and TRAPI version.
+    """
+    key = (trapi_version, trapi_component)
+    validator = _VALIDATORS.get(key)
+    if validator is not None:
+        return validator
+    with _VALIDATORS_LOCK:
+        validator = _VALIDATORS.get(key)
+        if validator is None:
+            schema = load_schema(trapi_version)[trapi_component]
+            validator_class = validator_for(schema)
+            validator_class.check_schema(schema)
+            validator = validator_class(schema)
+            _VALIDATORS[key] = validator
+    return validator
+
+
+def validate_component(instance, trapi_version, trapi_component):
+    """ Validates a dictionary against a TRAPI component schema.
+
+    Returns a (valid, message) tuple like the validate() methods of the
+    TRAPI model classes.
+    """
+    validator = get_schema_validator(trapi_version, trapi_component)
+    # Same error selection as jsonschema.validate.
+    error = best_match(validator.iter_errors(instance))
+    if error is None:
+        return True, None
+    return False, error.message
+
+
+def clear_schema_validators():
+    with _VALIDATORS_LOCK:
+        _VALIDATORS.clear()
@@ -1,10 +1,22 @@
 import os
 import json
+import copy
 import trapi_model
+from trapi_model import json_backend
 from trapi_model.base import TrapiBaseClass
 
 WORKFLOW_PATH = os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), 'schemas/workflow.json'))
 
+# Parsed workflow.json, read once. Workflows consume a copy of it.
+_WORKFLOW_SCHEMA = None
+
+def get_workflow_schema():
+    global _WORKFLOW_SCHEMA
+    if _WORKFLOW_SCHEMA is None:
+        with open(WORKFLOW_PATH, 'rb') as workflow_file:
+            _WORKFLOW_SCHEMA = json_backend.load(workflow_file)
+    return copy.deepcopy(_WORKFLOW_SCHEMA)
+
 class WorkflowStep(TrapiBaseClass):
     def __init__(self, workflow_id):
         self.workflow_id = workflow_id
@@ -21,11 +33,10 @@ class WorkflowStep(TrapiBaseClass):
 
 class Workflow(TrapiBaseClass):
     def __init__(self):
-        self.workflow_file = open(WORKFLOW_PATH, 'r')
-        self.workflow = json.load(self.workflow_file)
-        self.workflow_file.close()
+        self.workflow = get_workflow_schema()
         self.query_workflow = []
-        self.max_results = 10
+        # Set by a filter_results_top_n operation.
+        self.max_results = None
         self.workflow_steps = []
 
     def add_step(self, workflow_id):
@@ -33,6 +44,13 @@ class Workflow(TrapiBaseClass):
                 WorkflowStep(workflow_id)
                 )
 
+    def clone(self):
+        workflow = super().clone()
+        workflow.workflow = copy.deepcopy(self.workflow)
+        workflow.query_workflow = copy.deepcopy(self.query_workflow)
+        workflow.workflow_steps = list(self.workflow_steps)
+        return workflow
+
     def to_dict(self):
         workflow_steps = [step.to_dict() for step in self.workflow_steps]
         return workflow_steps
@@ -0,0 +1,103 @@
+""" Benchmark of a ColumnarKnowledgeGraph against a KnowledgeGraph: load time,
+memory and bulk filters on the predicate and a score attribute.
+
+Usage: python benchmark_columnar.py [num_edges] [trapi_version]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+from trapi_model import json_backend
+from trapi_model.columnar import ColumnarKnowledgeGraph, numpy
+from trapi_model.knowledge_graph import KnowledgeGraph
+
+NUM_EDGES = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+TRAPI_VERSION = sys.argv[2] if len(sys.argv) > 2 else '1.2'
+PREDICATES = ['biolink:treats', 'biolink:related_to', 'biolink:affects']
+
+
+def build_knowledge_graph_json(num_edges):
+    nodes = {}
+    edges = {}
+    for i in range(num_edges):
+        subject_id = "CHEBI:{}".format(i % (num_edges // 10 + 1))
+        object_id = "MONDO:{}".format(i % 1000)
+        nodes[subject_id] = {"categories": ["biolink:ChemicalEntity"]}
+        nodes[object_id] = {"categories": ["biolink:Disease"]}
+        edges["e{}".format(i)] = {
+                "subject": subject_id,
+                "object": object_id,
+                "predicate": PREDICATES[i % len(PREDICATES)],
+                "attributes": [
+                    {"attribute_type_id": "biolink:score", "value": (i % 1000) / 1000},
+                    {"attribute_type_id": "biolink:publications", "value": ["PMID:{}".format(i)]},
+                    ],
+                "sources": [{"resource_id": "infores:kp", "resource_role": "primary_knowledge_source"}],
+                }
+    return json_backend.dumpb({"nodes": nodes, "edges": edges})
+
+
+def load(cls, kg_json):
+    gc.collect()
+    start_time = time.time()
+    knowledge_graph = cls.load(TRAPI_VERSION, None, json_backend.loads(kg_json), validation_mode='off')
+    return knowledge_graph, time.time() - start_time
+
+
+def measure(cls, kg_json):
+    # Measured on a separate load since tracing slows loading down.
+    gc.collect()
+    tracemalloc.start()
+    knowledge_graph = cls.load(TRAPI_VERSION, None, json_backend.loads(kg_json), validation_mode='off')
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del knowledge_graph
+    return size
+
+
+def timed(function):
+    start_time = time.time()
+    result = function()
+    return len(result), time.time() - start_time
+
+
+def filter_knowledge_graph(knowledge_graph):
+    by_predicate = lambda: [
+            edge_id for edge_id, edge in knowledge_graph.edges.items()
+            if edge.predicate.get_curie() == 'biolink:treats'
+            ]
+    by_score = lambda: [
+            edge_id for edge_id, edge in knowledge_graph.edges.items()
+            if any(a.attribute_type_id == 'biolink:score' and a.value >= 0.9 for a in edge.attributes)
+            ]
+    return timed(by_predicate), timed(by_score)
+
+
+def filter_columnar_knowledge_graph(knowledge_graph):
+    return (
+            timed(lambda: knowledge_graph.edges_with_predicate('biolink:treats')),
+            timed(lambda: knowledge_graph.edges_with_attribute('biolink:score', min_value=0.9)),
+            )
+
+
+kg_json = build_knowledge_graph_json(NUM_EDGES)
+print('{} edges, NumPy {}'.format(NUM_EDGES, 'installed' if numpy is not None else 'not installed'))
+for cls, run_filters in [
+        (KnowledgeGraph, filter_knowledge_graph),
+        (ColumnarKnowledgeGraph, filter_columnar_knowledge_graph),
+        ]:
+    size = measure(cls, kg_json)
+    knowledge_graph, elapsed = load(cls, kg_json)
+    (num_treats, predicate_time), (num_scored, score_time) = run_filters(knowledge_graph)
+    print('{}: load {:.2f}s, {:.0f} bytes per edge, predicate filter {:.3f}s ({} edges), score filter {:.3f}s ({} edges)'.format(
+        cls.__name__,
+        elapsed,
+        size / NUM_EDGES,
+        predicate_time,
+        num_treats,
+        score_time,
+        num_scored,
+        ))
+    del knowledge_graph
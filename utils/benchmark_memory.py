@@ -0,0 +1,75 @@
+""" Benchmark of the memory held by a loaded Knowledge Graph, in bytes per
+edge, with and without string interning.
+
+Edges have attributes_per_edge attributes, whose type ids and sources repeat
+across the graph as in typical KP responses.
+
+Usage: python benchmark_memory.py [num_edges] [attributes_per_edge] [trapi_version]
+"""
+import gc
+import sys
+import tracemalloc
+
+import trapi_model
+from trapi_model import json_backend
+from trapi_model.knowledge_graph import KnowledgeGraph
+
+NUM_EDGES = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+NUM_ATTRIBUTES = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+TRAPI_VERSION = sys.argv[3] if len(sys.argv) > 3 else '1.2'
+
+
+def build_knowledge_graph_json(num_edges, num_attributes):
+    nodes = {}
+    edges = {}
+    for i in range(num_edges):
+        subject_id = "CHEBI:{}".format(i)
+        object_id = "MONDO:{}".format(i % 1000)
+        nodes[subject_id] = {"categories": ["biolink:ChemicalEntity"]}
+        nodes[object_id] = {"categories": ["biolink:Disease"]}
+        edges["e{}".format(i)] = {
+                "subject": subject_id,
+                "object": object_id,
+                "predicate": "biolink:treats",
+                "attributes": [
+                    {
+                        "attribute_type_id": "biolink:attribute_{}".format(j),
+                        "value": i * j,
+                        "original_attribute_name": "attribute_{}".format(j),
+                        "attribute_source": "infores:kp",
+                        }
+                    for j in range(num_attributes)
+                    ],
+                "sources": [{"resource_id": "infores:kp", "resource_role": "primary_knowledge_source"}],
+                }
+    # Decoded strings are distinct objects, as in a loaded response.
+    return json_backend.dumpb({"nodes": nodes, "edges": edges})
+
+
+def measure(kg_json, intern_strings):
+    trapi_model.set_string_interning_mode(intern_strings)
+    gc.collect()
+    tracemalloc.start()
+    knowledge_graph = KnowledgeGraph.load(
+            TRAPI_VERSION,
+            None,
+            json_backend.loads(kg_json),
+            validation_mode='off',
+            )
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del knowledge_graph
+    return size
+
+
+kg_json = build_knowledge_graph_json(NUM_EDGES, NUM_ATTRIBUTES)
+for intern_strings in [False, True]:
+    size = measure(kg_json, intern_strings)
+    print('{} edges with {} attributes, interning {}: {:.1f} MB, {:.0f} bytes per edge'.format(
+        NUM_EDGES,
+        NUM_ATTRIBUTES,
+        'on' if intern_strings else 'off',
+        size / 1e6,
+        size / NUM_EDGES,
+        ))
@@ -0,0 +1,56 @@
+""" Benchmark of merging subquery responses with Message.update.
+
+Every response repeats a share of the edges of the others, as when several
+subqueries reach the same triples.
+
+Usage: python benchmark_merge.py [num_responses] [edges_per_response] [trapi_version]
+"""
+import sys
+import time
+
+from trapi_model.message import Message
+
+NUM_RESPONSES = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+NUM_EDGES = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+TRAPI_VERSION = sys.argv[3] if len(sys.argv) > 3 else '1.2'
+
+
+def build_response(index, num_edges):
+    nodes = {}
+    edges = {}
+    results = []
+    for i in range(num_edges):
+        # Half of the edges are shared by every response.
+        subject_id = "CHEBI:{}".format(i if i % 2 else index * num_edges + i)
+        object_id = "MONDO:{}".format(i % 100)
+        nodes[subject_id] = {"categories": ["biolink:ChemicalEntity"]}
+        nodes[object_id] = {"categories": ["biolink:Disease"]}
+        edges["e{}".format(i)] = {
+                "subject": subject_id,
+                "object": object_id,
+                "predicate": "biolink:treats",
+                "attributes": [{"attribute_type_id": "biolink:p_value", "value": index % 10 / 100}],
+                "sources": [{"resource_id": "infores:kp{}".format(index % 3), "resource_role": "primary_knowledge_source"}],
+                }
+        results.append({
+            "node_bindings": {"n0": [{"id": subject_id}], "n1": [{"id": object_id}]},
+            "edge_bindings": {"e0": [{"id": "e{}".format(i)}]},
+            })
+    message = {"knowledge_graph": {"nodes": nodes, "edges": edges}, "results": results}
+    return Message.load(TRAPI_VERSION, None, message, validation_mode='off')
+
+
+responses = [build_response(index, NUM_EDGES) for index in range(NUM_RESPONSES)]
+message = Message(TRAPI_VERSION, None)
+start_time = time.time()
+for response in responses:
+    message.update(response.knowledge_graph, response.results)
+elapsed = time.time() - start_time
+print('Merged {} responses of {} edges in {:.2f}s: {} nodes, {} edges, {} results'.format(
+    NUM_RESPONSES,
+    NUM_EDGES,
+    elapsed,
+    len(message.knowledge_graph.nodes),
+    len(message.knowledge_graph.edges),
+    len(message.results.results),
+    ))
@@ -0,0 +1,48 @@
+""" Benchmark of loading results and keeping the top N by score with
+Results and ColumnarResults.
+
+Usage: python benchmark_results.py [num_results] [max_results] [trapi_version]
+"""
+import copy
+import random
+import sys
+import time
+
+from trapi_model.columnar import ColumnarResults, numpy
+from trapi_model.results import Results
+
+NUM_RESULTS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+MAX_RESULTS = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+TRAPI_VERSION = sys.argv[3] if len(sys.argv) > 3 else '1.2'
+
+
+def build_results(num_results):
+    random.seed(0)
+    return [
+            {
+                "node_bindings": {
+                    "n0": [{"id": "CHEBI:{}".format(i)}],
+                    "n1": [{"id": "MONDO:{}".format(i % 1000)}],
+                    },
+                "edge_bindings": {"e0": [{"id": "e{}".format(i)}]},
+                "score": random.random(),
+                }
+            for i in range(num_results)
+            ]
+
+
+results_json = build_results(NUM_RESULTS)
+print('{} results, top {}, NumPy {}'.format(
+    NUM_RESULTS,
+    MAX_RESULTS,
+    'installed' if numpy is not None else 'not installed',
+    ))
+for cls in [Results, ColumnarResults]:
+    results_info = copy.deepcopy(results_json)
+    start_time = time.time()
+    results = cls.load(TRAPI_VERSION, None, results_info, validation_mode='off')
+    load_time = time.time() - start_time
+    start_time = time.time()
+    top_results = results.top_n(MAX_RESULTS)
+    top_n_time = time.time() - start_time
+    print('{}: load {:.2f}s, top_n {:.3f}s'.format(cls.__name__, load_time, top_n_time))
@@ -0,0 +1,113 @@
+""" Benchmark of Message serialization on a large Knowledge Graph.
+
+Compares json.dumps(message.to_dict()) with the streaming write_json, both
+indented and compact, reporting total time, time to first byte and peak
+traced memory while writing to a file. Memory is traced in a separate run
+since tracing slows allocation down. Then times json(binary=True) with each
+installed JSON backend.
+
+Usage: python benchmark_serialization.py [num_edges] [trapi_version]
+"""
+import os
+import sys
+import time
+import json
+import tempfile
+import tracemalloc
+
+import trapi_model
+from trapi_model.json_backend import BACKENDS
+from trapi_model.message import Message
+from trapi_model.knowledge_graph import KnowledgeGraph
+from trapi_model.results import Results
+
+NUM_EDGES = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+TRAPI_VERSION = sys.argv[2] if len(sys.argv) > 2 else '1.2'
+
+
+def build_message(num_edges):
+    knowledge_graph = {"nodes": {}, "edges": {}}
+    results = []
+    for i in range(num_edges):
+        subject_id = "CHEBI:{}".format(i)
+        object_id = "MONDO:{}".format(i % 1000)
+        knowledge_graph["nodes"][subject_id] = {"categories": ["biolink:ChemicalEntity"]}
+        knowledge_graph["nodes"][object_id] = {"categories": ["biolink:Disease"]}
+        knowledge_graph["edges"]["e{}".format(i)] = {
+                "subject": subject_id,
+                "object": object_id,
+                "predicate": "biolink:treats",
+                "attributes": [
+                    {
+                        "attribute_type_id": "biolink:p_value",
+                        "value": 0.01,
+                        },
+                    ],
+                }
+        results.append({
+            "node_bindings": {"n0": [{"id": subject_id}], "n1": [{"id": object_id}]},
+            "edge_bindings": {"e0": [{"id": "e{}".format(i)}]},
+            })
+    message = Message(TRAPI_VERSION, None, 'off')
+    message.knowledge_graph = KnowledgeGraph.load(TRAPI_VERSION, None, knowledge_graph, validation_mode='off')
+    message.results = Results.load(TRAPI_VERSION, None, results, validation_mode='off')
+    return message
+
+
+class FirstByteFile:
+    """ File wrapper recording when the first chunk is written.
+    """
+    def __init__(self, fp):
+        self.fp = fp
+        self.first_write_time = None
+
+    def write(self, data):
+        if self.first_write_time is None:
+            self.first_write_time = time.time()
+        self.fp.write(data)
+
+
+def dump_to_dict(message, fp, indent):
+    fp.write(json.dumps(message.to_dict(), indent=indent))
+
+
+def dump_streaming(message, fp, indent):
+    message.write_json(fp, indent=indent)
+
+
+def run(name, dump, message, indent):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, 'message.json')
+        with open(filename, 'w') as json_file:
+            fp = FirstByteFile(json_file)
+            start_time = time.time()
+            dump(message, fp, indent)
+            elapsed = time.time() - start_time
+        with open(filename, 'w') as json_file:
+            tracemalloc.start()
+            dump(message, json_file, indent)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    print('{}: {:.2f}s total, {:.3f}s to first byte, {:.1f} MB peak'.format(
+        name,
+        elapsed,
+        fp.first_write_time - start_time,
+        peak / 2**20,
+        ))
+
+
+message = build_message(NUM_EDGES)
+for indent in [2, None]:
+    mode = 'indent={}'.format(indent)
+    run('to_dict + json.dumps ({})'.format(mode), dump_to_dict, message, indent)
+    run('write_json ({})'.format(mode), dump_streaming, message, indent)
+
+for backend in BACKENDS:
+    try:
+        trapi_model.set_json_backend(backend)
+    except ImportError:
+        print('{}: not installed'.format(backend))
+        continue
+    start_time = time.time()
+    message.json(binary=True, indent=None)
+    print('json(binary=True) with {}: {:.2f}s'.format(backend, time.time() - start_time))
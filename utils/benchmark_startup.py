@@ -0,0 +1,50 @@
+""" Startup benchmark for trapi_model imports.
+
+Each measurement runs in a fresh interpreter so nothing is cached between
+runs. Reports the time to import each module and to then resolve a first
+Biolink constant.
+
+Usage: python benchmark_startup.py [repeats]
+"""
+import subprocess
+import sys
+
+REPEATS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+MODULES = [
+    'trapi_model.biolink',
+    'trapi_model.biolink.constants',
+    'trapi_model.knowledge_graph',
+    'trapi_model.query',
+    ]
+SCRIPT = """
+import time
+start_time = time.time()
+import {module}
+import_time = time.time() - start_time
+start_time = time.time()
+from trapi_model.biolink.constants import BIOLINK_GENE_ENTITY
+BIOLINK_GENE_ENTITY.get_ancestors()
+constant_time = time.time() - start_time
+print(import_time, constant_time)
+"""
+
+
+def measure(module):
+    import_times = []
+    constant_times = []
+    for _ in range(REPEATS):
+        output = subprocess.check_output([sys.executable, '-c', SCRIPT.format(module=module)])
+        import_time, constant_time = output.decode().split()[-2:]
+        import_times.append(float(import_time))
+        constant_times.append(float(constant_time))
+    return min(import_times), min(constant_times)
+
+
+for module in MODULES:
+    import_time, constant_time = measure(module)
+    print('{}: import {:.3f}s, first constant {:.3f}s (best of {})'.format(
+        module,
+        import_time,
+        constant_time,
+        REPEATS,
+        ))
@@ -0,0 +1,68 @@
+""" Micro-benchmark of per-edge schema validation on a large Knowledge Graph.
+
+Compares building a new TRAPISchemaValidator for every edge (the old
+validate() behaviour) with the shared validators in trapi_model.validators.
+
+Usage: python benchmark_validation.py [num_edges] [trapi_version]
+"""
+import sys
+import time
+
+from jsonschema import ValidationError
+from reasoner_validator import TRAPISchemaValidator
+
+from trapi_model.validators import validate_component
+
+NUM_EDGES = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+TRAPI_VERSION = sys.argv[2] if len(sys.argv) > 2 else '1.2'
+
+
+def build_edges(num_edges):
+    edges = []
+    for i in range(num_edges):
+        edges.append({
+            "subject": "CHEBI:{}".format(i),
+            "object": "MONDO:{}".format(i % 1000),
+            "predicate": "biolink:treats",
+            "attributes": [
+                {
+                    "attribute_type_id": "biolink:p_value",
+                    "value": 0.01,
+                    },
+                ],
+            })
+    return edges
+
+
+def run(name, validate_edge, edges):
+    start_time = time.time()
+    for edge in edges:
+        validate_edge(edge)
+    elapsed = time.time() - start_time
+    print('{}: {} edges in {:.2f}s ({:.0f} validations/s)'.format(
+        name,
+        len(edges),
+        elapsed,
+        len(edges) / elapsed,
+        ))
+
+
+def validate_with_new_validator(edge):
+    tsv = TRAPISchemaValidator(TRAPI_VERSION)
+    try:
+        tsv.validate(edge, 'Edge')
+        return True, None
+    except ValidationError as ex:
+        return False, ex.message
+
+
+def validate_with_shared_validator(edge):
+    return validate_component(edge, TRAPI_VERSION, 'Edge')
+
+
+edges = build_edges(NUM_EDGES)
+# Warm up the schema download cache so both runs only measure validation.
+validate_with_new_validator(edges[0])
+validate_with_shared_validator(edges[0])
+run('New validator per edge', validate_with_new_validator, edges)
+run('Shared validator', validate_with_shared_validator, edges)
@@ -1,5 +1,9 @@
 from bmt import Toolkit
 import csv
+import os
+
+from trapi_model.data import biolink_schemas
+from trapi_model.biolink.snapshot import write_snapshot, get_snapshot_path
 
 t = Toolkit()
 with open('debug_constants.csv', 'w') as csv_file:
@@ -16,4 +20,19 @@ with open('debug_constants.csv', 'w') as csv_file:
             if name != ancestor:
                 row.append(ancestor)
         writer.writerow(row)
+
+# Build a snapshot for every bundled Biolink version, loading each one the
+# same way trapi_model.biolink.set_toolkit does.
+write_snapshot(t, get_snapshot_path('latest'))
+print('Wrote snapshot for Biolink latest.')
+schema_dir = os.path.abspath(os.path.dirname(biolink_schemas.__file__))
+for schema in os.listdir(schema_dir):
+    parse_base = os.path.splitext(os.path.basename(schema))[0]
+    if 'biolink' not in parse_base:
+        continue
+    version = parse_base.split('-')[-1]
+    if version == 'latest':
+        continue
+    write_snapshot(Toolkit(os.path.join(schema_dir, schema)), get_snapshot_path(version))
+    print('Wrote snapshot for Biolink {}.'.format(version))
 print('Done.')